@@ -5,9 +5,11 @@ Herramienta de análisis de riesgo financiero empresarial basada en ratios
 financieros y el Z-Score de Altman.
 """
 
+import json
+import os
+
 import streamlit as st
-from typing import Optional
-from ui.forms import financial_input_form
+from ui.forms import financial_input_form, portfolio_upload_form
 from ui.layout import (
     configurar_pagina,
     aplicar_estilos_personalizados,
@@ -21,20 +23,9 @@ from ui.layout import (
     crear_card,
     mostrar_separador
 )
-from ui.view_results import mostrar_resultados_completos
-from risk_engine.ratios import (
-    ratio_liquidez,
-    ratio_prueba_acida,
-    ratio_endeudamiento,
-    ratio_apalancamiento,
-    roa,
-    roe,
-    margen_neto,
-    rotacion_activos,
-    rotacion_inventarios
-)
-from risk_engine.zscore import z_score
-from risk_engine.classification import classify_risk
+from risk_engine.pipeline import analizar_empresa
+from risk_engine.cache import CacheResultados, huella_datos
+from risk_engine.instrumentation import etapa, instrumentacion
 
 # Configurar página (debe ser lo primero)
 configurar_pagina()
@@ -47,108 +38,44 @@ if 'datos_calculados' not in st.session_state:
     st.session_state['datos_calculados'] = None
 
 
-def calcular_ratios(data: dict) -> dict:
+@st.cache_resource
+def obtener_cache_resultados() -> CacheResultados:
     """
-    Calcula todos los ratios financieros a partir de los datos ingresados.
-    
-    Args:
-        data: Diccionario con los datos financieros
-        
-    Returns:
-        Diccionario con todos los ratios calculados
+    Retorna la caché de análisis compartida por todas las sesiones del proceso.
+
+    El presupuesto de memoria se configura con la variable de entorno
+    BRS_CACHE_MB (por defecto 64 MB).
     """
-    ratios = {}
-    
-    # Mapear campos del formulario
-    activo_total = data.get('total_assets', data.get('activo_total', 0))
-    
-    # Ratios de liquidez
-    ratios['liquidez'] = ratio_liquidez(
-        data['activo_corriente'],
-        data['pasivo_corriente']
-    )
-    
-    # Separar inventarios (saldo) para prueba ácida
-    inventarios = data.get('inventarios', data['activo_corriente'] * 0.3)
-    
-    ratios['prueba_acida'] = ratio_prueba_acida(
-        data['activo_corriente'],
-        inventarios,
-        data['pasivo_corriente']
-    )
-    
-    # Ratios de solvencia
-    ratios['endeudamiento'] = ratio_endeudamiento(
-        data['pasivo_total'],
-        activo_total
-    )
-    
-    ratios['apalancamiento'] = ratio_apalancamiento(
-        activo_total,
-        data['patrimonio']
-    )
-    
-    # Ratios de rentabilidad
-    ratios['roa'] = roa(
-        data['utilidad_neta'],
-        activo_total
-    )
-    
-    ratios['roe'] = roe(
-        data['utilidad_neta'],
-        data['patrimonio']
-    )
-    
-    # Cambio de margen_utilidad a margen_neto
-    ratios['margen_neto'] = margen_neto(
-        data['utilidad_neta'],
-        data['ventas']
-    )
-    
-    # Ratios de eficiencia
-    ratios['rotacion_activos'] = rotacion_activos(
-        data['ventas'],
-        activo_total
-    )
-    
-    # Separar inventario_promedio para rotación de inventarios
-    inventario_promedio = data.get('inventario_promedio', inventarios)
-    costo_ventas = data.get('costo_ventas', data['ventas'] * 0.6)
-    
-    ratios['rotacion_inventarios'] = rotacion_inventarios(
-        costo_ventas,
-        inventario_promedio
-    )
-    
-    return ratios
+    max_mb = float(os.environ.get('BRS_CACHE_MB', 64))
+    return CacheResultados(max_bytes=int(max_mb * 1024 * 1024))
 
 
-def calcular_zscore(data: dict) -> Optional[float]:
+def mostrar_panel_instrumentacion() -> None:
     """
-    Calcula el Z-Score de Altman a partir de los datos ingresados.
-    
-    Args:
-        data: Diccionario con los datos financieros
-        
-    Returns:
-        Valor del Z-Score o None si hay error en el cálculo
+    Muestra en la barra lateral los tiempos acumulados por etapa y permite
+    descargarlos en JSON.
     """
-    # Mapear campos del formulario a los esperados por z_score
-    activo_total = data.get('total_assets', data.get('activo_total', 0))
-    working_capital = data.get('working_capital', data['activo_corriente'] - data['pasivo_corriente'])
-    retained_earnings = data.get('retained_earnings', data.get('utilidades_retenidas', 0))
-    market_value_equity = data.get('market_value_equity', data.get('valor_mercado_patrimonio', data['patrimonio']))
-    total_liabilities = data.get('total_liabilities', data['pasivo_total'])
-    
-    return z_score(
-        working_capital=working_capital,
-        retained_earnings=retained_earnings,
-        ebit=data['ebit'],
-        market_value_equity=market_value_equity,
-        total_liabilities=total_liabilities,
-        sales=data['ventas'],
-        total_assets=activo_total
-    )
+    resumen = instrumentacion.resumen()
+    with st.sidebar.expander("⏱️ Instrumentación"):
+        st.table([
+            {
+                'etapa': nombre,
+                'llamadas': datos['llamadas'],
+                'media (ms)': round(datos['media_ms'], 3),
+                'última (ms)': round(datos['ultima_ms'], 3),
+                'máx (ms)': round(datos['max_ms'], 3),
+            }
+            for nombre, datos in resumen['etapas'].items()
+        ])
+        st.json(resumen['contadores'])
+        st.download_button(
+            label="Descargar JSON",
+            data=json.dumps(resumen, ensure_ascii=False, indent=2),
+            file_name="instrumentacion.json",
+            mime="application/json"
+        )
+        if st.button("Reiniciar contadores"):
+            instrumentacion.reiniciar()
 
 
 def main():
@@ -162,6 +89,11 @@ def main():
         mostrar_pagina_inicio()
         
     elif opcion == "📝 Análisis de Empresa":
+        # Importación diferida: pandas y plotly solo se cargan al llegar a
+        # la página de análisis, no en Inicio, Ayuda ni Acerca de
+        from ui.view_results import mostrar_resultados_completos, estadisticas_cache_figuras
+        from ui.view_portfolio import indice_pares_cartera
+        
         # Página principal de análisis
         mostrar_header()
         
@@ -174,20 +106,17 @@ def main():
         if data:
             with st.spinner("Calculando ratios y análisis de riesgo..."):
                 try:
-                    # Calcular ratios
-                    ratios = calcular_ratios(data)
-                    
-                    # Calcular Z-Score
-                    zscore_valor = calcular_zscore(data)
-                    
-                    # Obtener clasificación de riesgo
-                    clasificacion = classify_risk(zscore_valor)
+                    # Calcular ratios, Z-Score y clasificación de riesgo
+                    # (reutilizando el análisis si los datos ya se enviaron)
+                    with etapa('analisis'):
+                        resultado = obtener_cache_resultados().obtener_o_calcular(
+                            huella_datos(data),
+                            lambda: analizar_empresa(data)
+                        )
                     
                     # Guardar en sesión
                     st.session_state['datos_calculados'] = {
-                        'ratios': ratios,
-                        'zscore': zscore_valor,
-                        'clasificacion': clasificacion,
+                        **resultado,
                         'datos_originales': data
                     }
                     
@@ -202,11 +131,14 @@ def main():
             mostrar_separador(40)
             
             # Mostrar resultados completos
-            mostrar_resultados_completos(
-                ratios=st.session_state['datos_calculados']['ratios'],
-                z_score=st.session_state['datos_calculados']['zscore'],
-                clasificacion=st.session_state['datos_calculados']['clasificacion']
-            )
+            with etapa('vista'):
+                mostrar_resultados_completos(
+                    ratios=st.session_state['datos_calculados']['ratios'],
+                    z_score=st.session_state['datos_calculados']['zscore'],
+                    clasificacion=st.session_state['datos_calculados']['clasificacion'],
+                    # Si hay una cartera puntuada en la sesión, se compara con ella
+                    pares=indice_pares_cartera(st.session_state.get('tarea_cartera'))
+                )
         elif data is None:
             # Mostrar mensaje informativo si no hay datos
             crear_card(
@@ -216,6 +148,52 @@ def main():
                 tipo="info"
             )
     
+        # Contadores de las cachés para dimensionarlas
+        with st.sidebar.expander("🗄️ Caché de resultados"):
+            st.json({
+                'analisis': obtener_cache_resultados().estadisticas(),
+                'figuras': estadisticas_cache_figuras()
+            })
+    
+        # Tiempos por etapa (solo con BRS_INSTRUMENTACION=1)
+        if instrumentacion.activa:
+            mostrar_panel_instrumentacion()
+    
+    elif opcion == "📂 Análisis de Cartera":
+        # Importación diferida: pandas y numpy solo se cargan en esta página
+        from risk_engine.background import TareaCartera
+        from ui.view_portfolio import mostrar_resultados_cartera
+        
+        mostrar_header()
+        
+        crear_seccion("Análisis de Cartera", "📂")
+        
+        solicitud = portfolio_upload_form()
+        
+        # La cartera se puntúa en un hilo; la página muestra el avance
+        if solicitud:
+            anterior = st.session_state.get('tarea_cartera')
+            if anterior is not None:
+                anterior.cancelar()
+            tarea = TareaCartera(
+                solicitud['archivo'],
+                sep=solicitud['sep'],
+                decimal=solicitud['decimal']
+            )
+            tarea.start()
+            st.session_state['tarea_cartera'] = tarea
+        
+        if st.session_state.get('tarea_cartera') is not None:
+            mostrar_separador(40)
+            mostrar_resultados_cartera(st.session_state['tarea_cartera'])
+        else:
+            crear_card(
+                "💡 Instrucciones",
+                "Sube un archivo con una empresa por fila para puntuarlas todas a la vez. "
+                "Las columnas deben tener los mismos nombres que los campos del análisis individual.",
+                tipo="info"
+            )
+    
     elif opcion == "📚 Ayuda":
         mostrar_pagina_ayuda()
     
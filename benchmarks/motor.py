@@ -0,0 +1,335 @@
+"""
+Suite de benchmarks del motor de riesgo.
+
+Mide:
+    - Latencia por llamada de cada función pública de ``risk_engine.ratios``
+      y ``risk_engine.zscore`` (más ``calcular_ratios``/``calcular_zscore``).
+    - Rendimiento de extremo a extremo (``calcular_ratios`` +
+      ``calcular_zscore`` fila a fila, y ``puntuar_lote`` vectorizado) sobre
+      carteras sintéticas de 1k, 100k y 1M filas (``generar_cartera``).
+    - Pico de memoria de cada corrida de rendimiento (``tracemalloc``).
+
+El informe es un JSON que puede compararse con el de otro commit para
+detectar regresiones.
+
+Uso:
+    python -m benchmarks.motor -o base.json
+    python -m benchmarks.motor -o actual.json --comparar base.json --tolerancia 0.25
+"""
+
+import argparse
+import inspect
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from risk_engine import ratios, zscore
+from risk_engine.batch import puntuar_lote
+from risk_engine.pipeline import calcular_ratios, calcular_zscore
+from utils.sample_data import generar_cartera, get_ejemplo_empresa_saludable
+
+TAMANOS = (1_000, 100_000, 1_000_000)
+
+# Filas que se convierten a diccionarios a la vez en la ruta escalar
+_TAM_TRAMO = 10_000
+
+# Nombres de parámetros de las funciones escalares sin clave homónima en los
+# datos de ejemplo
+_ALIAS_PARAMETROS = {
+    'activo_total': 'total_assets',
+    'activos_totales': 'total_assets',
+    'sales': 'ventas',
+}
+
+
+def _funciones_publicas(modulo) -> Dict[str, Callable]:
+    """Funciones definidas en el módulo (no importadas), por nombre."""
+    return {
+        nombre: funcion
+        for nombre, funcion in inspect.getmembers(modulo, inspect.isfunction)
+        if funcion.__module__ == modulo.__name__ and not nombre.startswith('_')
+    }
+
+
+def _argumentos(funcion: Callable, empresa: dict) -> tuple:
+    """
+    Construye argumentos posicionales tomando de la empresa de ejemplo los
+    campos con el mismo nombre que cada parámetro (o 100000.0 si no existe).
+    """
+    return tuple(
+        float(empresa.get(_ALIAS_PARAMETROS.get(nombre, nombre), 100_000.0))
+        for nombre in inspect.signature(funcion).parameters
+    )
+
+
+def medir_latencia(funcion: Callable, argumentos: tuple, repeticiones: int = 5) -> dict:
+    """
+    Mide la latencia por llamada de una función con ``timeit``.
+
+    Args:
+        funcion: Función a medir
+        argumentos: Argumentos posicionales
+        repeticiones: Repeticiones de la medición
+
+    Returns:
+        Diccionario con ``ns_por_llamada`` (mejor repetición),
+        ``ns_mediana`` y ``llamadas`` por repetición
+    """
+    temporizador = timeit.Timer('funcion(*argumentos)',
+                                globals={'funcion': funcion, 'argumentos': argumentos})
+    llamadas, _ = temporizador.autorange()
+    tiempos = [t / llamadas * 1e9 for t in temporizador.repeat(repeticiones, llamadas)]
+    return {
+        'ns_por_llamada': min(tiempos),
+        'ns_mediana': statistics.median(tiempos),
+        'llamadas': llamadas,
+    }
+
+
+def latencias(repeticiones: int = 5) -> Dict[str, dict]:
+    """
+    Mide la latencia de cada función escalar del motor.
+
+    Returns:
+        Diccionario ``modulo.funcion`` → resultado de ``medir_latencia``
+    """
+    empresa = get_ejemplo_empresa_saludable()
+    resultados = {}
+    for modulo in (ratios, zscore):
+        prefijo = modulo.__name__.rsplit('.', 1)[-1]
+        for nombre, funcion in _funciones_publicas(modulo).items():
+            resultados[f'{prefijo}.{nombre}'] = medir_latencia(
+                funcion, _argumentos(funcion, empresa), repeticiones
+            )
+    for funcion in (calcular_ratios, calcular_zscore):
+        resultados[f'pipeline.{funcion.__name__}'] = medir_latencia(
+            funcion, (empresa,), repeticiones
+        )
+    return resultados
+
+
+def _filas(columnas: Dict[str, np.ndarray]) -> Iterator[dict]:
+    """Recorre la cartera como diccionarios, convirtiendo por tramos."""
+    nombres = list(columnas)
+    n_filas = len(next(iter(columnas.values())))
+    for inicio in range(0, n_filas, _TAM_TRAMO):
+        tramo = [columnas[nombre][inicio:inicio + _TAM_TRAMO].tolist() for nombre in nombres]
+        for valores in zip(*tramo):
+            yield dict(zip(nombres, valores))
+
+
+def _ruta_escalar(columnas: Dict[str, np.ndarray]) -> None:
+    for fila in _filas(columnas):
+        calcular_ratios(fila)
+        calcular_zscore(fila)
+
+
+def _ruta_lote(columnas: Dict[str, np.ndarray]) -> None:
+    puntuar_lote(columnas)
+
+
+RUTAS = {
+    'escalar': _ruta_escalar,
+    'lote': _ruta_lote,
+}
+
+
+def medir_rendimiento(
+    ruta: Callable, columnas: Dict[str, np.ndarray], repeticiones: int = 3
+) -> dict:
+    """
+    Mide el tiempo de puntuar una cartera completa y su pico de memoria.
+
+    El tiempo se toma sin ``tracemalloc`` (que ralentiza las asignaciones);
+    el pico de memoria se mide en una corrida adicional.
+
+    Args:
+        ruta: Función que puntúa la cartera
+        columnas: Cartera sintética
+        repeticiones: Corridas cronometradas (se informa la mejor)
+
+    Returns:
+        Diccionario con ``segundos``, ``filas_por_segundo`` y ``pico_memoria_mb``
+    """
+    n_filas = len(next(iter(columnas.values())))
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        ruta(columnas)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        ruta(columnas)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    segundos = min(tiempos)
+    return {
+        'filas': n_filas,
+        'segundos': segundos,
+        'filas_por_segundo': n_filas / segundos if segundos > 0 else None,
+        'pico_memoria_mb': pico / (1024 * 1024),
+    }
+
+
+def rendimiento(
+    tamanos: Sequence[int] = TAMANOS, repeticiones: int = 3, semilla: int = 0
+) -> Dict[str, dict]:
+    """
+    Mide cada ruta de puntuación con cada tamaño de cartera.
+
+    Returns:
+        Diccionario ``ruta_filas`` → resultado de ``medir_rendimiento``
+    """
+    resultados = {}
+    for n_filas in tamanos:
+        columnas = next(generar_cartera(n_filas, tam_bloque=n_filas, semilla=semilla))
+        del columnas['id']
+        for nombre, ruta in RUTAS.items():
+            resultados[f'{nombre}_{n_filas}'] = medir_rendimiento(ruta, columnas, repeticiones)
+    return resultados
+
+
+def _commit_actual() -> Optional[str]:
+    """Commit de git del árbol actual, o None si no está disponible."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar(
+    tamanos: Sequence[int] = TAMANOS, repeticiones: int = 3, semilla: int = 0
+) -> dict:
+    """
+    Ejecuta la suite completa.
+
+    Returns:
+        Informe con ``meta``, ``latencias`` y ``rendimiento``
+    """
+    return {
+        'meta': {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit_actual(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'semilla': semilla,
+        },
+        'latencias': latencias(),
+        'rendimiento': rendimiento(tamanos, repeticiones, semilla),
+    }
+
+
+# Métricas comparadas entre informes (en todas, un valor mayor es peor)
+METRICAS = {
+    'latencias': ('ns_por_llamada',),
+    'rendimiento': ('segundos', 'pico_memoria_mb'),
+}
+
+
+def comparar(actual: dict, base: dict, tolerancia: float = 0.25) -> List[dict]:
+    """
+    Compara dos informes y retorna las métricas que empeoraron más que la
+    tolerancia relativa.
+
+    Solo se comparan las mediciones presentes en ambos informes.
+
+    Args:
+        actual: Informe del árbol actual
+        base: Informe de referencia
+        tolerancia: Aumento relativo permitido (0.25 = 25 %)
+
+    Returns:
+        Lista de regresiones con ``metrica``, ``base``, ``actual`` y ``cambio``
+    """
+    regresiones = []
+    for seccion, campos in METRICAS.items():
+        for nombre, medicion in actual.get(seccion, {}).items():
+            referencia = base.get(seccion, {}).get(nombre)
+            if referencia is None:
+                continue
+            for campo in campos:
+                anterior, nuevo = referencia.get(campo), medicion.get(campo)
+                if not anterior or nuevo is None:
+                    continue
+                cambio = nuevo / anterior - 1
+                if cambio > tolerancia:
+                    regresiones.append({
+                        'metrica': f'{seccion}.{nombre}.{campo}',
+                        'base': anterior,
+                        'actual': nuevo,
+                        'cambio': cambio,
+                    })
+    return regresiones
+
+
+def _imprimir_informe(informe: dict) -> None:
+    for nombre, medicion in informe['latencias'].items():
+        print(f"{nombre:<40} {medicion['ns_por_llamada']:>12,.0f} ns", file=sys.stderr)
+    for nombre, medicion in informe['rendimiento'].items():
+        print(
+            f"{nombre:<40} {medicion['filas_por_segundo']:>12,.0f} filas/s "
+            f"{medicion['pico_memoria_mb']:>10.1f} MB",
+            file=sys.stderr
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la suite."""
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.motor',
+        description='Benchmarks de latencia, rendimiento y memoria del motor de riesgo'
+    )
+    parser.add_argument('-o', '--output', default='benchmark.json',
+                        help="Archivo JSON del informe (por defecto 'benchmark.json')")
+    parser.add_argument('--tamanos', default=','.join(str(n) for n in TAMANOS),
+                        help='Tamaños de cartera separados por comas')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Corridas cronometradas por medición de rendimiento')
+    parser.add_argument('--semilla', type=int, default=0,
+                        help='Semilla de las carteras sintéticas')
+    parser.add_argument('--comparar', help='Informe de referencia a comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help='Aumento relativo permitido antes de reportar una '
+                             'regresión (por defecto 0.25)')
+    args = parser.parse_args(argv)
+
+    tamanos = [int(n) for n in args.tamanos.split(',') if n]
+    informe = ejecutar(tamanos, args.repeticiones, args.semilla)
+    with open(args.output, 'w', encoding='utf-8') as archivo:
+        json.dump(informe, archivo, indent=2)
+    _imprimir_informe(informe)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(informe, base, args.tolerancia)
+        for regresion in regresiones:
+            print(
+                f"REGRESIÓN {regresion['metrica']}: {regresion['base']:,.3f} → "
+                f"{regresion['actual']:,.3f} ({regresion['cambio']:+.0%})",
+                file=sys.stderr
+            )
+        if regresiones:
+            return 1
+        print("Sin regresiones.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Módulo de puntuación de carteras en segundo plano.
+
+Lee, puntúa y reúne una cartera subida por el usuario en un hilo aparte,
+para que la interfaz muestre el avance sin bloquearse::
+
+    tarea = TareaCartera(archivo, sep=';', decimal=',')
+    tarea.start()
+    while tarea.is_alive():
+        barra.progress(tarea.fraccion)
+
+La tarea no usa Streamlit: la página consulta ``fraccion``, ``estado`` y
+``resultados``, que se actualizan desde el hilo.
+"""
+
+import threading
+from typing import IO, Optional
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.parallel import puntuar_bloques
+from risk_engine.portfolio import es_excel, leer_portafolio, tabla_resultados
+
+# Estados de una tarea
+PENDIENTE = 'pendiente'
+EN_CURSO = 'en_curso'
+TERMINADA = 'terminada'
+FALLIDA = 'fallida'
+CANCELADA = 'cancelada'
+
+
+def estimar_filas(archivo: IO[bytes]) -> Optional[int]:
+    """
+    Estima las filas de datos de una cartera sin parsearla.
+
+    En CSV se cuentan los saltos de línea (las celdas con saltos entre
+    comillas sobrestiman el total); en Excel se usa la dimensión declarada
+    de la primera hoja.
+
+    Args:
+        archivo: Archivo binario con atributo ``name``
+
+    Returns:
+        Filas estimadas (sin encabezado), o None si no se pueden estimar
+    """
+    posicion = archivo.tell()
+    try:
+        if es_excel(archivo):
+            from openpyxl import load_workbook
+
+            libro = load_workbook(archivo, read_only=True)
+            try:
+                maximo = libro.worksheets[0].max_row
+            finally:
+                libro.close()
+            return max(maximo - 1, 0) if maximo else None
+
+        contenido = archivo.read()
+        filas = contenido.count(b'\n')
+        if contenido and not contenido.endswith(b'\n'):
+            filas += 1
+        return max(filas - 1, 0)
+    finally:
+        archivo.seek(posicion)
+
+
+class TareaCartera(threading.Thread):
+    """
+    Hilo que puntúa una cartera CSV/Excel completa.
+
+    Al terminar, ``resultados`` contiene un DataFrame con una fila por
+    empresa en el orden del archivo: la columna identificadora (``col_id``
+    si existe en la cartera; si no, ``fila`` con la posición desde 1), el
+    sector (``col_sector``, si existe), los ratios, ``z_score``, ``zona`` y
+    ``clasificacion``.
+
+    Args:
+        archivo: Archivo binario con atributo ``name`` (.csv, .xlsx)
+        tam_bloque: Filas por bloque leído y puntuado
+        sep: Separador de columnas (solo CSV)
+        decimal: Separador decimal (solo CSV)
+        col_id: Columna identificadora de las empresas
+        col_sector: Columna con el sector de cada empresa (opcional)
+    """
+
+    def __init__(
+        self,
+        archivo: IO[bytes],
+        tam_bloque: int = 50_000,
+        sep: str = ',',
+        decimal: str = '.',
+        col_id: str = 'id',
+        col_sector: str = 'sector'
+    ):
+        super().__init__(daemon=True)
+        self.archivo = archivo
+        self.tam_bloque = tam_bloque
+        self.sep = sep
+        self.decimal = decimal
+        self.col_id = col_id
+        self.col_sector = col_sector
+
+        self.estado = PENDIENTE
+        self.filas = 0
+        self.total: Optional[int] = None
+        self.error: Optional[str] = None
+        self.resultados: Optional[pd.DataFrame] = None
+        self._cancelar = threading.Event()
+
+    @property
+    def fraccion(self) -> float:
+        """Avance entre 0 y 1 según las filas estimadas."""
+        if self.estado == TERMINADA:
+            return 1.0
+        if not self.total:
+            return 0.0
+        return min(self.filas / self.total, 0.99)
+
+    def cancelar(self) -> None:
+        """Pide detener la tarea al terminar el bloque en curso."""
+        self._cancelar.set()
+
+    def run(self) -> None:
+        self.estado = EN_CURSO
+        try:
+            self.total = estimar_filas(self.archivo)
+            tablas = []
+            bloques = leer_portafolio(self.archivo, self.tam_bloque, sep=self.sep,
+                                      decimal=self.decimal, col_id=self.col_id)
+            for bloque, resultados in puntuar_bloques(bloques):
+                if self._cancelar.is_set():
+                    self.estado = CANCELADA
+                    return
+                n_filas = len(resultados['zona'])
+                if self.col_id in bloque:
+                    tabla = tabla_resultados(resultados, bloque[self.col_id], self.col_id)
+                else:
+                    posiciones = np.arange(self.filas + 1, self.filas + n_filas + 1)
+                    tabla = tabla_resultados(resultados, posiciones, 'fila')
+                if self.col_sector in bloque:
+                    tabla.insert(1, self.col_sector, bloque[self.col_sector].to_numpy())
+                tablas.append(tabla)
+                self.filas += n_filas
+
+            if not tablas:
+                raise ValueError("La cartera no tiene filas.")
+            self.resultados = pd.concat(tablas, ignore_index=True)
+            self.estado = TERMINADA
+        except KeyError as exc:
+            self.error = f"Falta la columna obligatoria {exc}."
+            self.estado = FALLIDA
+        except Exception as exc:
+            self.error = str(exc)
+            self.estado = FALLIDA
@@ -0,0 +1,597 @@
+"""
+Módulo de cálculo vectorizado de ratios financieros, Z-Score y clasificación.
+
+Este módulo evalúa los mismos ratios que ``risk_engine.ratios``, el Z-Score de
+``risk_engine.zscore`` y la clasificación de ``risk_engine.classification``
+sobre columnas completas de NumPy (o un DataFrame de pandas) en una sola
+pasada, pensado para puntuar carteras de cientos de miles de empresas.
+
+Convenciones:
+    - Un denominador en cero produce NaN (equivalente al None de las
+      funciones escalares).
+    - Un valor NaN en un campo opcional se trata como campo ausente y se
+      aplica la misma aproximación que usa el cálculo escalar.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from risk_engine.classification import (
+    ETIQUETAS_RIESGO,
+    UMBRAL_ALTO_RIESGO,
+    UMBRAL_BAJO_RIESGO,
+    ZONA_INSUFICIENTE,
+)
+from risk_engine.registry import (
+    CAMPOS_COMPLEMENTARIOS,
+    evaluar,
+    planificar,
+    ratios_disponibles,
+)
+from risk_engine.statements import CAMPOS, FinancialStatement
+
+# Nombres alternativos que el motor acepta como respaldo
+CAMPOS_ALTERNATIVOS = ('activo_total', 'utilidades_retenidas', 'valor_mercado_patrimonio')
+
+# Todos los campos de entrada que lee el motor
+CAMPOS_MOTOR = CAMPOS + CAMPOS_ALTERNATIVOS + CAMPOS_COMPLEMENTARIOS
+
+# Cortes ordenados para searchsorted (zona = posición + 1)
+_CORTES_ZONA = np.array([UMBRAL_ALTO_RIESGO, UMBRAL_BAJO_RIESGO])
+
+
+def _columna(columns: Mapping, nombre: str) -> Optional[np.ndarray]:
+    """
+    Obtiene una columna como arreglo float64, o None si no existe.
+
+    Args:
+        columns: Diccionario de arreglos, DataFrame, arreglo estructurado o
+            FinancialStatementBatch con los datos
+        nombre: Nombre del campo
+
+    Returns:
+        Arreglo float64 con los valores del campo o None si no está presente
+    """
+    if isinstance(columns, np.ndarray):
+        # Arreglo estructurado: los campos son los nombres del dtype
+        if nombre not in (columns.dtype.names or ()):
+            return None
+    elif nombre not in columns:
+        return None
+    return np.asarray(columns[nombre], dtype=np.float64)
+
+
+def _requerida(columns: Mapping, nombre: str) -> np.ndarray:
+    """
+    Obtiene una columna obligatoria, lanzando KeyError si no existe.
+    """
+    valores = _columna(columns, nombre)
+    if valores is None:
+        raise KeyError(nombre)
+    return valores
+
+
+def _con_respaldo(valores: Optional[np.ndarray], respaldo) -> np.ndarray:
+    """
+    Sustituye los valores ausentes (columna inexistente o NaN) por el respaldo.
+
+    Args:
+        valores: Columna opcional o None si el campo no existe
+        respaldo: Arreglo o escalar a usar cuando falta el dato
+
+    Returns:
+        Arreglo con el respaldo aplicado fila a fila
+    """
+    if valores is None:
+        return np.asarray(respaldo, dtype=np.float64)
+    return np.where(np.isnan(valores), respaldo, valores)
+
+
+# Registro de 15 float64 (120 bytes por empresa); NaN indica campo vacío
+DTYPE_ESTADOS = np.dtype([(campo, np.float64) for campo in CAMPOS])
+
+
+class FinancialStatementBatch:
+    """
+    Cartera de estados financieros en un arreglo estructurado de NumPy.
+
+    Es la contraparte columnar de ``FinancialStatement``: cada empresa ocupa
+    un registro de 15 float64 y los campos opcionales vacíos se guardan como
+    NaN. ``compute_ratios``, ``compute_zscore`` y ``puntuar_lote`` la aceptan
+    directamente.
+    """
+
+    __slots__ = ('datos',)
+
+    def __init__(self, datos: np.ndarray):
+        if datos.dtype != DTYPE_ESTADOS:
+            raise TypeError("Se esperaba un arreglo con dtype DTYPE_ESTADOS")
+        self.datos = datos
+
+    @classmethod
+    def vacio(cls, n_filas: int) -> 'FinancialStatementBatch':
+        """
+        Crea una cartera de n_filas con todos los campos en NaN.
+        """
+        datos = np.empty(n_filas, dtype=DTYPE_ESTADOS)
+        datos.view(np.float64)[:] = np.nan
+        return cls(datos)
+
+    @classmethod
+    def desde_columnas(cls, columns: Mapping) -> 'FinancialStatementBatch':
+        """
+        Crea una cartera a partir de columnas (dict de arreglos o DataFrame).
+
+        Args:
+            columns: Datos por columna; los campos ausentes quedan en NaN
+
+        Returns:
+            FinancialStatementBatch con una fila por empresa
+        """
+        if isinstance(columns, dict):
+            n_filas = len(next(iter(columns.values())))
+        else:
+            n_filas = len(columns)
+        lote = cls.vacio(n_filas)
+        for campo in CAMPOS:
+            valores = _columna(columns, campo)
+            if valores is not None:
+                lote.datos[campo] = valores
+        return lote
+
+    @classmethod
+    def desde_estados(cls, estados: Iterable[Mapping]) -> 'FinancialStatementBatch':
+        """
+        Crea una cartera a partir de FinancialStatement o diccionarios.
+
+        Args:
+            estados: Iterable de estados financieros
+
+        Returns:
+            FinancialStatementBatch con una fila por estado
+        """
+        filas = [
+            tuple(np.nan if estado.get(campo) is None else estado[campo] for campo in CAMPOS)
+            for estado in estados
+        ]
+        return cls(np.array(filas, dtype=DTYPE_ESTADOS))
+
+    def estado(self, indice: int) -> FinancialStatement:
+        """
+        Retorna la empresa en la posición indicada como FinancialStatement.
+        """
+        fila = self.datos[indice]
+        return FinancialStatement(**{
+            campo: float(fila[campo])
+            for campo in CAMPOS
+            if not np.isnan(fila[campo])
+        })
+
+    def __contains__(self, campo: str) -> bool:
+        return campo in CAMPOS
+
+    def __getitem__(self, campo: str) -> np.ndarray:
+        return self.datos[campo]
+
+    def __len__(self) -> int:
+        return len(self.datos)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los datos, en bytes."""
+        return self.datos.nbytes
+
+
+def _dividir(
+    numerador,
+    denominador: np.ndarray,
+    ceros: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Divide elemento a elemento dejando NaN donde el denominador es cero.
+
+    Args:
+        numerador: Arreglo (o escalar) del numerador
+        denominador: Arreglo del denominador
+        ceros: Máscara precalculada de ``denominador == 0`` para reutilizarla
+            entre ratios que comparten denominador
+
+    Returns:
+        Arreglo float64 con el cociente o NaN
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resultado = np.divide(numerador, denominador, dtype=np.float64)
+    if ceros is None:
+        ceros = denominador == 0
+    resultado[ceros] = np.nan
+    return resultado
+
+
+def _activo_total(columns: Mapping, n_filas: int) -> np.ndarray:
+    """
+    Resuelve el activo total con la misma cadena de respaldo que el cálculo
+    escalar: ``total_assets`` → ``activo_total`` → 0.
+
+    Args:
+        columns: Diccionario de arreglos o DataFrame con los datos
+        n_filas: Número de filas de la cartera
+
+    Returns:
+        Arreglo float64 con el activo total de cada empresa
+    """
+    activo_total = _con_respaldo(_columna(columns, 'activo_total'), 0.0)
+    activo_total = _con_respaldo(_columna(columns, 'total_assets'), activo_total)
+    return np.broadcast_to(activo_total, (n_filas,))
+
+
+def _campos_presentes(columns: Mapping) -> FrozenSet[str]:
+    """Campos del motor presentes en los datos."""
+    if isinstance(columns, np.ndarray):
+        nombres = columns.dtype.names or ()
+        return frozenset(campo for campo in CAMPOS_MOTOR if campo in nombres)
+    return frozenset(campo for campo in CAMPOS_MOTOR if campo in columns)
+
+
+def _n_filas(columns: Mapping) -> int:
+    """Número de filas de un diccionario de arreglos, DataFrame o lote."""
+    if isinstance(columns, dict):
+        return len(next(iter(columns.values()))) if columns else 0
+    return len(columns)
+
+
+def compute_ratios(
+    columns: Mapping,
+    nombres: Optional[Iterable[str]] = None
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Calcula los ratios financieros de una cartera de forma vectorizada.
+
+    Ejecuta sobre columnas completas el plan de ``risk_engine.registry``: las
+    mismas fórmulas y aproximaciones (inventarios, inventario promedio, costo
+    de ventas, ...) que ``calcular_ratios``. Solo se calculan los ratios
+    cuyas entradas están presentes; las máscaras de denominador en cero se
+    comparten entre los ratios con el mismo denominador.
+
+    Args:
+        columns: Diccionario de arreglos de NumPy, DataFrame de pandas o
+            FinancialStatementBatch con los mismos campos que el formulario
+        nombres: Ratios a calcular (por defecto todos los del registro)
+
+    Returns:
+        Tupla (ratios, validos):
+        - ratios: Diccionario nombre → arreglo float64 (NaN si no calculable)
+        - validos: Diccionario nombre → máscara booleana de valores válidos
+
+    Raises:
+        KeyError: Si falta un campo obligatorio
+        ValueError: Si se pide un ratio que no está en el registro
+    """
+    plan = planificar(
+        _campos_presentes(columns), None if nombres is None else tuple(nombres)
+    )
+    n_filas = _n_filas(columns)
+
+    # Entradas resueltas: las claves presentes, en orden de preferencia, y
+    # la aproximación para los valores ausentes (NaN)
+    entradas: Dict[str, np.ndarray] = {}
+    for paso in plan.pasos:
+        valores = None
+        if paso.respaldo is not None:
+            valores = evaluar(paso.respaldo, entradas)
+        for clave in reversed(paso.claves):
+            columna = _columna(columns, clave)
+            valores = columna if valores is None else _con_respaldo(columna, valores)
+        entradas[paso.entrada] = np.broadcast_to(
+            np.asarray(valores, dtype=np.float64), (n_filas,)
+        )
+
+    ceros: Dict[str, np.ndarray] = {}
+    ratios = {}
+    for ratio in plan.ratios:
+        denominador = ratio.denominador
+        if denominador not in ceros:
+            ceros[denominador] = entradas[denominador] == 0
+        ratios[ratio.nombre] = _dividir(
+            evaluar(ratio.numerador, entradas), entradas[denominador], ceros[denominador]
+        )
+
+    validos = {nombre: ~np.isnan(valores) for nombre, valores in ratios.items()}
+
+    return ratios, validos
+
+
+def z_score_batch(
+    working_capital,
+    retained_earnings,
+    ebit,
+    market_value_equity,
+    total_liabilities,
+    sales,
+    total_assets,
+    decimales: Optional[int] = 3,
+) -> np.ndarray:
+    """
+    Calcula el Z-Score de Altman para millones de empresas en una sola pasada.
+
+    Evalúa la misma fórmula que ``risk_engine.zscore.z_score`` agrupando los
+    cuatro términos con denominador TA y multiplicando una única vez por el
+    recíproco 1/TA:
+
+        Z = (1.2 * WC + 1.4 * RE + 3.3 * EBIT + 1.0 * Sales) / TA +
+            0.6 * (MVE / TL)
+
+    Los cálculos se hacen sobre búferes reutilizados para no crear un
+    arreglo temporal por cada término.
+
+    Args:
+        working_capital: Capital de trabajo
+        retained_earnings: Utilidades retenidas
+        ebit: Utilidad antes de intereses e impuestos
+        market_value_equity: Valor de mercado del patrimonio
+        total_liabilities: Pasivo total
+        sales: Ventas
+        total_assets: Activo total
+        decimales: Decimales de redondeo (3 como la versión escalar) o None
+            para omitir el redondeo
+
+    Returns:
+        Arreglo float64 con el Z-Score, NaN donde TA o TL son cero
+    """
+    total_assets = np.asarray(total_assets, dtype=np.float64)
+    total_liabilities = np.asarray(total_liabilities, dtype=np.float64)
+    forma = np.broadcast_shapes(
+        np.shape(working_capital), np.shape(retained_earnings), np.shape(ebit),
+        np.shape(market_value_equity), total_liabilities.shape,
+        np.shape(sales), total_assets.shape
+    )
+
+    z = np.empty(forma)
+    temporal = np.empty(forma)
+
+    # Numerador común de los términos divididos entre el activo total
+    np.multiply(working_capital, 1.2, out=z)
+    np.multiply(retained_earnings, 1.4, out=temporal)
+    z += temporal
+    np.multiply(ebit, 3.3, out=temporal)
+    z += temporal
+    z += sales
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(1.0, total_assets, out=temporal)
+        z *= temporal
+        np.divide(market_value_equity, total_liabilities, out=temporal)
+        temporal *= 0.6
+        z += temporal
+
+    z[(total_assets == 0) | (total_liabilities == 0)] = np.nan
+
+    if decimales is not None:
+        np.round(z, decimales, out=z)
+
+    return z
+
+
+def compute_zscore(columns: Mapping, decimales: Optional[int] = 3) -> np.ndarray:
+    """
+    Calcula el Z-Score de una cartera con el mismo mapeo de campos que
+    ``calcular_zscore``.
+
+    Args:
+        columns: Diccionario de arreglos de NumPy o DataFrame de pandas
+        decimales: Decimales de redondeo o None para omitirlo
+
+    Returns:
+        Arreglo float64 con el Z-Score (NaN si no es calculable)
+
+    Raises:
+        KeyError: Si falta un campo obligatorio
+    """
+    activo_corriente = _requerida(columns, 'activo_corriente')
+    pasivo_corriente = _requerida(columns, 'pasivo_corriente')
+    patrimonio = _requerida(columns, 'patrimonio')
+    pasivo_total = _requerida(columns, 'pasivo_total')
+    ebit = _requerida(columns, 'ebit')
+    ventas = _requerida(columns, 'ventas')
+    activo_total = _activo_total(columns, activo_corriente.shape[0])
+
+    working_capital = _con_respaldo(
+        _columna(columns, 'working_capital'), activo_corriente - pasivo_corriente
+    )
+    retained_earnings = _con_respaldo(_columna(columns, 'utilidades_retenidas'), 0.0)
+    retained_earnings = _con_respaldo(
+        _columna(columns, 'retained_earnings'), retained_earnings
+    )
+    market_value_equity = _con_respaldo(
+        _columna(columns, 'valor_mercado_patrimonio'), patrimonio
+    )
+    market_value_equity = _con_respaldo(
+        _columna(columns, 'market_value_equity'), market_value_equity
+    )
+    total_liabilities = _con_respaldo(
+        _columna(columns, 'total_liabilities'), pasivo_total
+    )
+
+    return z_score_batch(
+        working_capital=working_capital,
+        retained_earnings=retained_earnings,
+        ebit=ebit,
+        market_value_equity=market_value_equity,
+        total_liabilities=total_liabilities,
+        sales=ventas,
+        total_assets=activo_total,
+        decimales=decimales
+    )
+
+
+def classify_risk_batch(z) -> np.ndarray:
+    """
+    Clasifica un arreglo de Z-Scores en códigos compactos de zona de riesgo.
+
+    Usa ``searchsorted`` sobre los cortes 1.81 / 2.99 con los mismos criterios
+    que ``classify_risk``:
+        - 0: Datos insuficientes (Z es NaN)
+        - 1: Alto riesgo (Z < 1.81)
+        - 2: Zona gris (1.81 <= Z < 2.99)
+        - 3: Zona segura (Z >= 2.99)
+
+    Args:
+        z: Arreglo de Z-Scores (NaN si no fue calculable)
+
+    Returns:
+        Arreglo int8 con el código de zona de cada empresa
+    """
+    z = np.asarray(z, dtype=np.float64)
+    codigos = np.searchsorted(_CORTES_ZONA, z, side='right').astype(np.int8)
+    codigos += 1
+    codigos[np.isnan(z)] = ZONA_INSUFICIENTE
+    return codigos
+
+
+def etiquetas_riesgo(codigos):
+    """
+    Materializa la vista categórica de los códigos de zona.
+
+    Las etiquetas se guardan una sola vez como categorías y cada fila solo
+    referencia su código, por lo que no se crea una cadena por empresa.
+
+    Args:
+        codigos: Arreglo de códigos devuelto por ``classify_risk_batch``
+
+    Returns:
+        pandas.Categorical con las mismas etiquetas que ``classify_risk``
+    """
+    import pandas as pd
+
+    return pd.Categorical.from_codes(codigos, categories=list(ETIQUETAS_RIESGO))
+
+
+def puntuar_lote(
+    columns: Mapping,
+    decimales: Optional[int] = 3,
+    nombres: Optional[Iterable[str]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Ejecuta el análisis completo (ratios, Z-Score y zona de riesgo) sobre un
+    bloque de empresas.
+
+    Equivale a aplicar ``calcular_ratios``, ``calcular_zscore`` y
+    ``classify_risk`` fila a fila.
+
+    Args:
+        columns: Diccionario de arreglos de NumPy o DataFrame de pandas
+        decimales: Decimales de redondeo del Z-Score o None para omitirlo
+        nombres: Ratios a calcular (por defecto todos los del registro)
+
+    Returns:
+        Diccionario con un arreglo por ratio calculable más ``z_score`` y
+        ``zona``
+    """
+    ratios, _ = compute_ratios(columns, nombres)
+    z = compute_zscore(columns, decimales=decimales)
+
+    resultados = dict(ratios)
+    resultados['z_score'] = z
+    resultados['zona'] = classify_risk_batch(z)
+    return resultados
+
+
+def columnas_de_registros(registros: Sequence[Mapping]) -> Dict[str, np.ndarray]:
+    """
+    Convierte una lista de registros (diccionarios por empresa) en columnas.
+
+    Los campos ausentes o None de un registro quedan como NaN, por lo que el
+    motor les aplica las mismas aproximaciones que al diccionario original.
+
+    Args:
+        registros: Diccionarios con las claves de ``get_ejemplo_empresa_saludable``
+
+    Returns:
+        Diccionario campo → arreglo float64, solo con los campos presentes
+        en algún registro
+    """
+    columnas = {}
+    for campo in CAMPOS_MOTOR:
+        valores = [registro.get(campo) for registro in registros]
+        if any(valor is not None for valor in valores):
+            # NumPy convierte None en NaN al usar dtype float64
+            columnas[campo] = np.array(valores, dtype=np.float64)
+    return columnas
+
+
+def ratios_por_fila(
+    resultados: Mapping[str, np.ndarray], columnas: Mapping[str, np.ndarray]
+) -> Tuple[List[Tuple[str, ...]], np.ndarray]:
+    """
+    Agrupa las filas de un lote por los ratios que les corresponden.
+
+    Un lote reúne empresas con campos distintos: los ratios se calculan para
+    todas y quedan NaN donde falta un dato. El análisis escalar, en cambio,
+    omite los ratios cuyas entradas no están en el registro. Aquí cada fila
+    se agrupa por los campos que sí trae (no NaN) y recibe solo los ratios
+    que ``analizar_empresa`` calcularía con ellos.
+
+    Args:
+        resultados: Diccionario devuelto por ``puntuar_lote``
+        columnas: Columnas de entrada del mismo lote
+
+    Returns:
+        Tupla (grupos, indices):
+        - grupos: Nombres de ratios de cada grupo, en el orden de ``resultados``
+        - indices: Grupo de cada fila
+    """
+    nombres = [nombre for nombre in resultados if nombre not in ('z_score', 'zona')]
+    campos = [campo for campo in CAMPOS_MOTOR if campo in columnas]
+    n_filas = len(resultados['zona'])
+    if not campos:
+        return [tuple(nombres)], np.zeros(n_filas, dtype=np.intp)
+
+    # Un bit por campo presente: cada esquema de fila es un entero
+    codigos = np.zeros(n_filas, dtype=np.int64)
+    for bit, campo in enumerate(campos):
+        codigos |= (~np.isnan(columnas[campo])).astype(np.int64) << bit
+    esquemas, indices = np.unique(codigos, return_inverse=True)
+
+    grupos = []
+    for esquema in esquemas.tolist():
+        disponibles = set(ratios_disponibles(
+            campo for bit, campo in enumerate(campos) if esquema >> bit & 1
+        ))
+        grupos.append(tuple(nombre for nombre in nombres if nombre in disponibles))
+    return grupos, indices
+
+
+def registros_de_resultados(
+    resultados: Mapping[str, np.ndarray], columnas: Mapping[str, np.ndarray]
+) -> List[dict]:
+    """
+    Convierte los arreglos de ``puntuar_lote`` en un registro por empresa con
+    la forma de ``risk_engine.pipeline.analizar_empresa``.
+
+    Los NaN se convierten en None, igual que en el cálculo escalar, y cada
+    registro lleva solo los ratios que corresponden a sus campos
+    (``ratios_por_fila``).
+
+    Args:
+        resultados: Diccionario devuelto por ``puntuar_lote``
+        columnas: Columnas de entrada con las que se calcularon
+
+    Returns:
+        Lista de diccionarios con 'ratios', 'zscore' y 'clasificacion'
+    """
+    grupos, indices = ratios_por_fila(resultados, columnas)
+    valores = {nombre: resultados[nombre].tolist() for nombre in set().union(*grupos)}
+
+    registros = []
+    for i, (grupo, z, zona) in enumerate(zip(indices.tolist(), resultados['z_score'].tolist(),
+                                             resultados['zona'].tolist())):
+        ratios = {}
+        for nombre in grupos[grupo]:
+            valor = valores[nombre][i]
+            ratios[nombre] = None if valor != valor else valor
+        registros.append({
+            'ratios': ratios,
+            'zscore': None if z != z else z,
+            'clasificacion': ETIQUETAS_RIESGO[zona],
+        })
+    return registros
@@ -0,0 +1,197 @@
+"""
+Módulo de caché de resultados direccionada por contenido.
+
+Los resultados se indexan por una huella (hash SHA-256) de la forma canónica
+de los datos de entrada, de modo que dos envíos con los mismos valores
+reutilizan el mismo análisis. La caché expulsa las entradas menos usadas
+recientemente (LRU) cuando se supera el presupuesto de bytes configurado.
+
+Como la caché se comparte entre sesiones, por defecto guarda y entrega
+copias profundas de los valores: modificar un resultado obtenido no altera
+el que reciben las demás sesiones.
+"""
+
+import copy
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional
+
+# Tamaño asumido para los valores que no se pueden serializar (estimación
+# conservadora para que igualmente cuenten en el presupuesto de bytes)
+TAMANO_NO_ESTIMABLE = 1024 * 1024
+
+
+def huella_datos(data: Mapping) -> str:
+    """
+    Calcula la huella de contenido de un diccionario de datos.
+
+    Los valores numéricos se normalizan a float para que ``100000`` y
+    ``100000.0`` produzcan la misma huella, y las claves se ordenan.
+
+    Args:
+        data: Diccionario con los datos financieros validados
+
+    Returns:
+        Huella hexadecimal SHA-256
+
+    Examples:
+        >>> huella_datos({'ventas': 100000}) == huella_datos({'ventas': 100000.0})
+        True
+    """
+    canonico = {
+        clave: float(valor) if isinstance(valor, (int, float)) else valor
+        for clave, valor in data.items()
+    }
+    texto = json.dumps(canonico, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def estimar_tamano(valor: Any) -> int:
+    """
+    Estima el tamaño en bytes de un valor a partir de su serialización.
+
+    Si el valor no se puede serializar retorna ``TAMANO_NO_ESTIMABLE``.
+    """
+    try:
+        return len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return TAMANO_NO_ESTIMABLE
+
+
+class CacheResultados:
+    """
+    Caché LRU con presupuesto de bytes y contadores de aciertos/fallos.
+
+    Es segura para uso concurrente desde varias sesiones (hilos) de
+    Streamlit.
+
+    Args:
+        max_bytes: Presupuesto máximo de memoria de las entradas
+        max_entradas: Número máximo de entradas (None = sin límite)
+        copiar: Función que copia un valor al guardarlo y al entregarlo
+            (por defecto ``copy.deepcopy``), o None para compartir el mismo
+            objeto cuando quien lo usa nunca lo modifica
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entradas: Optional[int] = None,
+        copiar: Optional[Callable[[Any], Any]] = copy.deepcopy
+    ):
+        self.max_bytes = max_bytes
+        self.max_entradas = max_entradas
+        self.copiar = copiar
+        self._entradas: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def obtener(self, clave: Hashable, default: Any = None) -> Any:
+        """
+        Retorna el valor asociado a la clave, o default si no existe.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return default
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            valor = entrada[0]
+        return valor if self.copiar is None else self.copiar(valor)
+
+    def guardar(self, clave: Hashable, valor: Any, tamano: Optional[int] = None) -> None:
+        """
+        Guarda un valor, expulsando las entradas más antiguas si es necesario.
+
+        Args:
+            clave: Clave de la entrada (normalmente una huella de contenido)
+            valor: Valor a guardar
+            tamano: Tamaño en bytes; si es None se estima serializando el valor
+        """
+        if tamano is None:
+            tamano = estimar_tamano(valor)
+        if tamano > self.max_bytes:
+            return
+        if self.copiar is not None:
+            valor = self.copiar(valor)
+
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+            self._entradas[clave] = (valor, tamano)
+            self._bytes += tamano
+            self._expulsar()
+
+    def obtener_o_calcular(
+        self,
+        clave: Hashable,
+        calcular: Callable[[], Any],
+        tamano: Optional[int] = None
+    ) -> Any:
+        """
+        Retorna el valor cacheado o lo calcula y lo guarda.
+
+        Args:
+            clave: Clave de la entrada
+            calcular: Función sin argumentos que produce el valor
+            tamano: Tamaño en bytes del valor (opcional)
+
+        Returns:
+            Valor cacheado o recién calculado
+        """
+        faltante = object()
+        valor = self.obtener(clave, faltante)
+        if valor is faltante:
+            valor = calcular()
+            self.guardar(clave, valor, tamano)
+        return valor
+
+    def _expulsar(self) -> None:
+        """Expulsa entradas LRU hasta respetar los límites (con lock tomado)."""
+        while self._entradas and (
+            self._bytes > self.max_bytes
+            or (self.max_entradas is not None and len(self._entradas) > self.max_entradas)
+        ):
+            _, (_, tamano) = self._entradas.popitem(last=False)
+            self._bytes -= tamano
+            self.expulsiones += 1
+
+    def limpiar(self) -> None:
+        """Elimina todas las entradas (los contadores se conservan)."""
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Retorna los contadores de uso de la caché.
+
+        Returns:
+            Diccionario con entradas, bytes, aciertos, fallos, expulsiones y
+            tasa de aciertos
+        """
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'expulsiones': self.expulsiones,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __contains__(self, clave: Hashable) -> bool:
+        return clave in self._entradas
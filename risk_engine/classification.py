@@ -1,5 +1,24 @@
 from typing import Optional
 
+# Umbrales del Z-Score de Altman
+UMBRAL_ALTO_RIESGO = 1.81
+UMBRAL_BAJO_RIESGO = 2.99
+
+# Códigos compactos de zona de riesgo (usados en el cálculo por lotes)
+ZONA_INSUFICIENTE = 0
+ZONA_ALTO_RIESGO = 1
+ZONA_GRIS = 2
+ZONA_SEGURA = 3
+
+# Etiquetas indexadas por código de zona
+ETIQUETAS_RIESGO = (
+    "Datos insuficientes",
+    "⚠️ Alto riesgo (posible quiebra)",
+    "🔶 Riesgo moderado (zona gris)",
+    "🟢 Bajo riesgo (empresa sana)",
+)
+
+
 def classify_risk(z: Optional[float]) -> str:
     """
     Clasifica el nivel de riesgo financiero según el Z-Score de Altman.
@@ -15,10 +34,10 @@ def classify_risk(z: Optional[float]) -> str:
         - "🟢 Bajo riesgo (empresa sana)" si z >= 2.99.
     """
     if z is None:
-        return "Datos insuficientes"
-    if z < 1.81:
-        return "⚠️ Alto riesgo (posible quiebra)"
-    elif z < 2.99:
-        return "🔶 Riesgo moderado (zona gris)"
+        return ETIQUETAS_RIESGO[ZONA_INSUFICIENTE]
+    if z < UMBRAL_ALTO_RIESGO:
+        return ETIQUETAS_RIESGO[ZONA_ALTO_RIESGO]
+    elif z < UMBRAL_BAJO_RIESGO:
+        return ETIQUETAS_RIESGO[ZONA_GRIS]
     else:
-        return "🟢 Bajo riesgo (empresa sana)"
+        return ETIQUETAS_RIESGO[ZONA_SEGURA]
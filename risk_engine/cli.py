@@ -0,0 +1,345 @@
+"""
+Interfaz de línea de comandos para puntuar carteras sin Streamlit.
+
+Uso:
+    python -m risk_engine.cli score cartera.csv -o resultados.parquet
+    python -m risk_engine.cli score cartera.csv -o resultados.parquet --workers 8
+    python -m risk_engine.cli convert cartera.csv -o cartera_brs
+    python -m risk_engine.cli score cartera_brs -o resultados.parquet
+    python -m risk_engine.cli score cartera.csv -o resultados.parquet --estado estado_cartera
+    python -m risk_engine.cli serve --port 8000
+    cat estados.ndjson | python -m risk_engine.cli stream > resultados.ndjson
+    python -m risk_engine.cli generate -n 1000000 -o cartera.csv --mezcla 0.2,0.3,0.5
+
+La cartera se lee y se escribe por bloques, por lo que archivos de varios GB
+se procesan con memoria acotada.
+"""
+
+import argparse
+import os
+import sys
+import time
+from contextlib import nullcontext
+from typing import List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from risk_engine.columnar import PortafolioColumnar, convertir_portafolio, es_portafolio_columnar
+from risk_engine.incremental import PuntuadorIncremental
+from risk_engine.parallel import puntuar_bloques
+from risk_engine.portfolio import crear_escritor, leer_portafolio, tabla_resultados
+
+
+def _pico_memoria_mb() -> Optional[float]:
+    """
+    Retorna el pico de memoria residente (RSS) del proceso en MB, o None si
+    la plataforma no lo permite.
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB; macOS reporta bytes
+    if sys.platform == 'darwin':
+        return pico / (1024 * 1024)
+    return pico / 1024
+
+
+def comando_score(args: argparse.Namespace) -> int:
+    """
+    Puntúa la cartera bloque a bloque y escribe los resultados de forma
+    incremental.
+
+    Args:
+        args: Argumentos del subcomando ``score``
+
+    Returns:
+        Código de salida del proceso
+    """
+    inicio = time.perf_counter()
+    filas = 0
+    puntuador = None
+
+    try:
+        if es_portafolio_columnar(args.input):
+            cartera = PortafolioColumnar(args.input)
+            if cartera.col_id is not None and cartera.col_id != args.id_col:
+                raise ValueError(
+                    f"La cartera columnar se convirtió con --id-col '{cartera.col_id}', "
+                    f"no '{args.id_col}'."
+                )
+            bloques = cartera.bloques(args.tam_bloque)
+        else:
+            bloques = leer_portafolio(args.input, args.tam_bloque, sep=args.sep,
+                                      decimal=args.decimal, col_id=args.id_col)
+        if args.estado:
+            puntuador = PuntuadorIncremental(args.estado)
+        with puntuador or nullcontext(), \
+                crear_escritor(args.output, sep=args.sep, decimal=args.decimal) as escritor:
+            if puntuador is not None:
+                puntuados = (
+                    (bloque, puntuador.puntuar(bloque, bloque[args.id_col]))
+                    for bloque in bloques
+                )
+            else:
+                puntuados = puntuar_bloques(bloques, workers=args.workers)
+
+            for bloque, resultados in puntuados:
+                identificadores = bloque[args.id_col] if args.id_col in bloque else None
+                escritor.escribir(tabla_resultados(resultados, identificadores, args.id_col))
+
+                filas += len(resultados['zona'])
+                if not args.quiet:
+                    print(f"\r{filas:,} filas procesadas...", end='', file=sys.stderr)
+    except KeyError as exc:
+        print(f"\nError: falta la columna obligatoria {exc}", file=sys.stderr)
+        return 2
+    except (OSError, ValueError) as exc:
+        print(f"\nError: {exc}", file=sys.stderr)
+        return 1
+
+    segundos = time.perf_counter() - inicio
+    if not args.quiet:
+        print(file=sys.stderr)
+    pico = _pico_memoria_mb()
+    print(
+        f"Filas: {filas:,} | Tiempo: {segundos:.2f} s | "
+        f"Filas/s: {filas / segundos if segundos > 0 else 0:,.0f} | "
+        f"Pico RSS: {f'{pico:.1f} MB' if pico is not None else 'N/D'}",
+        file=sys.stderr
+    )
+    if puntuador is not None:
+        print(
+            f"Recalculadas: {puntuador.estadisticas['recalculadas']:,} | "
+            f"Reutilizadas: {puntuador.estadisticas['reutilizadas']:,}",
+            file=sys.stderr
+        )
+    return 0
+
+
+def comando_convert(args: argparse.Namespace) -> int:
+    """
+    Convierte una cartera CSV/Excel al formato columnar mapeable en memoria.
+
+    Args:
+        args: Argumentos del subcomando ``convert``
+
+    Returns:
+        Código de salida del proceso
+    """
+    inicio = time.perf_counter()
+    try:
+        cabecera = convertir_portafolio(
+            args.input, args.output, args.tam_bloque,
+            sep=args.sep, decimal=args.decimal, col_id=args.id_col
+        )
+    except KeyError as exc:
+        print(f"Error: falta la columna {exc}", file=sys.stderr)
+        return 2
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    print(
+        f"Filas: {cabecera['n_filas']:,} | Campos: {len(cabecera['campos'])} | "
+        f"Tiempo: {time.perf_counter() - inicio:.2f} s",
+        file=sys.stderr
+    )
+    return 0
+
+
+def comando_serve(args: argparse.Namespace) -> int:
+    """
+    Inicia el servicio HTTP de puntuación.
+
+    Args:
+        args: Argumentos del subcomando ``serve``
+
+    Returns:
+        Código de salida del proceso
+    """
+    from risk_engine.service import servir
+
+    servir(args.host, args.port, tam_lote=args.tam_lote, espera_ms=args.espera_ms)
+    return 0
+
+
+def comando_stream(args: argparse.Namespace) -> int:
+    """
+    Puntúa NDJSON de la entrada estándar y escribe NDJSON en la salida.
+
+    Args:
+        args: Argumentos del subcomando ``stream``
+
+    Returns:
+        Código de salida del proceso
+    """
+    from risk_engine.stream import filtrar_ndjson
+
+    try:
+        estadisticas = filtrar_ndjson(
+            sys.stdin.fileno(), sys.stdout.buffer,
+            tam_lote=args.tam_lote, espera_ms=args.espera_ms, col_id=args.id_col
+        )
+    except BrokenPipeError:
+        # El consumidor cerró la salida (por ejemplo, `| head`)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+    if not args.quiet:
+        print(
+            f"Líneas: {estadisticas['lineas']:,} | Errores: {estadisticas['errores']:,} | "
+            f"Lotes: {estadisticas['lotes']:,}",
+            file=sys.stderr
+        )
+    return 0
+
+
+def comando_generate(args: argparse.Namespace) -> int:
+    """
+    Genera una cartera sintética por bloques para pruebas de carga.
+
+    Args:
+        args: Argumentos del subcomando ``generate``
+
+    Returns:
+        Código de salida del proceso
+    """
+    import pandas as pd
+
+    from utils.sample_data import generar_cartera
+
+    inicio = time.perf_counter()
+    filas = 0
+    try:
+        mezcla = [float(valor) for valor in args.mezcla.split(',')]
+        with crear_escritor(args.output, sep=args.sep, decimal=args.decimal) as escritor:
+            for bloque in generar_cartera(args.filas, args.tam_bloque,
+                                          semilla=args.semilla, mezcla=mezcla):
+                escritor.escribir(pd.DataFrame(bloque))
+                filas += len(bloque['id'])
+                if not args.quiet:
+                    print(f"\r{filas:,} filas generadas...", end='', file=sys.stderr)
+    except (OSError, ValueError) as exc:
+        print(f"\nError: {exc}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"Filas: {filas:,} | Tiempo: {time.perf_counter() - inicio:.2f} s", file=sys.stderr)
+    return 0
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    """
+    Construye el parser de argumentos de la CLI.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m risk_engine.cli',
+        description='Business Risk Scanner - puntuación masiva de carteras'
+    )
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    score = subparsers.add_parser(
+        'score',
+        help='Calcula ratios, Z-Score y clasificación para una cartera CSV/Excel'
+    )
+    score.add_argument('input',
+                       help='Archivo de entrada (.csv o .xlsx) o directorio columnar')
+    score.add_argument('-o', '--output', required=True,
+                       help='Archivo de salida (.parquet, .csv o .xlsx)')
+    score.add_argument('--tam-bloque', type=int, default=100_000,
+                       help='Filas por bloque (por defecto 100000)')
+    score.add_argument('-w', '--workers', type=int, default=1,
+                       help='Procesos de puntuación (0 = todos los núcleos; por defecto 1)')
+    score.add_argument('--id-col', default='id',
+                       help="Columna identificadora a conservar (por defecto 'id')")
+    score.add_argument('--sep', default=',', help='Separador de columnas CSV')
+    score.add_argument('--decimal', default='.', help='Separador decimal CSV')
+    score.add_argument('--estado',
+                       help='Directorio de estado para repuntuar solo las empresas '
+                            'modificadas desde la corrida anterior (requiere --id-col; '
+                            'no admite --workers)')
+    score.add_argument('-q', '--quiet', action='store_true',
+                       help='No mostrar el progreso')
+    score.set_defaults(funcion=comando_score)
+
+    convert = subparsers.add_parser(
+        'convert',
+        help='Convierte una cartera CSV/Excel al formato columnar (.npy por campo)'
+    )
+    convert.add_argument('input', help='Archivo de entrada (.csv o .xlsx)')
+    convert.add_argument('-o', '--output', required=True, help='Directorio de salida')
+    convert.add_argument('--tam-bloque', type=int, default=100_000,
+                         help='Filas por bloque (por defecto 100000)')
+    convert.add_argument('--id-col', default='id',
+                         help="Columna identificadora a conservar (por defecto 'id')")
+    convert.add_argument('--sep', default=',', help='Separador de columnas CSV')
+    convert.add_argument('--decimal', default='.', help='Separador decimal CSV')
+    convert.set_defaults(funcion=comando_convert)
+
+    serve = subparsers.add_parser(
+        'serve',
+        help='Inicia el servicio HTTP de puntuación (POST /score y /score/batch)'
+    )
+    serve.add_argument('--host', default='127.0.0.1', help='Dirección de escucha')
+    serve.add_argument('--port', type=int, default=8000, help='Puerto (por defecto 8000)')
+    serve.add_argument('--tam-lote', type=int, default=512,
+                       help='Solicitudes máximas por lote vectorizado (por defecto 512)')
+    serve.add_argument('--espera-ms', type=float, default=0.0,
+                       help='Espera máxima para agrupar solicitudes (por defecto 0: '
+                            'se agrupan las que llegan en el mismo ciclo)')
+    serve.set_defaults(funcion=comando_serve)
+
+    stream = subparsers.add_parser(
+        'stream',
+        help='Filtro NDJSON: lee estados de stdin y escribe resultados en stdout'
+    )
+    stream.add_argument('--tam-lote', type=int, default=1000,
+                        help='Líneas máximas por lote (por defecto 1000)')
+    stream.add_argument('--espera-ms', type=float, default=0.0,
+                        help='Espera sin datos antes de emitir un lote incompleto '
+                             '(por defecto 0)')
+    stream.add_argument('--id-col', default='id',
+                        help="Clave identificadora a copiar en cada resultado (por defecto 'id')")
+    stream.add_argument('-q', '--quiet', action='store_true',
+                        help='No mostrar el resumen final')
+    stream.set_defaults(funcion=comando_stream)
+
+    generate = subparsers.add_parser(
+        'generate',
+        help='Genera una cartera sintética coherente para pruebas de carga'
+    )
+    generate.add_argument('-n', '--filas', type=int, required=True, help='Número de empresas')
+    generate.add_argument('-o', '--output', required=True,
+                          help='Archivo de salida (.parquet, .csv o .xlsx)')
+    generate.add_argument('--mezcla', default='0.2,0.3,0.5',
+                          help='Proporciones de empresas en zona de alto riesgo, gris y '
+                               'segura (por defecto 0.2,0.3,0.5)')
+    generate.add_argument('--semilla', type=int, default=0, help='Semilla del generador')
+    generate.add_argument('--tam-bloque', type=int, default=100_000,
+                          help='Filas por bloque (por defecto 100000)')
+    generate.add_argument('--sep', default=',', help='Separador de columnas CSV')
+    generate.add_argument('--decimal', default='.', help='Separador decimal CSV')
+    generate.add_argument('-q', '--quiet', action='store_true',
+                          help='No mostrar el progreso')
+    generate.set_defaults(funcion=comando_generate)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la CLI."""
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    # La repuntuación incremental se hace en el proceso principal
+    if args.comando == 'score' and args.estado and args.workers != 1:
+        parser.error("--estado no admite --workers: la repuntuación incremental "
+                     "se hace en un solo proceso")
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
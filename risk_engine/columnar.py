@@ -0,0 +1,360 @@
+"""
+Módulo de formato columnar binario para carteras.
+
+Una cartera convertida es un directorio con un ``.npy`` float64 por campo de
+entrada y una cabecera ``cabecera.json``::
+
+    cartera_brs/
+        cabecera.json
+        activo_corriente.npy
+        pasivo_corriente.npy
+        ...
+        id.npy            (identificadores enteros)
+
+Si no todos los identificadores son enteros, se guardan como texto UTF-8 en
+tres ``.npy``: los bytes concatenados (``id_utf8.npy``), el desplazamiento
+de inicio de cada uno más el final (``id_desplazamientos.npy``, n + 1
+valores) y una máscara de faltantes (``id_nulos.npy``). Así cualquier texto,
+incluidos saltos de línea, conserva su fila, y solo se decodifican los
+tramos que se leen.
+
+Los ``.npy`` se abren con ``np.load(mmap_mode='r')``: abrir la cartera toma
+milisegundos y el sistema operativo solo carga las páginas que el motor lee,
+por lo que puntuarla varias veces no requiere volver a parsear el CSV ni
+materializar los datos en RAM.
+"""
+
+import json
+import os
+import shutil
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib import format as formato_npy
+
+from risk_engine.batch import CAMPOS_MOTOR
+from risk_engine.portfolio import leer_portafolio
+
+FORMATO = 'brs-columnar'
+VERSION = 2
+ARCHIVO_CABECERA = 'cabecera.json'
+
+# Identificador que se guarda como int64 sin cambiar su texto (hasta 18 dígitos)
+_PATRON_ENTERO = r'-?(0|[1-9][0-9]{0,17})'
+
+# Archivos de los identificadores de texto y su tipo
+_ARCHIVOS_ID_TEXTO = {
+    'id_utf8': np.uint8,
+    'id_desplazamientos': np.int64,
+    'id_nulos': np.bool_,
+}
+
+
+def es_portafolio_columnar(ruta: str) -> bool:
+    """Indica si la ruta es un directorio con formato columnar."""
+    return os.path.isfile(os.path.join(ruta, ARCHIVO_CABECERA))
+
+
+class EscritorNpy:
+    """
+    Escribe un ``.npy`` 1-D añadiendo bloques al final.
+
+    La cabecera se escribe con forma (0,) y se reescribe al cerrar con el
+    número real de filas; NumPy reserva espacio en la cabecera para que su
+    longitud no cambie.
+    """
+
+    def __init__(self, ruta: str, dtype):
+        self.dtype = np.dtype(dtype)
+        self.n_filas = 0
+        self._archivo = open(ruta, 'wb')
+        self._largo_cabecera = self._escribir_cabecera()
+
+    def _escribir_cabecera(self) -> int:
+        self._archivo.seek(0)
+        formato_npy.write_array_header_1_0(self._archivo, {
+            'descr': formato_npy.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (self.n_filas,),
+        })
+        return self._archivo.tell()
+
+    def escribir(self, valores: np.ndarray) -> None:
+        valores = np.ascontiguousarray(valores, dtype=self.dtype)
+        self._archivo.write(valores.tobytes())
+        self.n_filas += len(valores)
+
+    def cerrar(self) -> None:
+        fin = self._archivo.tell()
+        if self._escribir_cabecera() != self._largo_cabecera:
+            raise ValueError("La cabecera .npy cambió de longitud al cerrar.")
+        self._archivo.seek(fin)
+        self._archivo.close()
+
+
+class EscritorIdsTexto:
+    """
+    Escribe identificadores de texto como UTF-8 concatenado, desplazamientos
+    y máscara de faltantes, añadiendo bloques al final.
+
+    Args:
+        directorio: Directorio de la cartera
+    """
+
+    def __init__(self, directorio: str):
+        self.rutas = [os.path.join(directorio, f'{nombre}.npy') for nombre in _ARCHIVOS_ID_TEXTO]
+        self._escritores = {}
+        for nombre, ruta in zip(_ARCHIVOS_ID_TEXTO, self.rutas):
+            self._escritores[nombre] = EscritorNpy(ruta, _ARCHIVOS_ID_TEXTO[nombre])
+        self._escritores['id_desplazamientos'].escribir(np.zeros(1))
+        self._fin = 0
+
+    def escribir(self, ids: pd.Series) -> None:
+        nulos = ids.isna().to_numpy()
+        codificados = [
+            b'' if nulo else str(valor).encode('utf-8')
+            for valor, nulo in zip(ids.tolist(), nulos.tolist())
+        ]
+        largos = np.fromiter(map(len, codificados), dtype=np.int64, count=len(codificados))
+        self._escritores['id_utf8'].escribir(np.frombuffer(b''.join(codificados), np.uint8))
+        self._escritores['id_desplazamientos'].escribir(self._fin + np.cumsum(largos))
+        self._escritores['id_nulos'].escribir(nulos)
+        self._fin += int(largos.sum())
+
+    def cerrar(self) -> None:
+        for escritor in self._escritores.values():
+            escritor.cerrar()
+
+
+class IdentificadoresTexto:
+    """
+    Identificadores de texto de una cartera columnar, mapeados en memoria.
+
+    Se indexa por tramos (``ids[inicio:fin]``) y solo decodifica las filas
+    del tramo; los faltantes se retornan como None.
+
+    Args:
+        directorio: Directorio de la cartera
+    """
+
+    def __init__(self, directorio: str):
+        arreglos = {
+            nombre: np.load(os.path.join(directorio, f'{nombre}.npy'), mmap_mode='r')
+            for nombre in _ARCHIVOS_ID_TEXTO
+        }
+        self.utf8 = arreglos['id_utf8']
+        self.desplazamientos = arreglos['id_desplazamientos']
+        self.nulos = arreglos['id_nulos']
+
+    def __len__(self) -> int:
+        return len(self.nulos)
+
+    def __getitem__(self, tramo: slice) -> np.ndarray:
+        inicio, fin, paso = tramo.indices(len(self))
+        if paso != 1:
+            raise ValueError("Los identificadores solo se leen por tramos contiguos.")
+        fin = max(fin, inicio)
+
+        limites = self.desplazamientos[inicio:fin + 1].tolist()
+        datos = self.utf8[limites[0]:limites[-1]].tobytes()
+        base = limites[0]
+        ids = np.empty(fin - inicio, dtype=object)
+        ids[:] = [
+            datos[desde - base:hasta - base].decode('utf-8')
+            for desde, hasta in zip(limites[:-1], limites[1:])
+        ]
+        ids[np.asarray(self.nulos[inicio:fin])] = None
+        return ids
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+def _ids_enteros(ids: pd.Series) -> bool:
+    """
+    Indica si todos los identificadores (texto) son enteros que se pueden
+    guardar como int64 sin cambiar su texto (sin ceros a la izquierda ni
+    valores faltantes).
+    """
+    return bool(ids.notna().all()
+                and ids.str.fullmatch(_PATRON_ENTERO).all())
+
+
+def convertir_portafolio(
+    ruta: str,
+    directorio: str,
+    tam_bloque: int = 100_000,
+    sep: str = ',',
+    decimal: str = '.',
+    col_id: Optional[str] = 'id'
+) -> dict:
+    """
+    Convierte una cartera CSV/Excel al formato columnar, bloque a bloque.
+
+    Se guardan los campos que usa el motor presentes en la cartera (los
+    opcionales ausentes quedan como NaN y el motor aplica sus
+    aproximaciones) y, si existe, la columna identificadora.
+
+    Los identificadores se guardan como texto (``EscritorIdsTexto``), salvo
+    que la columna completa sea de enteros: entonces se guardan en
+    ``id.npy``. Como el tipo se conoce solo al terminar, mientras todos los
+    bloques son enteros se escriben ambos formatos y al final se descarta
+    uno.
+
+    Si la conversión falla se eliminan los archivos escritos (y el
+    directorio, si lo creó la conversión).
+
+    Args:
+        ruta: Archivo de entrada (.csv o .xlsx)
+        directorio: Directorio de salida (se crea si no existe)
+        tam_bloque: Filas por bloque de lectura
+        sep: Separador de columnas (solo CSV)
+        decimal: Separador decimal (solo CSV)
+        col_id: Columna identificadora a conservar, o None
+
+    Returns:
+        Cabecera escrita en ``cabecera.json``
+
+    Raises:
+        ValueError: Si la cartera no contiene ningún campo del motor
+    """
+    creado = not os.path.isdir(directorio)
+    os.makedirs(directorio, exist_ok=True)
+    # Una cabecera anterior no debe apuntar a archivos a medio reescribir
+    cabecera_anterior = os.path.join(directorio, ARCHIVO_CABECERA)
+    if os.path.exists(cabecera_anterior):
+        os.remove(cabecera_anterior)
+
+    escritores: Dict[str, EscritorNpy] = {}
+    campos: List[str] = []
+    id_numerico = None
+    ids_texto = None
+    escritos: List[str] = []
+
+    try:
+        try:
+            for bloque in leer_portafolio(ruta, tam_bloque, sep=sep, decimal=decimal,
+                                          col_id=col_id):
+                if not campos:
+                    campos = [campo for campo in CAMPOS_MOTOR if campo in bloque]
+                    if not campos:
+                        raise ValueError(
+                            "La cartera no contiene columnas financieras reconocidas."
+                        )
+                    for campo in campos:
+                        escritos.append(os.path.join(directorio, f'{campo}.npy'))
+                        escritores[campo] = EscritorNpy(escritos[-1], np.float64)
+                    if col_id and col_id in bloque:
+                        id_numerico = True
+                        ids_texto = EscritorIdsTexto(directorio)
+                        escritos.extend(ids_texto.rutas)
+                        escritos.append(os.path.join(directorio, 'id.npy'))
+                        escritores[col_id] = EscritorNpy(escritos[-1], np.int64)
+
+                for campo in campos:
+                    escritores[campo].escribir(bloque[campo].to_numpy(dtype=np.float64))
+                if ids_texto is not None:
+                    ids = bloque[col_id]
+                    ids_texto.escribir(ids)
+                    if id_numerico and not _ids_enteros(ids):
+                        id_numerico = False
+                        escritores.pop(col_id).cerrar()
+                    if id_numerico:
+                        escritores[col_id].escribir(ids.to_numpy(dtype=np.int64))
+        finally:
+            for escritor in escritores.values():
+                escritor.cerrar()
+            if ids_texto is not None:
+                ids_texto.cerrar()
+
+        if not campos:
+            raise ValueError("La cartera está vacía.")
+    except BaseException:
+        if creado:
+            shutil.rmtree(directorio, ignore_errors=True)
+        else:
+            for archivo in escritos:
+                if os.path.exists(archivo):
+                    os.remove(archivo)
+        raise
+
+    if id_numerico is not None:
+        for ruta_id in ids_texto.rutas if id_numerico else [os.path.join(directorio, 'id.npy')]:
+            os.remove(ruta_id)
+
+    cabecera = {
+        'formato': FORMATO,
+        'version': VERSION,
+        'n_filas': escritores[campos[0]].n_filas,
+        'campos': campos,
+        'id': None if id_numerico is None else {
+            'columna': col_id,
+            'tipo': 'entero' if id_numerico else 'texto',
+        },
+    }
+    with open(os.path.join(directorio, ARCHIVO_CABECERA), 'w', encoding='utf-8') as archivo:
+        json.dump(cabecera, archivo, ensure_ascii=False, indent=2)
+    return cabecera
+
+
+class PortafolioColumnar:
+    """
+    Cartera en formato columnar abierta como arreglos mapeados en memoria.
+
+    Examples:
+        >>> cartera = PortafolioColumnar('cartera_brs')
+        >>> for bloque in cartera.bloques(500_000):
+        ...     resultados = puntuar_lote(bloque)
+    """
+
+    def __init__(self, directorio: str):
+        with open(os.path.join(directorio, ARCHIVO_CABECERA), encoding='utf-8') as archivo:
+            cabecera = json.load(archivo)
+        if cabecera.get('formato') != FORMATO or cabecera.get('version') != VERSION:
+            raise ValueError(f"'{directorio}' no es una cartera columnar compatible.")
+
+        self.directorio = directorio
+        self.cabecera = cabecera
+        self.n_filas = cabecera['n_filas']
+        self.columnas: Dict[str, np.ndarray] = {
+            campo: np.load(os.path.join(directorio, f'{campo}.npy'), mmap_mode='r')
+            for campo in cabecera['campos']
+        }
+
+    @property
+    def col_id(self) -> Optional[str]:
+        """Nombre de la columna identificadora, o None si no se guardó."""
+        return self.cabecera['id']['columna'] if self.cabecera['id'] else None
+
+    def identificadores(self):
+        """
+        Retorna los identificadores mapeados en memoria: un arreglo int64 si
+        son enteros, o ``IdentificadoresTexto``, o None si no se guardaron.
+        """
+        if not self.cabecera['id']:
+            return None
+        if self.cabecera['id']['tipo'] == 'entero':
+            return np.load(os.path.join(self.directorio, 'id.npy'), mmap_mode='r')
+        return IdentificadoresTexto(self.directorio)
+
+    def bloques(self, tam_bloque: int = 1_000_000) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Recorre la cartera en bloques de vistas sobre los arreglos mapeados.
+
+        Args:
+            tam_bloque: Filas por bloque
+
+        Yields:
+            Diccionario campo → vista float64 (más la columna identificadora)
+        """
+        ids = self.identificadores()
+        for inicio in range(0, self.n_filas, tam_bloque):
+            fin = min(inicio + tam_bloque, self.n_filas)
+            bloque = {campo: valores[inicio:fin] for campo, valores in self.columnas.items()}
+            if ids is not None:
+                bloque[self.col_id] = ids[inicio:fin]
+            yield bloque
+
+    def __len__(self) -> int:
+        return self.n_filas
@@ -0,0 +1,319 @@
+"""
+Módulo de repuntuación incremental de carteras.
+
+Cada corrida guarda, por empresa, una huella de 64 bits de su identificador,
+una huella de 64 bits de sus campos de entrada y los resultados calculados.
+En la corrida siguiente solo se recalculan las filas cuya huella de entrada
+cambió (o que son nuevas); el resto reutiliza el resultado guardado.
+
+Como los resultados dependen únicamente de los campos de entrada, reutilizar
+una fila exige que su huella de entrada coincida: un identificador repetido o
+una colisión de identificadores nunca produce resultados de otra empresa.
+
+El estado es un directorio de ``.npy`` (abiertos con ``mmap_mode='r'``) más
+``estado.json``; se escribe por bloques junto con la salida y reemplaza al
+anterior solo cuando la corrida termina sin errores. Guarda todos los ratios
+calculables con las columnas de la cartera, igual que una puntuación sin
+estado, y se descarta si la cartera cambia de columnas.
+"""
+
+import json
+import os
+import shutil
+from typing import Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.batch import CAMPOS_MOTOR, puntuar_lote
+from risk_engine.classification import UMBRAL_ALTO_RIESGO, UMBRAL_BAJO_RIESGO
+from risk_engine.columnar import EscritorNpy
+from risk_engine.parallel import columnas_motor
+from risk_engine.shared import columnas_salida
+
+FORMATO = 'brs-incremental'
+VERSION = 3
+ARCHIVO_ESTADO = 'estado.json'
+
+# Constantes de mezcla de 64 bits (splitmix64)
+_MULT_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MULT_2 = np.uint64(0x94D049BB133111EB)
+_NAN_CANONICO = np.float64(np.nan).view(np.uint64)
+
+
+def _mezclar(h: np.ndarray) -> np.ndarray:
+    """Finalizador splitmix64, aplicado en el lugar."""
+    h ^= h >> np.uint64(30)
+    h *= _MULT_1
+    h ^= h >> np.uint64(27)
+    h *= _MULT_2
+    h ^= h >> np.uint64(31)
+    return h
+
+
+def huellas_filas(columnas: Mapping[str, np.ndarray], n_filas: int) -> np.ndarray:
+    """
+    Calcula una huella uint64 por fila a partir de los campos del motor.
+
+    Un campo ausente y un campo con NaN producen la misma huella, igual que
+    el motor les aplica la misma aproximación; -0.0 y 0.0 también coinciden.
+
+    Args:
+        columnas: Diccionario campo → arreglo float64
+        n_filas: Número de filas
+
+    Returns:
+        Arreglo uint64 con la huella de cada fila
+    """
+    h = np.zeros(n_filas, dtype=np.uint64)
+    for i, campo in enumerate(CAMPOS_MOTOR):
+        if campo in columnas:
+            # Sumar 0.0 normaliza -0.0 y produce una copia modificable
+            valores = np.asarray(columnas[campo], dtype=np.float64) + 0.0
+            bits = valores.view(np.uint64)
+            bits[np.isnan(valores)] = _NAN_CANONICO
+        else:
+            bits = np.full(n_filas, _NAN_CANONICO, dtype=np.uint64)
+        h += bits ^ np.uint64(i + 1)
+        _mezclar(h)
+    return h
+
+
+def huellas_ids(identificadores) -> np.ndarray:
+    """
+    Calcula una huella uint64 por identificador (numérico o de texto).
+    """
+    ids = np.asarray(identificadores)
+    if ids.dtype.kind in 'US':
+        ids = ids.astype(object)
+    return pd.util.hash_array(ids)
+
+
+def _cargar(directorio: str, nombre: str) -> np.ndarray:
+    """Abre un arreglo del estado mapeado en memoria."""
+    return np.load(os.path.join(directorio, f'{nombre}.npy'), mmap_mode='r')
+
+
+class EstadoIncremental:
+    """
+    Estado guardado de una corrida anterior, mapeado en memoria.
+
+    Args:
+        directorio: Directorio con ``estado.json`` y los ``.npy``
+    """
+
+    def __init__(self, directorio: str):
+        with open(os.path.join(directorio, ARCHIVO_ESTADO), encoding='utf-8') as archivo:
+            self.meta = json.load(archivo)
+
+        self.huellas = _cargar(directorio, 'huella')
+        # Sin columnas (cartera vacía) no hay resultados guardados
+        self.columnas = tuple(self.meta.get('columnas', ()))
+        self.resultados = {
+            nombre: _cargar(directorio, nombre) for nombre in self.columnas + ('zona',)
+        } if self.columnas else {}
+
+        self.ids = _cargar(directorio, 'id_huella')
+        self._orden = None
+        self._ids_ordenados = None
+
+    @staticmethod
+    def existe(directorio: str) -> bool:
+        """Indica si el directorio contiene un estado guardado."""
+        return os.path.isfile(os.path.join(directorio, ARCHIVO_ESTADO))
+
+    def buscar(self, ids: np.ndarray, inicio: int = 0):
+        """
+        Ubica huellas de identificador en el estado.
+
+        Primero compara contra las filas en la misma posición de la corrida
+        anterior (el caso habitual, en que la cartera conserva su orden) y
+        solo busca por índice ordenado las filas que no coinciden.
+
+        Args:
+            ids: Huellas de identificador del bloque
+            inicio: Posición del bloque dentro de la cartera
+
+        Returns:
+            Tupla (posiciones, encontrados); las posiciones solo son válidas
+            donde encontrados es True
+        """
+        n_filas = len(ids)
+        posiciones = np.arange(inicio, inicio + n_filas)
+        encontrados = np.zeros(n_filas, dtype=bool)
+
+        previos = self.ids[inicio:inicio + n_filas]
+        encontrados[:len(previos)] = previos == ids[:len(previos)]
+
+        faltantes = np.flatnonzero(~encontrados)
+        if faltantes.size and len(self.ids):
+            if self._orden is None:
+                self._orden = np.argsort(self.ids, kind='stable')
+                self._ids_ordenados = self.ids[self._orden]
+            indices = np.searchsorted(self._ids_ordenados, ids[faltantes])
+            indices = np.minimum(indices, len(self._ids_ordenados) - 1)
+            encontrados[faltantes] = self._ids_ordenados[indices] == ids[faltantes]
+            posiciones[faltantes] = self._orden[indices]
+        return posiciones, encontrados
+
+
+def _meta_motor(decimales: Optional[int]) -> dict:
+    """Parámetros del motor que invalidan el estado si cambian."""
+    return {
+        'formato': FORMATO,
+        'version': VERSION,
+        'decimales': decimales,
+        'umbrales': [UMBRAL_ALTO_RIESGO, UMBRAL_BAJO_RIESGO],
+    }
+
+
+class PuntuadorIncremental:
+    """
+    Puntúa una cartera por bloques reutilizando los resultados de la corrida
+    anterior guardada en ``directorio``.
+
+    Si el estado no existe, fue generado con otros parámetros del motor
+    (decimales, umbrales) o con otras columnas de salida, todas las filas se
+    recalculan. Las columnas de salida son los ratios calculables con los
+    campos del primer bloque y el Z-Score, como en ``puntuar_lote``.
+
+    Examples:
+        >>> with PuntuadorIncremental('estado_cartera') as puntuador:
+        ...     for bloque in leer_portafolio('cartera.csv'):
+        ...         resultados = puntuador.puntuar(bloque, bloque['id'])
+        >>> puntuador.estadisticas
+        {'filas': 1000000, 'recalculadas': 31250, 'reutilizadas': 968750}
+    """
+
+    def __init__(self, directorio: str, decimales: Optional[int] = 3):
+        self.directorio = directorio
+        self.decimales = decimales
+        self.previo: Optional[EstadoIncremental] = None
+        if EstadoIncremental.existe(directorio):
+            previo = EstadoIncremental(directorio)
+            if {k: previo.meta.get(k) for k in _meta_motor(decimales)} == _meta_motor(decimales):
+                self.previo = previo
+
+        self._temporal = directorio.rstrip('/\\') + '.nuevo'
+        shutil.rmtree(self._temporal, ignore_errors=True)
+        os.makedirs(self._temporal)
+        self._escritores: Dict[str, EscritorNpy] = {
+            'id_huella': EscritorNpy(os.path.join(self._temporal, 'id_huella.npy'), np.uint64),
+            'huella': EscritorNpy(os.path.join(self._temporal, 'huella.npy'), np.uint64),
+        }
+        self.columnas: Optional[Tuple[str, ...]] = None
+        self.estadisticas = {'filas': 0, 'recalculadas': 0, 'reutilizadas': 0}
+
+    def _preparar(self, campos: Tuple[str, ...]) -> None:
+        """
+        Fija las columnas de salida con los campos del primer bloque.
+
+        Raises:
+            ValueError: Si un bloque posterior trae otras columnas
+        """
+        columnas = columnas_salida(campos)
+        if self.columnas is not None:
+            if columnas != self.columnas:
+                raise ValueError("Los bloques de la cartera no tienen las mismas columnas.")
+            return
+
+        self.columnas = columnas
+        if self.previo is not None and self.previo.columnas != columnas:
+            self.previo = None
+        for nombre in columnas:
+            self._escritores[nombre] = EscritorNpy(
+                os.path.join(self._temporal, f'{nombre}.npy'), np.float64
+            )
+        self._escritores['zona'] = EscritorNpy(
+            os.path.join(self._temporal, 'zona.npy'), np.int8
+        )
+
+    def puntuar(self, bloque: Mapping, identificadores) -> Dict[str, np.ndarray]:
+        """
+        Puntúa un bloque, recalculando solo las filas nuevas o modificadas.
+
+        Args:
+            bloque: DataFrame o diccionario de arreglos con los datos
+            identificadores: Identificador de cada empresa del bloque
+
+        Returns:
+            Diccionario con un arreglo por ratio más ``z_score`` y ``zona``,
+            igual al de ``puntuar_lote``
+
+        Raises:
+            ValueError: Si el bloque no tiene las columnas de los anteriores
+        """
+        ids = huellas_ids(identificadores)
+        n_filas = len(ids)
+        columnas = columnas_motor(bloque)
+        self._preparar(tuple(columnas))
+        huellas = huellas_filas(columnas, n_filas)
+
+        reutilizar = np.zeros(n_filas, dtype=bool)
+        if self.previo is not None:
+            posiciones, encontrados = self.previo.buscar(ids, self.estadisticas['filas'])
+            reutilizar = encontrados & (self.previo.huellas[posiciones] == huellas)
+
+        resultados = {
+            nombre: np.empty(n_filas, dtype=np.float64) for nombre in self.columnas
+        }
+        resultados['zona'] = np.empty(n_filas, dtype=np.int8)
+
+        if reutilizar.any():
+            origen = posiciones[reutilizar]
+            for nombre, destino in resultados.items():
+                destino[reutilizar] = self.previo.resultados[nombre][origen]
+
+        cambiadas = np.flatnonzero(~reutilizar)
+        if cambiadas.size:
+            nuevos = puntuar_lote(
+                {campo: valores[cambiadas] for campo, valores in columnas.items()},
+                decimales=self.decimales, nombres=self.columnas[:-1]  # sin z_score
+            )
+            for nombre, destino in resultados.items():
+                destino[cambiadas] = nuevos[nombre]
+
+        self._escritores['id_huella'].escribir(ids)
+        self._escritores['huella'].escribir(huellas)
+        for nombre, valores in resultados.items():
+            self._escritores[nombre].escribir(valores)
+
+        self.estadisticas['filas'] += n_filas
+        self.estadisticas['recalculadas'] += int(cambiadas.size)
+        self.estadisticas['reutilizadas'] += n_filas - int(cambiadas.size)
+        return resultados
+
+    def cerrar(self) -> None:
+        """
+        Finaliza los archivos del nuevo estado y reemplaza al anterior.
+        """
+        for escritor in self._escritores.values():
+            escritor.cerrar()
+        with open(os.path.join(self._temporal, ARCHIVO_ESTADO), 'w', encoding='utf-8') as archivo:
+            json.dump({**_meta_motor(self.decimales), 'n_filas': self.estadisticas['filas'],
+                       'columnas': list(self.columnas or ())}, archivo, indent=2)
+
+        # Soltar los mapeos del estado anterior antes de reemplazarlo
+        self.previo = None
+        anterior = self.directorio.rstrip('/\\') + '.anterior'
+        shutil.rmtree(anterior, ignore_errors=True)
+        if os.path.isdir(self.directorio):
+            os.rename(self.directorio, anterior)
+        os.rename(self._temporal, self.directorio)
+        shutil.rmtree(anterior, ignore_errors=True)
+
+    def descartar(self) -> None:
+        """Descarta el nuevo estado y conserva el anterior."""
+        for escritor in self._escritores.values():
+            escritor.cerrar()
+        self.previo = None
+        shutil.rmtree(self._temporal, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_exc, *exc) -> None:
+        if tipo_exc is None:
+            self.cerrar()
+        else:
+            self.descartar()
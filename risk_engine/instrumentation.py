@@ -0,0 +1,163 @@
+"""
+Módulo de instrumentación de etapas del análisis.
+
+Permite atribuir la latencia de una página de resultados a cada etapa
+(validación, ratios, Z-Score, figuras, exportación) con temporizadores de
+contexto y contadores::
+
+    from risk_engine.instrumentation import contar, etapa
+
+    with etapa('analisis.ratios'):
+        ratios = calcular_ratios(data)
+    contar('figuras.construidas')
+
+Está desactivada por defecto; en ese caso ``etapa`` retorna un contexto nulo
+compartido y ``contar`` retorna de inmediato, sin tomar tiempos ni locks.
+Se activa con la variable de entorno ``BRS_INSTRUMENTACION=1`` o asignando
+``instrumentacion.activa = True``.
+
+Los acumulados son globales al proceso (todas las sesiones de Streamlit) y
+se exportan con ``instrumentacion.resumen()`` o ``instrumentacion.volcar()``.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import IO, Dict, Union
+
+
+class _EtapaNula:
+    """Contexto sin efecto usado cuando la instrumentación está desactivada."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_ETAPA_NULA = _EtapaNula()
+
+
+class _Temporizador:
+    """Contexto que mide una ejecución de una etapa."""
+
+    __slots__ = ('_instrumentacion', '_nombre', '_inicio')
+
+    def __init__(self, instrumentacion: 'Instrumentacion', nombre: str):
+        self._instrumentacion = instrumentacion
+        self._nombre = nombre
+
+    def __enter__(self):
+        self._inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, tipo_exc, *exc) -> bool:
+        self._instrumentacion._registrar(
+            self._nombre, time.perf_counter_ns() - self._inicio, tipo_exc is not None
+        )
+        return False
+
+
+class Instrumentacion:
+    """
+    Registro de tiempos por etapa y contadores, seguro entre hilos.
+
+    Por etapa se acumulan llamadas, tiempo total, máximo, última duración y
+    ejecuciones que terminaron con excepción.
+
+    Args:
+        activa: Si se registran tiempos y contadores
+    """
+
+    def __init__(self, activa: bool = False):
+        self.activa = activa
+        self._lock = threading.Lock()
+        # nombre → [llamadas, total_ns, max_ns, ultima_ns, errores]
+        self._etapas: Dict[str, list] = {}
+        self._contadores: Dict[str, int] = {}
+
+    def etapa(self, nombre: str):
+        """
+        Retorna un contexto que mide la duración de la etapa ``nombre``.
+        """
+        if not self.activa:
+            return _ETAPA_NULA
+        return _Temporizador(self, nombre)
+
+    def contar(self, nombre: str, cantidad: int = 1) -> None:
+        """Suma ``cantidad`` al contador ``nombre``."""
+        if not self.activa:
+            return
+        with self._lock:
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + cantidad
+
+    def _registrar(self, nombre: str, duracion_ns: int, error: bool) -> None:
+        with self._lock:
+            datos = self._etapas.get(nombre)
+            if datos is None:
+                datos = self._etapas[nombre] = [0, 0, 0, 0, 0]
+            datos[0] += 1
+            datos[1] += duracion_ns
+            datos[2] = max(datos[2], duracion_ns)
+            datos[3] = duracion_ns
+            datos[4] += error
+
+    def resumen(self) -> dict:
+        """
+        Retorna los acumulados en milisegundos, listos para serializar a JSON.
+
+        Returns:
+            Diccionario con ``activa``, ``etapas`` (llamadas, total_ms,
+            media_ms, max_ms, ultima_ms, errores) y ``contadores``
+        """
+        with self._lock:
+            etapas = {nombre: list(datos) for nombre, datos in self._etapas.items()}
+            contadores = dict(self._contadores)
+
+        return {
+            'activa': self.activa,
+            'etapas': {
+                nombre: {
+                    'llamadas': llamadas,
+                    'total_ms': total / 1e6,
+                    'media_ms': total / llamadas / 1e6,
+                    'max_ms': maximo / 1e6,
+                    'ultima_ms': ultima / 1e6,
+                    'errores': errores,
+                }
+                for nombre, (llamadas, total, maximo, ultima, errores) in sorted(etapas.items())
+            },
+            'contadores': dict(sorted(contadores.items())),
+        }
+
+    def volcar(self, destino: Union[str, IO[str]]) -> None:
+        """
+        Escribe el resumen en JSON.
+
+        Args:
+            destino: Ruta de archivo o flujo de texto
+        """
+        if isinstance(destino, str):
+            with open(destino, 'w', encoding='utf-8') as archivo:
+                json.dump(self.resumen(), archivo, ensure_ascii=False, indent=2)
+        else:
+            json.dump(self.resumen(), destino, ensure_ascii=False, indent=2)
+
+    def reiniciar(self) -> None:
+        """Descarta los tiempos y contadores acumulados."""
+        with self._lock:
+            self._etapas.clear()
+            self._contadores.clear()
+
+
+# Instancia global del proceso
+instrumentacion = Instrumentacion(
+    activa=os.environ.get('BRS_INSTRUMENTACION', '') not in ('', '0')
+)
+
+etapa = instrumentacion.etapa
+contar = instrumentacion.contar
@@ -0,0 +1,255 @@
+"""
+Módulo de percentiles de una empresa respecto de sus pares.
+
+Construye, a partir de una cartera puntuada, un arreglo ordenado por ratio
+(y por ratio y sector), de modo que el percentil de un valor se obtiene con
+una búsqueda binaria (``np.searchsorted``) en O(log n)::
+
+    indice = IndicePares.desde_tabla(tarea.resultados, col_sector='sector')
+    indice.percentil('roe', 0.18)                    # → 83.2
+    indice.percentil('roe', 0.18, sector='Retail')
+
+Las empresas agregadas después (``agregar``) van a un búfer ordenado pequeño
+que se fusiona con el arreglo principal al superar ``tam_bufer`` valores, por
+lo que una inserción no reordena la cartera completa.
+"""
+
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+
+# Columnas de resultados que no son indicadores
+_COLUMNAS_EXCLUIDAS = ('zona',)
+
+
+class SerieOrdenada:
+    """
+    Valores de un indicador ordenados, con inserciones por búfer.
+
+    Los NaN no se almacenan: una empresa sin el indicador no es par.
+
+    Args:
+        valores: Valores iniciales (en cualquier orden)
+        tam_bufer: Valores pendientes máximos antes de fusionar
+    """
+
+    def __init__(self, valores: Optional[np.ndarray] = None, tam_bufer: int = 4096):
+        valores = np.asarray(valores if valores is not None else (), dtype=np.float64)
+        self.ordenados = np.sort(valores[~np.isnan(valores)])
+        self.pendientes = np.empty(0, dtype=np.float64)
+        self.tam_bufer = tam_bufer
+
+    def __len__(self) -> int:
+        return len(self.ordenados) + len(self.pendientes)
+
+    def agregar(self, valores) -> None:
+        """Inserta valores; los NaN se ignoran."""
+        valores = np.asarray(valores, dtype=np.float64).ravel()
+        valores = valores[~np.isnan(valores)]
+        if not len(valores):
+            return
+        nuevos = np.concatenate((self.pendientes, valores))
+        if len(nuevos) <= self.tam_bufer:
+            self.pendientes = np.sort(nuevos)
+            return
+        nuevos = np.sort(nuevos)
+        if len(self.ordenados):
+            # Con dos tramos ya ordenados, el ordenamiento estable (timsort)
+            # se reduce a fusionarlos en tiempo lineal
+            nuevos = np.sort(np.concatenate((self.ordenados, nuevos)), kind='stable')
+        self.ordenados = nuevos
+        self.pendientes = self.pendientes[:0]
+
+    def _rangos(self, valores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Cantidad de pares estrictamente menores y menores o iguales."""
+        menores = np.searchsorted(self.ordenados, valores, side='left')
+        hasta = np.searchsorted(self.ordenados, valores, side='right')
+        if len(self.pendientes):
+            menores = menores + np.searchsorted(self.pendientes, valores, side='left')
+            hasta = hasta + np.searchsorted(self.pendientes, valores, side='right')
+        return menores, hasta
+
+    def percentiles(self, valores) -> np.ndarray:
+        """
+        Percentil (0-100) de cada valor entre los pares.
+
+        Se usa el rango medio: los pares con el mismo valor cuentan la mitad,
+        de modo que el valor mediano queda en el percentil 50 aunque haya
+        empates. Los valores NaN, o una serie vacía, dan NaN.
+
+        Args:
+            valores: Valor o arreglo de valores
+
+        Returns:
+            Arreglo float64 con los percentiles
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        n = len(self)
+        if n == 0:
+            return np.full(valores.shape, np.nan)
+        menores, hasta = self._rangos(valores)
+        percentiles = (menores + hasta) * (50.0 / n)
+        return np.where(np.isnan(valores), np.nan, percentiles)
+
+
+class IndicePares:
+    """
+    Índice de percentiles por indicador y, opcionalmente, por sector.
+
+    Args:
+        tam_bufer: Valores pendientes máximos por serie antes de fusionar
+    """
+
+    def __init__(self, tam_bufer: int = 4096):
+        self.tam_bufer = tam_bufer
+        self._series: Dict[Tuple[str, Optional[str]], SerieOrdenada] = {}
+
+    @classmethod
+    def desde_tabla(
+        cls,
+        tabla: Mapping,
+        columnas: Optional[Iterable[str]] = None,
+        col_sector: Optional[str] = None,
+        tam_bufer: int = 4096
+    ) -> 'IndicePares':
+        """
+        Construye el índice de una cartera puntuada.
+
+        Args:
+            tabla: DataFrame o diccionario de arreglos (por ejemplo el de
+                ``tabla_resultados`` o ``puntuar_lote``)
+            columnas: Indicadores a indexar (por defecto todas las columnas
+                numéricas de punto flotante, salvo ``zona``)
+            col_sector: Columna con el sector de cada empresa, o None
+            tam_bufer: Valores pendientes máximos por serie
+
+        Returns:
+            IndicePares con una serie por indicador y por (indicador, sector)
+        """
+        indice = cls(tam_bufer)
+        indice._indexar(tabla, columnas, col_sector)
+        return indice
+
+    def _indexar(self, tabla: Mapping, columnas: Optional[Iterable[str]],
+                 col_sector: Optional[str]) -> None:
+        if columnas is None:
+            columnas = [
+                nombre for nombre in tabla
+                if nombre not in _COLUMNAS_EXCLUIDAS and nombre != col_sector
+                and np.asarray(tabla[nombre]).dtype.kind == 'f'
+            ]
+
+        sectores = None
+        if col_sector is not None and col_sector in tabla:
+            codigos, sectores = _factorizar(tabla[col_sector])
+            # Un solo ordenamiento agrupa las empresas por sector; el tramo
+            # inicial (código -1) son las empresas sin sector
+            orden = np.argsort(codigos, kind='stable')
+            limites = np.cumsum(np.bincount(codigos + 1, minlength=len(sectores) + 1)).tolist()
+
+        for nombre in columnas:
+            valores = np.asarray(tabla[nombre], dtype=np.float64)
+            self._serie(nombre, None).agregar(valores)
+            if sectores is None:
+                continue
+            for sector, inicio, fin in zip(sectores, limites[:-1], limites[1:]):
+                self._serie(nombre, sector).agregar(valores[orden[inicio:fin]])
+
+    def _serie(self, nombre: str, sector: Optional[str]) -> SerieOrdenada:
+        clave = (nombre, sector)
+        serie = self._series.get(clave)
+        if serie is None:
+            serie = self._series[clave] = SerieOrdenada(tam_bufer=self.tam_bufer)
+        return serie
+
+    def agregar(self, tabla: Mapping, col_sector: Optional[str] = None) -> None:
+        """
+        Agrega empresas al índice (por ejemplo las analizadas una a una).
+
+        Solo se indexan las columnas que el índice ya conoce.
+
+        Args:
+            tabla: DataFrame o diccionario de arreglos o escalares
+            col_sector: Columna con el sector de cada empresa, o None
+        """
+        columnas = [nombre for nombre in self.indicadores if nombre in tabla]
+        datos = {
+            nombre: np.atleast_1d(np.asarray(tabla[nombre], dtype=np.float64))
+            for nombre in columnas
+        }
+        if col_sector is not None and col_sector in tabla:
+            datos[col_sector] = np.atleast_1d(np.asarray(tabla[col_sector], dtype=object))
+        self._indexar(datos, columnas, col_sector)
+
+    @property
+    def indicadores(self) -> list:
+        """Indicadores indexados."""
+        return sorted({nombre for nombre, _ in self._series})
+
+    @property
+    def sectores(self) -> list:
+        """Sectores con al menos una empresa indexada."""
+        return sorted({sector for _, sector in self._series if sector is not None})
+
+    def n_pares(self, indicador: str, sector: Optional[str] = None) -> int:
+        """Cantidad de empresas con el indicador (en el sector, si se indica)."""
+        serie = self._series.get((indicador, sector))
+        return len(serie) if serie is not None else 0
+
+    def percentiles(self, indicador: str, valores, sector: Optional[str] = None) -> np.ndarray:
+        """
+        Percentiles (0-100) de un arreglo de valores del indicador.
+
+        Args:
+            indicador: Nombre del indicador (ej: 'roe', 'z_score')
+            valores: Valor o arreglo de valores
+            sector: Compara solo con las empresas de ese sector
+
+        Returns:
+            Arreglo float64; NaN si no hay pares o el valor es NaN
+        """
+        serie = self._series.get((indicador, sector))
+        if serie is None:
+            return np.full(np.shape(valores), np.nan)
+        return serie.percentiles(valores)
+
+    def percentil(self, indicador: str, valor: Optional[float],
+                  sector: Optional[str] = None) -> Optional[float]:
+        """
+        Percentil (0-100) de un valor del indicador entre sus pares.
+
+        Returns:
+            Percentil, o None si el valor es None/NaN o no hay pares
+        """
+        if valor is None:
+            return None
+        percentil = float(self.percentiles(indicador, valor, sector))
+        return None if percentil != percentil else percentil
+
+    def percentiles_empresa(self, indicadores: Mapping[str, Optional[float]],
+                            sector: Optional[str] = None) -> Dict[str, Optional[float]]:
+        """
+        Percentiles de los indicadores de una empresa.
+
+        Args:
+            indicadores: Diccionario indicador → valor (ej: ratios y z_score)
+            sector: Compara solo con las empresas de ese sector
+
+        Returns:
+            Diccionario indicador → percentil o None
+        """
+        return {
+            nombre: self.percentil(nombre, valor, sector)
+            for nombre, valor in indicadores.items()
+        }
+
+
+def _factorizar(sectores) -> Tuple[np.ndarray, list]:
+    """
+    Codifica la columna de sectores: código por empresa (-1 si falta) y
+    lista de sectores por código.
+    """
+    import pandas as pd
+
+    codigos, unicos = pd.factorize(np.asarray(sectores, dtype=object), sort=True)
+    return codigos, [str(sector) for sector in unicos]
@@ -0,0 +1,206 @@
+"""
+Módulo de orquestación del análisis de riesgo por empresa.
+
+Reúne el cálculo de ratios, Z-Score y clasificación que antes vivía en app.py,
+sin depender de Streamlit, para que cualquier proceso por lotes pueda importarlo
+sin costo de arranque ni efectos secundarios.
+
+Las cadenas de respaldo de campos (por ejemplo ``total_assets`` →
+``activo_total`` → 0) se resuelven una sola vez por esquema (conjunto de
+claves de entrada) y se reutilizan para todas las empresas con ese esquema.
+Los ratios se evalúan con el evaluador que ``risk_engine.registry`` compila
+para cada esquema.
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, NamedTuple, Optional
+
+from risk_engine.registry import compilar_escalar
+from risk_engine.zscore import z_score
+from risk_engine.classification import classify_risk
+from risk_engine.instrumentation import etapa, instrumentacion
+
+
+class Esquema(NamedTuple):
+    """
+    Claves resueltas para un conjunto de campos de entrada.
+
+    Cada atributo del Z-Score contiene la clave del diccionario a leer, o None
+    si se debe usar la aproximación por defecto; ``campos`` es el conjunto de
+    claves, con el que se obtiene el evaluador de ratios compilado.
+    """
+    activo_total: Optional[str]
+    working_capital: Optional[str]
+    retained_earnings: Optional[str]
+    market_value_equity: Optional[str]
+    total_liabilities: Optional[str]
+    campos: FrozenSet[str]
+
+
+def _primera(campos: FrozenSet[str], *candidatos: str) -> Optional[str]:
+    """
+    Retorna el primer candidato presente en los campos, o None.
+    """
+    for candidato in candidatos:
+        if candidato in campos:
+            return candidato
+    return None
+
+
+@lru_cache(maxsize=64)
+def resolver_esquema(campos: FrozenSet[str]) -> Esquema:
+    """
+    Resuelve las cadenas de respaldo de campos para un conjunto de claves.
+
+    Args:
+        campos: Conjunto de claves presentes en los datos de entrada
+
+    Returns:
+        Esquema con la clave a usar para cada campo con respaldo
+    """
+    return Esquema(
+        activo_total=_primera(campos, 'total_assets', 'activo_total'),
+        working_capital=_primera(campos, 'working_capital'),
+        retained_earnings=_primera(campos, 'retained_earnings', 'utilidades_retenidas'),
+        market_value_equity=_primera(
+            campos, 'market_value_equity', 'valor_mercado_patrimonio', 'patrimonio'
+        ),
+        total_liabilities=_primera(campos, 'total_liabilities', 'pasivo_total'),
+        campos=campos,
+    )
+
+
+def _esquema_de(data) -> Esquema:
+    """Obtiene el esquema (cacheado) de un diccionario de entrada."""
+    return resolver_esquema(frozenset(data.keys()))
+
+
+def _ratios(data, esquema: Esquema) -> Dict[str, Optional[float]]:
+    """
+    Calcula los ratios usando un esquema ya resuelto.
+    """
+    return compilar_escalar(esquema.campos)(data)
+
+
+def _zscore(data, esquema: Esquema) -> Optional[float]:
+    """
+    Calcula el Z-Score usando un esquema ya resuelto.
+    """
+    working_capital = (
+        data[esquema.working_capital] if esquema.working_capital
+        else data['activo_corriente'] - data['pasivo_corriente']
+    )
+    retained_earnings = (
+        data[esquema.retained_earnings] if esquema.retained_earnings else 0
+    )
+    market_value_equity = (
+        data[esquema.market_value_equity] if esquema.market_value_equity
+        else data['patrimonio']
+    )
+    total_liabilities = (
+        data[esquema.total_liabilities] if esquema.total_liabilities
+        else data['pasivo_total']
+    )
+
+    return z_score(
+        working_capital=working_capital,
+        retained_earnings=retained_earnings,
+        ebit=data['ebit'],
+        market_value_equity=market_value_equity,
+        total_liabilities=total_liabilities,
+        sales=data['ventas'],
+        total_assets=data[esquema.activo_total] if esquema.activo_total else 0
+    )
+
+
+def calcular_ratios(data: dict, nombres: Optional[Iterable[str]] = None) -> dict:
+    """
+    Calcula los ratios financieros a partir de los datos ingresados.
+
+    Solo se incluyen los ratios cuyas entradas están presentes: los de
+    tesorería y plazos (``risk_engine.registry.CAMPOS_COMPLEMENTARIOS``)
+    requieren sus datos complementarios.
+
+    Args:
+        data: Diccionario con los datos financieros
+        nombres: Ratios a calcular (por defecto todos los del registro)
+
+    Returns:
+        Diccionario con los ratios calculados
+    """
+    if nombres is None:
+        return _ratios(data, _esquema_de(data))
+    return compilar_escalar(frozenset(data.keys()), tuple(nombres))(data)
+
+
+def calcular_zscore(data: dict) -> Optional[float]:
+    """
+    Calcula el Z-Score de Altman a partir de los datos ingresados.
+
+    Args:
+        data: Diccionario con los datos financieros
+
+    Returns:
+        Valor del Z-Score o None si hay error en el cálculo
+    """
+    return _zscore(data, _esquema_de(data))
+
+
+def _analizar(data, esquema: Esquema) -> dict:
+    """Construye el registro de resultados de una empresa."""
+    zscore_valor = _zscore(data, esquema)
+    return {
+        'ratios': _ratios(data, esquema),
+        'zscore': zscore_valor,
+        'clasificacion': classify_risk(zscore_valor),
+    }
+
+
+def _analizar_medido(data, esquema: Esquema) -> dict:
+    """Igual que ``_analizar``, registrando el tiempo de cada etapa."""
+    with etapa('analisis.zscore'):
+        zscore_valor = _zscore(data, esquema)
+    with etapa('analisis.ratios'):
+        ratios = _ratios(data, esquema)
+    return {
+        'ratios': ratios,
+        'zscore': zscore_valor,
+        'clasificacion': classify_risk(zscore_valor),
+    }
+
+
+def analizar_empresa(data: dict) -> dict:
+    """
+    Ejecuta el análisis completo de una empresa.
+
+    Args:
+        data: Diccionario con los datos financieros
+
+    Returns:
+        Registro con las claves 'ratios', 'zscore' y 'clasificacion'
+    """
+    # Un solo chequeo cuando la instrumentación está desactivada
+    if instrumentacion.activa:
+        return _analizar_medido(data, _esquema_de(data))
+    return _analizar(data, _esquema_de(data))
+
+
+def analizar_empresas(empresas: Iterable[dict]) -> Iterator[dict]:
+    """
+    Analiza una secuencia de empresas, resolviendo el esquema solo cuando
+    cambia el conjunto de claves respecto a la empresa anterior.
+
+    Args:
+        empresas: Iterable de diccionarios con datos financieros
+
+    Yields:
+        Registro de resultados por empresa, en el mismo orden de entrada
+    """
+    claves_previas = None
+    esquema = None
+    for data in empresas:
+        claves = data.keys()
+        if claves != claves_previas:
+            esquema = resolver_esquema(frozenset(claves))
+            claves_previas = claves
+        yield _analizar(data, esquema)
@@ -0,0 +1,621 @@
+"""
+Módulo de lectura y escritura de carteras de empresas por bloques.
+
+Permite procesar archivos CSV/Excel de cualquier tamaño leyendo y escribiendo
+bloques de filas, de modo que la cartera completa nunca necesita caber en
+memoria.
+
+Los escritores CSV y Excel dan formato de texto a columnas completas con
+``pyarrow.compute`` (sin formatear fila a fila en Python) y escriben por
+tramos de ``TAM_TRAMO_TEXTO`` filas. Sin pyarrow usan pandas y openpyxl.
+"""
+
+import codecs
+import os
+import re
+import zipfile
+from abc import ABC, abstractmethod
+from typing import IO, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.batch import CAMPOS_MOTOR, etiquetas_riesgo
+from utils.validation_core import errores_columna, parsear_columna
+
+
+EXTENSIONES_EXCEL = ('.xlsx', '.xlsm')
+
+# Filas por tramo al dar formato de texto (acota la memoria de los textos)
+TAM_TRAMO_TEXTO = 100_000
+
+# Filas por hoja de Excel (incluido el encabezado)
+MAX_FILAS_EXCEL = 1_048_576
+
+# Celdas no numéricas que se citan en el mensaje de error
+MAX_CELDAS_INVALIDAS = 5
+
+# Tabla de resultados: DataFrame o diccionario columna → arreglo
+Tabla = Union[pd.DataFrame, Mapping[str, object]]
+
+
+def leer_portafolio(
+    ruta: Union[str, IO[bytes]],
+    tam_bloque: int = 100_000,
+    sep: str = ',',
+    decimal: str = '.',
+    col_id: Optional[str] = 'id',
+    miles: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee una cartera en bloques de filas.
+
+    La columna identificadora se lee siempre como texto: pandas infiere el
+    tipo de cada bloque por separado, y una cartera con identificadores
+    numéricos en los primeros bloques y alfanuméricos más adelante ("X9")
+    produciría bloques con esquemas distintos.
+
+    Args:
+        ruta: Ruta al archivo CSV o Excel (.xlsx), o archivo abierto en modo
+            binario cuyo atributo ``name`` indica la extensión (por ejemplo
+            el de ``st.file_uploader``)
+        tam_bloque: Número máximo de filas por bloque
+        sep: Separador de columnas (solo CSV)
+        decimal: Separador decimal (solo CSV)
+        col_id: Columna identificadora, o None
+        miles: Separador de miles de los campos que pandas no reconoce como
+            numéricos (por defecto la coma, o el punto si ``decimal`` es la
+            coma; solo CSV)
+
+    Yields:
+        DataFrame con un bloque de filas de la cartera, con los campos
+        financieros convertidos a float64
+
+    Raises:
+        ValueError: Si un campo financiero tiene celdas no numéricas
+    """
+    if es_excel(ruta):
+        bloques = _leer_excel(ruta, tam_bloque)
+        decimal, miles = '.', None
+    else:
+        bloques = pd.read_csv(ruta, sep=sep, decimal=decimal, chunksize=tam_bloque,
+                              dtype={col_id: str} if col_id else None)
+
+    inicio = 0
+    for bloque in bloques:
+        if col_id and col_id in bloque and not pd.api.types.is_string_dtype(bloque[col_id]):
+            ids = bloque[col_id]
+            bloque[col_id] = ids.astype(object).where(ids.isna(), ids.astype(str))
+        yield normalizar_columnas(bloque, decimal=decimal, miles=miles, inicio=inicio)
+        inicio += len(bloque)
+
+
+def es_excel(ruta: Union[str, IO[bytes]]) -> bool:
+    """Indica si la ruta o el archivo abierto corresponde a un libro de Excel."""
+    nombre = ruta if isinstance(ruta, str) else getattr(ruta, 'name', '')
+    return str(nombre).lower().endswith(EXTENSIONES_EXCEL)
+
+
+def normalizar_columnas(
+    bloque: pd.DataFrame,
+    decimal: str = '.',
+    miles: Optional[str] = None,
+    inicio: int = 0
+) -> pd.DataFrame:
+    """
+    Convierte a float64 los campos financieros que llegan como texto
+    (ej: "100,000" o "100 000"). Las celdas vacías quedan como NaN.
+
+    Args:
+        bloque: DataFrame con un bloque de filas de la cartera
+        decimal: Separador decimal de los textos
+        miles: Separador de miles (por defecto según ``separador_miles``)
+        inicio: Posición del bloque en la cartera (para numerar las filas
+            en el mensaje de error)
+
+    Returns:
+        El mismo DataFrame con los campos financieros numéricos
+
+    Raises:
+        ValueError: Si hay celdas con texto no numérico (ej: "N/D")
+    """
+    invalidas = []
+    for campo in CAMPOS_MOTOR:
+        if campo in bloque and not pd.api.types.is_float_dtype(bloque[campo].dtype):
+            columna = parsear_columna(bloque[campo], decimal=decimal, miles=miles)
+            for fila, _ in errores_columna(columna, campo, obligatorio=False,
+                                           max_errores=MAX_CELDAS_INVALIDAS):
+                invalidas.append(
+                    f"fila {inicio + fila + 1}, columna '{campo}': {bloque[campo].iloc[fila]!r}"
+                )
+            bloque[campo] = columna.valores
+    if invalidas:
+        raise ValueError(
+            "La cartera tiene valores no numéricos ("
+            + "; ".join(invalidas[:MAX_CELDAS_INVALIDAS]) + ")."
+        )
+    return bloque
+
+
+def _leer_excel(ruta: Union[str, IO[bytes]], tam_bloque: int) -> Iterator[pd.DataFrame]:
+    """
+    Lee la primera hoja de un Excel en modo solo lectura, por bloques.
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = [str(nombre) for nombre in next(filas, ())]
+        bloque: List[tuple] = []
+        for fila in filas:
+            bloque.append(fila)
+            if len(bloque) == tam_bloque:
+                yield pd.DataFrame(bloque, columns=encabezado)
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=encabezado)
+    finally:
+        libro.close()
+
+
+def tabla_resultados(
+    resultados: dict,
+    identificadores: Optional[pd.Series] = None,
+    col_id: str = 'id'
+) -> pd.DataFrame:
+    """
+    Arma el DataFrame de salida a partir de los arreglos de ``puntuar_lote``.
+
+    Args:
+        resultados: Diccionario de arreglos (ratios, z_score, zona)
+        identificadores: Columna identificadora de las empresas (opcional)
+        col_id: Nombre de la columna identificadora
+
+    Returns:
+        DataFrame con una fila por empresa
+    """
+    columnas = {}
+    if identificadores is not None:
+        columnas[col_id] = np.asarray(identificadores)
+    columnas.update(resultados)
+    columnas['clasificacion'] = etiquetas_riesgo(resultados['zona'])
+    return pd.DataFrame(columnas)
+
+
+class EscritorResultados(ABC):
+    """
+    Escritor incremental de resultados. Cada llamada a ``escribir`` añade un
+    bloque (DataFrame o diccionario de arreglos) al archivo de salida.
+    """
+
+    @abstractmethod
+    def escribir(self, tabla: Tabla) -> None:
+        """Añade un bloque de resultados al archivo de salida."""
+
+    def cerrar(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+def _columnas_tabla(tabla: Tabla) -> List[Tuple[str, object]]:
+    """Lista de (nombre, valores) de un DataFrame o diccionario de arreglos."""
+    if isinstance(tabla, pd.DataFrame):
+        return [(str(nombre), tabla[nombre]) for nombre in tabla.columns]
+    return [(str(nombre), valores) for nombre, valores in tabla.items()]
+
+
+def _arreglo_arrow(valores):
+    """
+    Convierte una columna en un arreglo de pyarrow: NaN pasa a nulo y las
+    categorías (``etiquetas_riesgo``) se decodifican a texto.
+    """
+    import pyarrow as pa
+
+    try:
+        arreglo = pa.array(valores, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columnas object con tipos mezclados
+        arreglo = pa.array(np.asarray(valores).astype(str))
+    if pa.types.is_dictionary(arreglo.type):
+        arreglo = arreglo.dictionary_decode()
+    return arreglo
+
+
+def _texto_numerico(arreglo, decimal: str = '.'):
+    """Convierte un arreglo numérico a texto con el separador decimal indicado."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    texto = pc.cast(arreglo, pa.string())
+    if decimal != '.' and pa.types.is_floating(arreglo.type):
+        texto = pc.replace_substring(texto, '.', decimal)
+    return texto
+
+
+def _escribir_textos(flujo, textos) -> None:
+    """
+    Escribe un arreglo de texto de pyarrow sin separadores entre valores.
+
+    Los valores están contiguos en el búfer de datos del arreglo, por lo que
+    se escriben sin crear una cadena de Python por fila.
+    """
+    offsets = np.frombuffer(textos.buffers()[1], dtype=np.int32)
+    inicio, fin = offsets[textos.offset], offsets[textos.offset + len(textos)]
+    flujo.write(memoryview(textos.buffers()[2])[inicio:fin])
+
+
+def _citar_csv(texto: str, sep: str) -> str:
+    """Encierra un valor CSV entre comillas si contiene caracteres especiales."""
+    if any(caracter in texto for caracter in (sep, '"', '\n', '\r')):
+        return '"' + texto.replace('"', '""') + '"'
+    return texto
+
+
+class EscritorCSV(EscritorResultados):
+    """
+    Escribe los resultados en CSV, añadiendo un bloque por llamada.
+
+    Args:
+        ruta: Archivo de salida, o flujo binario abierto (que no se cierra
+            al terminar)
+        sep: Separador de columnas
+        decimal: Separador decimal
+        bom: Escribir la marca UTF-8 que Excel usa para detectar la codificación
+    """
+
+    def __init__(self, ruta: Union[str, IO[bytes]], sep: str = ',', decimal: str = '.',
+                 bom: bool = False):
+        self.ruta = ruta
+        self.sep = sep
+        self.decimal = decimal
+        self._propio = isinstance(ruta, str)
+        self._archivo = open(ruta, 'wb') if self._propio else ruta
+        if bom:
+            self._archivo.write(codecs.BOM_UTF8)
+        self._encabezado = True
+
+    def escribir(self, tabla: Tabla) -> None:
+        columnas = _columnas_tabla(tabla)
+        if self._encabezado:
+            encabezado = self.sep.join(_citar_csv(nombre, self.sep) for nombre, _ in columnas)
+            self._archivo.write((encabezado + '\n').encode('utf-8'))
+            self._encabezado = False
+
+        try:
+            import pyarrow.compute as pc
+        except ImportError:
+            pd.DataFrame(dict(columnas)).to_csv(
+                self._archivo, header=False, index=False, sep=self.sep, decimal=self.decimal
+            )
+            return
+
+        arreglos = [_arreglo_arrow(valores) for _, valores in columnas]
+        n_filas = len(arreglos[0]) if arreglos else 0
+        for inicio in range(0, n_filas, TAM_TRAMO_TEXTO):
+            campos = [
+                self._texto_csv(arreglo.slice(inicio, TAM_TRAMO_TEXTO)) for arreglo in arreglos
+            ]
+            lineas = pc.binary_join_element_wise(
+                *campos, self.sep, null_handling='replace', null_replacement=''
+            )
+            _escribir_textos(self._archivo, pc.binary_join_element_wise(lineas, '\n', ''))
+
+    def _texto_csv(self, arreglo):
+        """
+        Da formato CSV a una columna: números con el separador decimal y
+        textos entre comillas solo si contienen caracteres especiales.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        tipo = arreglo.type
+        if pa.types.is_floating(tipo) or pa.types.is_integer(tipo):
+            return _texto_numerico(arreglo, self.decimal)
+        if pa.types.is_boolean(tipo):
+            return pc.if_else(arreglo, 'True', 'False')
+        if pa.types.is_null(tipo):
+            return pa.nulls(len(arreglo), pa.string())
+        texto = arreglo if pa.types.is_string(tipo) else pc.cast(arreglo, pa.string())
+        citar = pc.match_substring(texto, self.sep)
+        for caracter in ('"', '\n', '\r'):
+            citar = pc.or_(citar, pc.match_substring(texto, caracter))
+        citado = pc.binary_join_element_wise(
+            '"', pc.replace_substring(texto, '"', '""'), '"', ''
+        )
+        return pc.if_else(citar, citado, texto)
+
+    def cerrar(self) -> None:
+        if self._propio:
+            self._archivo.close()
+
+
+class EscritorParquet(EscritorResultados):
+    """Escribe los resultados en Parquet, un grupo de filas por bloque."""
+
+    def __init__(self, ruta: str):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError(
+                "Se requiere 'pyarrow' para exportar a Parquet."
+            ) from exc
+        self.ruta = ruta
+        self._pq = pq
+        self._escritor = None
+
+    def escribir(self, tabla: Tabla) -> None:
+        import pyarrow as pa
+
+        if not isinstance(tabla, pd.DataFrame):
+            tabla = pd.DataFrame(dict(tabla))
+        tabla_arrow = pa.Table.from_pandas(tabla, preserve_index=False)
+        if self._escritor is None:
+            self._escritor = self._pq.ParquetWriter(self.ruta, tabla_arrow.schema)
+        self._escritor.write_table(tabla_arrow)
+
+    def cerrar(self) -> None:
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+
+# Partes fijas del paquete .xlsx (SpreadsheetML mínimo con cadenas en línea)
+_NS_HOJA = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_NS_PAQUETE = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_TIPO_OFFICE = 'application/vnd.openxmlformats-officedocument.spreadsheetml'
+_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_ESTILOS_XLSX = (
+    f'{_XML}<styleSheet xmlns="{_NS_HOJA}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+# Celda de texto en línea; sin xml:space se pierden los espacios de los extremos
+_CELDA_TEXTO = ("<c t='inlineStr'><is><t xml:space='preserve'>", '</t></is></c>')
+
+# Caracteres que XML 1.0 no admite: con ellos Excel rechaza el archivo
+_PATRON_NO_XML = '[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]'
+_NO_XML = re.compile(_PATRON_NO_XML)
+
+
+def _escapar_xml(texto: str) -> str:
+    texto = _NO_XML.sub('', texto)
+    return texto.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _celdas_xml(arreglo):
+    """
+    Da formato SpreadsheetML a una columna (una celda ``<c>`` por fila).
+
+    Las celdas no llevan referencia (``r``), por lo que los valores nulos se
+    escriben como celda vacía para conservar la posición de las columnas. De
+    los textos se quitan los caracteres que XML no admite, y se conservan
+    los espacios de los extremos.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    tipo = arreglo.type
+    if pa.types.is_boolean(tipo):
+        texto = pc.if_else(arreglo, '1', '0')
+        apertura, cierre = "<c t='b'><v>", '</v></c>'
+    elif pa.types.is_integer(tipo) or pa.types.is_floating(tipo):
+        if pa.types.is_floating(tipo):
+            # Excel no admite inf: se escribe como celda vacía
+            arreglo = pc.if_else(pc.is_finite(arreglo), arreglo, None)
+        texto = _texto_numerico(arreglo)
+        apertura, cierre = '<c><v>', '</v></c>'
+    else:
+        texto = arreglo if pa.types.is_string(tipo) else pc.cast(arreglo, pa.string())
+        texto = pc.replace_substring_regex(texto, _PATRON_NO_XML, '')
+        for caracter, entidad in (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;')):
+            texto = pc.replace_substring(texto, caracter, entidad)
+        apertura, cierre = _CELDA_TEXTO
+    celdas = pc.binary_join_element_wise(apertura, texto, cierre, '')
+    return pc.fill_null(celdas, '<c/>')
+
+
+def _filas_openpyxl(columnas: list) -> List[tuple]:
+    """
+    Filas de un bloque para openpyxl (NaN pasa a celda vacía y de los textos
+    se quitan los caracteres que XML no admite, que openpyxl rechaza).
+    """
+    listas = []
+    for _, valores in columnas:
+        serie = pd.Series(valores)
+        if not pd.api.types.is_numeric_dtype(serie.dtype):
+            serie = serie.map(lambda valor: _NO_XML.sub('', valor)
+                              if isinstance(valor, str) else valor)
+        listas.append(serie.astype(object).where(serie.notna(), None).tolist())
+    return list(zip(*listas))
+
+
+class EscritorExcel(EscritorResultados):
+    """
+    Escribe los resultados en .xlsx por bloques.
+
+    Con pyarrow, las filas de la hoja se generan como XML por columnas y se
+    comprimen directamente en el paquete, sin crear un objeto por celda (el
+    modo write-only de openpyxl crea uno y resulta unas 50 veces más lento).
+    Sin pyarrow se usa openpyxl en modo write-only.
+
+    Cuando una hoja alcanza el límite de filas de Excel se continúa en una
+    hoja nueva (``resultados_2``, ...), repitiendo el encabezado.
+
+    Args:
+        ruta: Archivo de salida (.xlsx)
+        hoja: Nombre de la primera hoja
+    """
+
+    def __init__(self, ruta: str, hoja: str = 'resultados'):
+        self.ruta = ruta
+        self.hoja = hoja
+        self._hojas: List[str] = []
+        self._filas_hoja = MAX_FILAS_EXCEL
+        self._encabezado: Optional[List[str]] = None
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            from openpyxl import Workbook
+
+            self._libro = Workbook(write_only=True)
+            self._zip = None
+        else:
+            self._libro = None
+            self._zip = zipfile.ZipFile(ruta, 'w', compression=zipfile.ZIP_DEFLATED,
+                                        compresslevel=1)
+        self._flujo = None
+
+    def _nueva_hoja(self) -> None:
+        """Cierra la hoja en curso y abre la siguiente con el encabezado."""
+        self._cerrar_hoja()
+        numero = len(self._hojas) + 1
+        self._hojas.append(self.hoja if numero == 1 else f'{self.hoja}_{numero}')
+        if self._zip is None:
+            self._flujo = self._libro.create_sheet(self._hojas[-1])
+            self._flujo.append(self._encabezado)
+        else:
+            self._flujo = self._zip.open(f'xl/worksheets/sheet{numero}.xml', 'w',
+                                         force_zip64=True)
+            encabezado = ''.join(
+                _CELDA_TEXTO[0] + _escapar_xml(nombre) + _CELDA_TEXTO[1]
+                for nombre in self._encabezado
+            )
+            self._flujo.write(
+                f'{_XML}<worksheet xmlns="{_NS_HOJA}"><sheetData>'
+                f'<row>{encabezado}</row>\n'.encode('utf-8')
+            )
+        self._filas_hoja = 1
+
+    def _cerrar_hoja(self) -> None:
+        if self._zip is not None and self._flujo is not None:
+            self._flujo.write(b'</sheetData></worksheet>')
+            self._flujo.close()
+        self._flujo = None
+
+    def escribir(self, tabla: Tabla) -> None:
+        columnas = _columnas_tabla(tabla)
+        if self._encabezado is None:
+            self._encabezado = [nombre for nombre, _ in columnas]
+        if self._zip is None:
+            datos = _filas_openpyxl(columnas)
+        else:
+            datos = [_arreglo_arrow(valores) for _, valores in columnas]
+        n_filas = len(datos) if self._zip is None else (len(datos[0]) if datos else 0)
+
+        inicio = 0
+        while inicio < n_filas:
+            if self._filas_hoja >= MAX_FILAS_EXCEL:
+                self._nueva_hoja()
+            fin = min(inicio + TAM_TRAMO_TEXTO, n_filas,
+                      inicio + MAX_FILAS_EXCEL - self._filas_hoja)
+            if self._zip is None:
+                for fila in datos[inicio:fin]:
+                    self._flujo.append(fila)
+            else:
+                self._escribir_xml([arreglo.slice(inicio, fin - inicio) for arreglo in datos])
+            self._filas_hoja += fin - inicio
+            inicio = fin
+
+    def _escribir_xml(self, arreglos: list) -> None:
+        import pyarrow.compute as pc
+
+        filas = pc.binary_join_element_wise(
+            '<row>', *[_celdas_xml(arreglo) for arreglo in arreglos], '</row>\n', ''
+        )
+        _escribir_textos(self._flujo, filas)
+
+    def cerrar(self) -> None:
+        if self._encabezado is not None and not self._hojas:
+            self._nueva_hoja()
+        if self._zip is None:
+            self._libro.save(self.ruta)
+            return
+
+        self._cerrar_hoja()
+        hojas = ''.join(
+            f'<sheet name="{_escapar_xml(nombre)}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, nombre in enumerate(self._hojas, start=1)
+        )
+        relaciones = ''.join(
+            f'<Relationship Id="rId{i}" Type="{_NS_REL}/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(self._hojas) + 1)
+        )
+        estilos = len(self._hojas) + 1
+        tipos_hojas = ''.join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            f'ContentType="{_TIPO_OFFICE}.worksheet+xml"/>'
+            for i in range(1, len(self._hojas) + 1)
+        )
+        partes = {
+            '[Content_Types].xml': (
+                f'{_XML}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                '<Default Extension="rels" '
+                'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                f'<Override PartName="/xl/workbook.xml" ContentType="{_TIPO_OFFICE}.sheet.main+xml"/>'
+                f'<Override PartName="/xl/styles.xml" ContentType="{_TIPO_OFFICE}.styles+xml"/>'
+                f'{tipos_hojas}</Types>'
+            ),
+            '_rels/.rels': (
+                f'{_XML}<Relationships xmlns="{_NS_PAQUETE}">'
+                f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+                '</Relationships>'
+            ),
+            'xl/workbook.xml': (
+                f'{_XML}<workbook xmlns="{_NS_HOJA}" xmlns:r="{_NS_REL}">'
+                f'<sheets>{hojas}</sheets></workbook>'
+            ),
+            'xl/_rels/workbook.xml.rels': (
+                f'{_XML}<Relationships xmlns="{_NS_PAQUETE}">{relaciones}'
+                f'<Relationship Id="rId{estilos}" Type="{_NS_REL}/styles" Target="styles.xml"/>'
+                '</Relationships>'
+            ),
+            'xl/styles.xml': _ESTILOS_XLSX,
+        }
+        for nombre, contenido in partes.items():
+            self._zip.writestr(nombre, contenido)
+        self._zip.close()
+
+
+def crear_escritor(
+    ruta: str, sep: str = ',', decimal: str = '.', bom: bool = False
+) -> EscritorResultados:
+    """
+    Crea el escritor adecuado según la extensión del archivo de salida.
+
+    Args:
+        ruta: Ruta del archivo de salida (.parquet, .csv o .xlsx)
+        sep: Separador de columnas para CSV
+        decimal: Separador decimal para CSV
+        bom: Escribir la marca UTF-8 al inicio del CSV (para Excel)
+
+    Returns:
+        Instancia de EscritorResultados
+
+    Raises:
+        ValueError: Si la extensión no está soportada
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in ('.parquet', '.pq'):
+        return EscritorParquet(ruta)
+    if extension == '.csv':
+        return EscritorCSV(ruta, sep=sep, decimal=decimal, bom=bom)
+    if extension == '.xlsx':
+        return EscritorExcel(ruta)
+    raise ValueError(f"Formato de salida no soportado: '{extension}'")
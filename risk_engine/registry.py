@@ -0,0 +1,367 @@
+"""
+Módulo de registro declarativo de ratios financieros.
+
+Cada ratio se declara una sola vez en ``RATIOS``: su fórmula (una suma de
+entradas multiplicadas por un factor, dividida por una entrada denominador),
+su categoría, su formato de presentación y sus umbrales de interpretación.
+Las entradas y sus aproximaciones se declaran en ``ENTRADAS``. Las fórmulas
+son datos (tuplas de ``Termino``) que ``evaluar`` recorre directamente, igual
+sobre escalares que sobre columnas de NumPy:
+
+    - ``compilar_escalar``: arma, por conjunto de claves de entrada, el
+      evaluador de una empresa que usa ``risk_engine.pipeline``.
+    - ``planificar``: el plan que ``risk_engine.batch`` ejecuta sobre
+      columnas completas de NumPy con las mismas fórmulas.
+
+Ambos calculan solo los ratios pedidos cuyas entradas están presentes
+(directamente o mediante su aproximación). Agregar un ratio es agregar una
+declaración a ``RATIOS``; la interfaz y la exportación leen de aquí el nombre
+legible, la categoría, el formato y los umbrales.
+
+El módulo no importa NumPy, para no encarecer el arranque de la aplicación.
+"""
+
+from functools import lru_cache, partial
+from operator import itemgetter
+from typing import Any, Callable, Dict, FrozenSet, Mapping, NamedTuple, Optional, Tuple
+
+
+class Termino(NamedTuple):
+    """Entrada multiplicada por un factor dentro de una fórmula."""
+    entrada: str
+    factor: float = 1.0
+
+
+# Fórmula: suma de sus términos (0.0 si no tiene ninguno)
+Expresion = Tuple[Termino, ...]
+
+
+def evaluar(expresion: Expresion, valores: Mapping[str, Any]) -> Any:
+    """
+    Evalúa una fórmula con los valores ya resueltos de sus entradas.
+
+    Args:
+        expresion: Términos de la fórmula
+        valores: Entrada → escalar o arreglo de NumPy
+
+    Returns:
+        La suma de los términos, del mismo tipo que los valores
+    """
+    total = 0.0
+    for i, (entrada, factor) in enumerate(expresion):
+        valor = valores[entrada] if factor == 1 else factor * valores[entrada]
+        total = valor if i == 0 else total + valor
+    return total
+
+
+def _nombres(expresion: Expresion) -> Tuple[str, ...]:
+    """Entradas que usa una fórmula, en orden de aparición."""
+    return tuple(termino.entrada for termino in expresion)
+
+
+class Entrada(NamedTuple):
+    """
+    Dato que usan las fórmulas, con su cadena de respaldo.
+
+    Attributes:
+        claves: Campos de entrada aceptados, en orden de preferencia
+        respaldo: Fórmula que aproxima el dato cuando falta, en función de
+            otras entradas (ej: ``(Termino('ventas', 0.6),)``; ``()`` es
+            cero), o None si no tiene
+        obligatoria: Si su ausencia es un error (KeyError) en lugar de omitir
+            los ratios que la usan
+    """
+    claves: Tuple[str, ...]
+    respaldo: Optional[Expresion] = None
+    obligatoria: bool = False
+
+    @property
+    def dependencias(self) -> Tuple[str, ...]:
+        """Entradas que usa el respaldo."""
+        return _nombres(self.respaldo) if self.respaldo is not None else ()
+
+
+ENTRADAS: Dict[str, Entrada] = {
+    'activo_corriente': Entrada(('activo_corriente',), obligatoria=True),
+    'pasivo_corriente': Entrada(('pasivo_corriente',), obligatoria=True),
+    'pasivo_total': Entrada(('pasivo_total',), obligatoria=True),
+    'patrimonio': Entrada(('patrimonio',), obligatoria=True),
+    'utilidad_neta': Entrada(('utilidad_neta',), obligatoria=True),
+    'ventas': Entrada(('ventas',), obligatoria=True),
+    'activo_total': Entrada(('total_assets', 'activo_total'), ()),
+    'inventarios': Entrada(('inventarios',), (Termino('activo_corriente', 0.3),)),
+    'inventario_promedio': Entrada(('inventario_promedio',), (Termino('inventarios'),)),
+    'costo_ventas': Entrada(('costo_ventas',), (Termino('ventas', 0.6),)),
+    # Datos complementarios: sin ellos se omiten los ratios que los usan
+    'caja_bancos': Entrada(('caja_bancos',)),
+    'inversiones_cp': Entrada(('inversiones_cp',), ()),
+    'cuentas_por_cobrar': Entrada(('cuentas_por_cobrar',)),
+    'ventas_credito': Entrada(('ventas_credito',)),
+    'cuentas_por_pagar': Entrada(('cuentas_por_pagar',)),
+    'compras_credito': Entrada(('compras_credito',)),
+}
+
+# Campos de entrada que solo usan los ratios de tesorería y plazos
+CAMPOS_COMPLEMENTARIOS = (
+    'caja_bancos',
+    'inversiones_cp',
+    'cuentas_por_cobrar',
+    'ventas_credito',
+    'cuentas_por_pagar',
+    'compras_credito',
+)
+
+CATEGORIAS = ('Liquidez', 'Solvencia', 'Rentabilidad', 'Eficiencia')
+
+
+class Ratio(NamedTuple):
+    """
+    Declaración de un ratio financiero.
+
+    El valor es ``(numerador) / denominador``, o None (NaN en lote) si el
+    denominador es cero, igual que las funciones de ``risk_engine.ratios``.
+
+    Attributes:
+        nombre: Clave del ratio en los resultados
+        etiqueta: Nombre legible
+        categoria: Una de ``CATEGORIAS``
+        numerador: Fórmula del numerador en función de las entradas
+        denominador: Entrada usada como denominador
+        formato: 'decimal', 'porcentaje' o 'dias'
+        umbrales: (bueno, aceptable) para la interpretación, o None
+        menor_es_mejor: Si los valores bajos son los favorables
+    """
+    nombre: str
+    etiqueta: str
+    categoria: str
+    numerador: Expresion
+    denominador: str
+    formato: str = 'decimal'
+    umbrales: Optional[Tuple[float, float]] = None
+    menor_es_mejor: bool = False
+
+    @property
+    def entradas(self) -> Tuple[str, ...]:
+        """Todas las entradas del ratio."""
+        return _nombres(self.numerador) + (self.denominador,)
+
+
+RATIOS: Tuple[Ratio, ...] = (
+    # Ratios de liquidez
+    Ratio('liquidez', 'Ratio de Liquidez', 'Liquidez',
+          (Termino('activo_corriente'),), 'pasivo_corriente', umbrales=(2.0, 1.0)),
+    Ratio('prueba_acida', 'Prueba Ácida', 'Liquidez',
+          (Termino('activo_corriente'), Termino('inventarios', -1.0)), 'pasivo_corriente', umbrales=(1.0, 0.7)),
+    Ratio('tesoreria', 'Ratio de Tesorería', 'Liquidez',
+          (Termino('caja_bancos'), Termino('inversiones_cp')), 'pasivo_corriente', umbrales=(0.5, 0.3)),
+    # Ratios de solvencia
+    Ratio('endeudamiento', 'Ratio de Endeudamiento', 'Solvencia',
+          (Termino('pasivo_total'),), 'activo_total',
+          formato='porcentaje', umbrales=(0.5, 0.7), menor_es_mejor=True),
+    Ratio('apalancamiento', 'Ratio de Apalancamiento', 'Solvencia',
+          (Termino('activo_total'),), 'patrimonio', umbrales=(2.0, 3.0), menor_es_mejor=True),
+    # Ratios de rentabilidad
+    Ratio('roa', 'ROA (Rentabilidad sobre Activos)', 'Rentabilidad',
+          (Termino('utilidad_neta'),), 'activo_total', formato='porcentaje', umbrales=(0.1, 0.05)),
+    Ratio('roe', 'ROE (Rentabilidad sobre Patrimonio)', 'Rentabilidad',
+          (Termino('utilidad_neta'),), 'patrimonio', formato='porcentaje', umbrales=(0.1, 0.05)),
+    Ratio('margen_neto', 'Margen Neto', 'Rentabilidad',
+          (Termino('utilidad_neta'),), 'ventas', formato='porcentaje', umbrales=(0.1, 0.05)),
+    # Ratios de eficiencia
+    Ratio('rotacion_activos', 'Rotación de Activos', 'Eficiencia',
+          (Termino('ventas'),), 'activo_total', umbrales=(1.0, 0.5)),
+    Ratio('rotacion_inventarios', 'Rotación de Inventarios', 'Eficiencia',
+          (Termino('costo_ventas'),), 'inventario_promedio', umbrales=(6.0, 3.0)),
+    Ratio('dias_inventario', 'Días de Inventario', 'Eficiencia',
+          (Termino('inventario_promedio', 365.0),), 'costo_ventas',
+          formato='dias', menor_es_mejor=True),
+    Ratio('periodo_medio_cobro', 'Período Medio de Cobro', 'Eficiencia',
+          (Termino('cuentas_por_cobrar', 365.0),), 'ventas_credito',
+          formato='dias', umbrales=(30.0, 60.0), menor_es_mejor=True),
+    Ratio('periodo_medio_pago', 'Período Medio de Pago', 'Eficiencia',
+          (Termino('cuentas_por_pagar', 365.0),), 'compras_credito', formato='dias'),
+)
+
+RATIOS_POR_NOMBRE: Dict[str, Ratio] = {ratio.nombre: ratio for ratio in RATIOS}
+
+
+class Paso(NamedTuple):
+    """
+    Resolución de una entrada dentro de un plan.
+
+    Attributes:
+        entrada: Nombre de la entrada
+        claves: Claves presentes, en orden de preferencia
+        respaldo: Fórmula para los valores ausentes, o None
+    """
+    entrada: str
+    claves: Tuple[str, ...]
+    respaldo: Optional[Expresion]
+
+
+class Plan(NamedTuple):
+    """
+    Entradas a resolver (dependencias primero) y ratios calculables.
+    """
+    pasos: Tuple[Paso, ...]
+    ratios: Tuple[Ratio, ...]
+
+
+def _resolver(nombre: str, campos: FrozenSet[str], pasos: Dict[str, Paso],
+              faltantes: Dict[str, str]) -> bool:
+    """
+    Agrega a ``pasos`` la entrada y sus dependencias si se pueden resolver.
+
+    Las entradas que no se pueden resolver quedan en ``faltantes`` con el
+    campo obligatorio que falta, o '' si solo falta un dato complementario.
+    """
+    if nombre in pasos:
+        return True
+    if nombre in faltantes:
+        return False
+
+    entrada = ENTRADAS[nombre]
+    claves = tuple(clave for clave in entrada.claves if clave in campos)
+    dependencias = entrada.dependencias
+    respaldo = entrada.respaldo
+    if respaldo is not None:
+        resueltas = [_resolver(dep, campos, pasos, faltantes) for dep in dependencias]
+        if not all(resueltas):
+            respaldo = None
+
+    if not claves and respaldo is None:
+        if entrada.obligatoria:
+            faltantes[nombre] = entrada.claves[0]
+        else:
+            faltantes[nombre] = next(
+                (faltantes[dep] for dep in dependencias if faltantes.get(dep)), ''
+            )
+        return False
+
+    pasos[nombre] = Paso(nombre, claves, respaldo)
+    return True
+
+
+@lru_cache(maxsize=128)
+def planificar(campos: FrozenSet[str], nombres: Optional[Tuple[str, ...]] = None) -> Plan:
+    """
+    Arma el plan de evaluación para un conjunto de claves de entrada.
+
+    Args:
+        campos: Claves presentes en los datos
+        nombres: Ratios pedidos, o None para todos los del registro
+
+    Returns:
+        Plan con los ratios pedidos cuyas entradas están presentes, en el
+        orden del registro
+
+    Raises:
+        KeyError: Si un ratio pedido necesita un campo obligatorio ausente
+        ValueError: Si se pide un ratio que no está en el registro
+    """
+    if nombres is None:
+        seleccion = RATIOS
+    else:
+        desconocidos = [nombre for nombre in nombres if nombre not in RATIOS_POR_NOMBRE]
+        if desconocidos:
+            raise ValueError(f"Ratios desconocidos: {', '.join(desconocidos)}")
+        seleccion = tuple(ratio for ratio in RATIOS if ratio.nombre in nombres)
+
+    pasos: Dict[str, Paso] = {}
+    faltantes: Dict[str, str] = {}
+    ratios = []
+    for ratio in seleccion:
+        resueltas = [_resolver(nombre, campos, pasos, faltantes) for nombre in ratio.entradas]
+        if all(resueltas):
+            ratios.append(ratio)
+            continue
+        falta = next((faltantes[nombre] for nombre in ratio.entradas if faltantes.get(nombre)), '')
+        if falta:
+            raise KeyError(falta)
+
+    # Solo las entradas que usan los ratios calculables
+    usadas = set()
+    pendientes = [nombre for ratio in ratios for nombre in ratio.entradas]
+    while pendientes:
+        nombre = pendientes.pop()
+        if nombre not in usadas:
+            usadas.add(nombre)
+            if pasos[nombre].respaldo is not None:
+                pendientes.extend(_nombres(pasos[nombre].respaldo))
+
+    return Plan(
+        tuple(paso for nombre, paso in pasos.items() if nombre in usadas),
+        tuple(ratios)
+    )
+
+
+def ratios_disponibles(campos) -> Tuple[str, ...]:
+    """
+    Ratios del registro calculables con las claves indicadas.
+
+    Args:
+        campos: Claves presentes en los datos
+
+    Returns:
+        Nombres de los ratios, en el orden del registro
+    """
+    return tuple(ratio.nombre for ratio in planificar(frozenset(campos)).ratios)
+
+
+def _funcion(expresion: Expresion) -> Callable[[Mapping], Any]:
+    """
+    Función de los valores resueltos que evalúa una fórmula, con atajos para
+    las de un solo término (la mayoría de numeradores y aproximaciones).
+    """
+    if len(expresion) == 1:
+        entrada, factor = expresion[0]
+        if factor == 1:
+            return itemgetter(entrada)
+        return lambda valores: factor * valores[entrada]
+    return partial(evaluar, expresion)
+
+
+@lru_cache(maxsize=128)
+def compilar_escalar(
+    campos: FrozenSet[str], nombres: Optional[Tuple[str, ...]] = None
+) -> Callable[[Mapping], Dict[str, Optional[float]]]:
+    """
+    Arma el evaluador de ratios de una empresa para un conjunto de claves.
+
+    El plan se resuelve una sola vez por esquema: el evaluador solo lee la
+    clave elegida para cada entrada (o aplica su aproximación) y evalúa las
+    fórmulas del registro.
+
+    Args:
+        campos: Claves presentes en los datos de la empresa
+        nombres: Ratios pedidos, o None para todos los del registro
+
+    Returns:
+        Función que recibe los datos de la empresa (diccionario o
+        FinancialStatement) y retorna nombre → valor o None
+
+    Raises:
+        KeyError: Si un ratio pedido necesita un campo obligatorio ausente
+        ValueError: Si se pide un ratio que no está en el registro
+    """
+    plan = planificar(campos, nombres)
+    pasos = tuple(
+        (paso.entrada, paso.claves[0] if paso.claves else None,
+         None if paso.claves else _funcion(paso.respaldo))
+        for paso in plan.pasos
+    )
+    ratios = tuple(
+        (ratio.nombre, _funcion(ratio.numerador), ratio.denominador) for ratio in plan.ratios
+    )
+
+    def evaluar_empresa(data) -> Dict[str, Optional[float]]:
+        valores = {}
+        for entrada, clave, respaldo in pasos:
+            valores[entrada] = data[clave] if clave is not None else respaldo(valores)
+        resultado = {}
+        for nombre, numerador, denominador in ratios:
+            divisor = valores[denominador]
+            resultado[nombre] = None if divisor == 0 else numerador(valores) / divisor
+        return resultado
+
+    return evaluar_empresa
@@ -0,0 +1,423 @@
+"""
+Servicio HTTP asíncrono de puntuación (solo biblioteca estándar + NumPy).
+
+Endpoints:
+    POST /score         Un diccionario de empresa → resultado de análisis
+    POST /score/batch   {"empresas": [...]} (o una lista) → {"resultados": [...]}
+    GET  /salud         Estado del servicio y contadores del programador
+
+Los resultados tienen la misma forma que ``risk_engine.pipeline.analizar_empresa``
+({'ratios', 'zscore', 'clasificacion'}).
+
+Las solicitudes individuales concurrentes no se puntúan una a una: el
+``ProgramadorLotes`` las acumula y las evalúa juntas con una sola llamada
+vectorizada a ``puntuar_lote``. Por defecto el lote se vacía en la siguiente
+iteración del event loop, de modo que bajo carga se agrupan las solicitudes
+que llegaron en el mismo ciclo sin agregar latencia cuando hay poco tráfico.
+
+Uso:
+    python -m risk_engine.cli serve --port 8000
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from risk_engine.batch import (
+    CAMPOS_MOTOR,
+    columnas_de_registros,
+    puntuar_lote,
+    registros_de_resultados,
+)
+from utils.validation_core import (
+    CAMPOS_NO_NEGATIVOS,
+    parsear_numero,
+    validar_campos,
+    verificar_no_negativo,
+)
+
+# Campos sin aproximación posible: el motor no puede calcular sin ellos
+CAMPOS_REQUERIDOS = (
+    'activo_corriente',
+    'pasivo_corriente',
+    'pasivo_total',
+    'patrimonio',
+    'ventas',
+    'utilidad_neta',
+    'ebit',
+)
+
+MAX_CUERPO = 10 * 1024 * 1024
+
+_MOTIVOS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+}
+
+
+class ErrorSolicitud(Exception):
+    """Error de la solicitud que se responde con un código HTTP."""
+
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.mensaje = mensaje
+
+
+def validar_registro(registro: Any) -> Dict[str, float]:
+    """
+    Valida y normaliza los datos de una empresa recibidos por JSON.
+
+    Acepta números o textos con separadores de miles ("100,000"). Las claves
+    desconocidas se ignoran y los opcionales en null se omiten. Los valores
+    se validan con ``validar_campos``, igual que en el formulario de la
+    aplicación (incluidos los campos que no admiten negativos).
+
+    Args:
+        registro: Objeto JSON decodificado
+
+    Returns:
+        Diccionario campo → float con los campos del motor
+
+    Raises:
+        ErrorSolicitud: Si falta un campo requerido o un valor no es numérico
+            o es negativo donde no se admite
+    """
+    if not isinstance(registro, dict):
+        raise ErrorSolicitud(400, "Cada empresa debe ser un objeto JSON.")
+
+    datos, errores = validar_campos(
+        {}, {campo: registro.get(campo) for campo in CAMPOS_MOTOR}, CAMPOS_NO_NEGATIVOS
+    )
+    if errores:
+        raise ErrorSolicitud(400, errores[0].mensaje)
+
+    for campo in CAMPOS_REQUERIDOS:
+        if campo not in datos:
+            raise ErrorSolicitud(400, f"El campo '{campo}' es obligatorio.")
+    return datos
+
+
+_TIPOS_NUMERICOS = {int, float, type(None)}
+
+
+def _columna_mixta(valores: list, campo: str, errores: Dict[int, str]) -> np.ndarray:
+    """
+    Convierte una columna con textos u otros tipos, valor por valor,
+    registrando el primer error de cada fila.
+    """
+    columna = np.full(len(valores), np.nan)
+    for i, valor in enumerate(valores):
+        if valor is None:
+            continue
+        numero, error = parsear_numero(valor, campo)
+        if error is not None:
+            errores.setdefault(i, error.mensaje)
+        else:
+            columna[i] = numero
+    return columna
+
+
+def validar_registros(registros: Sequence[Any]) -> Tuple[Dict[str, np.ndarray], Dict[int, str]]:
+    """
+    Valida una lista de empresas columna por columna.
+
+    Equivale a aplicar ``validar_registro`` a cada elemento (con las mismas
+    reglas de ``validar_campos``), pero las columnas que solo contienen
+    números se convierten de una vez con NumPy; solo las columnas con textos
+    se recorren valor por valor.
+
+    Args:
+        registros: Objetos JSON decodificados
+
+    Returns:
+        Tupla (columnas, errores): columnas float64 de todos los registros
+        (NaN en ausentes) y mensaje del primer error de cada fila inválida
+    """
+    errores: Dict[int, str] = {}
+    objetos = []
+    for i, registro in enumerate(registros):
+        if isinstance(registro, dict):
+            objetos.append(registro)
+        else:
+            errores[i] = "Cada empresa debe ser un objeto JSON."
+            objetos.append({})
+
+    columnas = {}
+    for campo in CAMPOS_MOTOR:
+        valores = [registro.get(campo) for registro in objetos]
+        tipos = set(map(type, valores))
+        if tipos <= _TIPOS_NUMERICOS:
+            if tipos != {type(None)}:
+                columna = np.array(valores, dtype=np.float64)
+                # NaN e Infinity de JSON no son numéricos (como en parsear_numero);
+                # los NaN solo se buscan si hay más que valores null
+                no_finitos = np.isinf(columna)
+                nulos = np.isnan(columna)
+                if nulos.sum() > valores.count(None):
+                    no_finitos |= nulos & np.array([valor is not None for valor in valores])
+                for i in np.flatnonzero(no_finitos).tolist():
+                    errores.setdefault(i, f"El campo '{campo}' debe ser numérico.")
+                columnas[campo] = columna
+        else:
+            columnas[campo] = _columna_mixta(valores, campo, errores)
+
+    for campo, columna in columnas.items():
+        if campo in CAMPOS_NO_NEGATIVOS:
+            for i in np.flatnonzero(columna < 0).tolist():
+                errores.setdefault(i, verificar_no_negativo(columna[i], campo).mensaje)
+
+    for campo in CAMPOS_REQUERIDOS:
+        columna = columnas.get(campo)
+        faltantes = (range(len(objetos)) if columna is None
+                     else np.flatnonzero(np.isnan(columna)).tolist())
+        for i in faltantes:
+            errores.setdefault(i, f"El campo '{campo}' es obligatorio.")
+    return columnas, errores
+
+
+def puntuar_registros(registros: List[Mapping]) -> List[dict]:
+    """
+    Puntúa una lista de registros ya validados con una llamada vectorizada.
+    """
+    if not registros:
+        return []
+    columnas = columnas_de_registros(registros)
+    return registros_de_resultados(puntuar_lote(columnas), columnas)
+
+
+class ProgramadorLotes:
+    """
+    Agrupa solicitudes individuales concurrentes en lotes vectorizados.
+
+    Args:
+        tam_max: Tamaño máximo de lote; al alcanzarlo se vacía de inmediato
+        espera_max: Segundos máximos que una solicitud espera a otras
+            (0 = vaciar en la siguiente iteración del event loop)
+    """
+
+    def __init__(self, tam_max: int = 512, espera_max: float = 0.0):
+        self.tam_max = tam_max
+        self.espera_max = espera_max
+        self._pendientes: List[Tuple[Mapping, asyncio.Future]] = []
+        self._programado: Optional[asyncio.Handle] = None
+        self.solicitudes = 0
+        self.lotes = 0
+
+    async def puntuar(self, registro: Mapping) -> dict:
+        """
+        Encola un registro validado y espera su resultado.
+        """
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._pendientes.append((registro, futuro))
+
+        if len(self._pendientes) >= self.tam_max:
+            self._vaciar()
+        elif self._programado is None:
+            if self.espera_max > 0:
+                self._programado = loop.call_later(self.espera_max, self._vaciar)
+            else:
+                self._programado = loop.call_soon(self._vaciar)
+        return await futuro
+
+    def _vaciar(self) -> None:
+        """Puntúa todas las solicitudes pendientes en un solo lote."""
+        if self._programado is not None:
+            self._programado.cancel()
+            self._programado = None
+        pendientes, self._pendientes = self._pendientes, []
+        if not pendientes:
+            return
+
+        self.solicitudes += len(pendientes)
+        self.lotes += 1
+        try:
+            resultados = puntuar_registros([registro for registro, _ in pendientes])
+        except Exception as exc:  # el error se entrega a cada solicitud
+            for _, futuro in pendientes:
+                if not futuro.done():
+                    futuro.set_exception(exc)
+            return
+
+        for (_, futuro), resultado in zip(pendientes, resultados):
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Contadores de solicitudes y lotes procesados."""
+        return {
+            'solicitudes': self.solicitudes,
+            'lotes': self.lotes,
+            'tam_medio_lote': self.solicitudes / self.lotes if self.lotes else 0.0,
+        }
+
+
+def _respuesta(estado: int, cuerpo: Any, mantener: bool,
+               extra: Optional[Dict[str, str]] = None) -> bytes:
+    """Serializa una respuesta HTTP/1.1 con cuerpo JSON."""
+    datos = json.dumps(cuerpo, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    lineas = [
+        f"HTTP/1.1 {estado} {_MOTIVOS.get(estado, '')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(datos)}",
+        f"Connection: {'keep-alive' if mantener else 'close'}",
+    ]
+    lineas.extend(f"{nombre}: {valor}" for nombre, valor in (extra or {}).items())
+    return ("\r\n".join(lineas) + "\r\n\r\n").encode('latin-1') + datos
+
+
+class ServicioPuntuacion:
+    """
+    Servidor HTTP/1.1 mínimo sobre ``asyncio.start_server`` con keep-alive.
+
+    Args:
+        tam_lote: Tamaño máximo de lote del programador
+        espera_ms: Espera máxima en milisegundos para agrupar solicitudes
+        max_cuerpo: Tamaño máximo del cuerpo de una solicitud en bytes
+
+    Examples:
+        >>> servicio = ServicioPuntuacion()
+        >>> servidor = await servicio.iniciar('127.0.0.1', 8000)
+    """
+
+    def __init__(self, tam_lote: int = 512, espera_ms: float = 0.0,
+                 max_cuerpo: int = MAX_CUERPO):
+        self.programador = ProgramadorLotes(tam_lote, espera_ms / 1000)
+        self.max_cuerpo = max_cuerpo
+        self._rutas = {
+            '/score': ('POST', self._score),
+            '/score/batch': ('POST', self._score_batch),
+            '/salud': ('GET', self._salud),
+        }
+
+    async def iniciar(self, host: str = '127.0.0.1', port: int = 8000) -> asyncio.AbstractServer:
+        """Inicia el servidor y lo retorna (sin bloquear)."""
+        return await asyncio.start_server(self._atender, host, port)
+
+    async def _score(self, cuerpo: Any) -> Any:
+        return await self.programador.puntuar(validar_registro(cuerpo))
+
+    async def _score_batch(self, cuerpo: Any) -> Any:
+        empresas = cuerpo.get('empresas') if isinstance(cuerpo, dict) else cuerpo
+        if not isinstance(empresas, list):
+            raise ErrorSolicitud(400, "Se esperaba una lista 'empresas'.")
+
+        columnas, errores = validar_registros(empresas)
+        if errores:
+            i = min(errores)
+            raise ErrorSolicitud(400, f"Empresa {i}: {errores[i]}")
+        if not empresas:
+            return {'resultados': []}
+        return {'resultados': registros_de_resultados(puntuar_lote(columnas), columnas)}
+
+    async def _salud(self, cuerpo: Any) -> Any:
+        return {'estado': 'ok', **self.programador.estadisticas()}
+
+    async def _despachar(self, metodo: str, ruta: str, cuerpo: bytes) -> Tuple[int, Any, dict]:
+        """Resuelve la ruta y ejecuta el manejador correspondiente."""
+        ruta = ruta.split('?', 1)[0]
+        if ruta not in self._rutas:
+            return 404, {'error': f"Ruta no encontrada: {ruta}"}, {}
+        metodo_ruta, manejador = self._rutas[ruta]
+        if metodo != metodo_ruta:
+            return 405, {'error': f"Método no permitido: {metodo}"}, {'Allow': metodo_ruta}
+
+        try:
+            datos = json.loads(cuerpo) if cuerpo else None
+        except (ValueError, UnicodeDecodeError):
+            return 400, {'error': "El cuerpo no es JSON válido."}, {}
+
+        try:
+            return 200, await manejador(datos), {}
+        except ErrorSolicitud as exc:
+            return exc.estado, {'error': exc.mensaje}, {}
+        except Exception as exc:  # no dejar caer la conexión por un error interno
+            return 500, {'error': f"Error interno: {exc}"}, {}
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atiende una conexión, con varias solicitudes si hay keep-alive."""
+        try:
+            while True:
+                try:
+                    cabecera = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(_respuesta(431, {'error': "Cabeceras demasiado grandes."}, False))
+                    break
+
+                lineas = cabecera.decode('latin-1').split('\r\n')
+                try:
+                    metodo, ruta, version = lineas[0].split(' ', 2)
+                except ValueError:
+                    writer.write(_respuesta(400, {'error': "Solicitud mal formada."}, False))
+                    break
+                cabeceras = {}
+                for linea in lineas[1:]:
+                    nombre, _, valor = linea.partition(':')
+                    if nombre:
+                        cabeceras[nombre.strip().lower()] = valor.strip()
+
+                conexion = cabeceras.get('connection', '').lower()
+                mantener = (conexion != 'close' if version == 'HTTP/1.1'
+                            else conexion == 'keep-alive')
+
+                if 'transfer-encoding' in cabeceras:
+                    writer.write(_respuesta(411, {'error': "Se requiere Content-Length."}, False))
+                    break
+                # Solo dígitos ASCII: int() aceptaría '-5', '+5' o '1_0'
+                largo = cabeceras.get('content-length', '0')
+                if not (largo.isascii() and largo.isdigit()):
+                    writer.write(_respuesta(400, {'error': "Content-Length inválido."}, False))
+                    break
+                largo = int(largo)
+                if largo > self.max_cuerpo:
+                    writer.write(_respuesta(413, {'error': "Cuerpo demasiado grande."}, False))
+                    break
+
+                try:
+                    cuerpo = await reader.readexactly(largo) if largo else b''
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                estado, respuesta, extra = await self._despachar(metodo, ruta, cuerpo)
+                writer.write(_respuesta(estado, respuesta, mantener, extra))
+                await writer.drain()
+                if not mantener:
+                    break
+        finally:
+            writer.close()
+
+
+async def _servir(host: str, port: int, tam_lote: int, espera_ms: float) -> None:
+    servidor = await ServicioPuntuacion(tam_lote, espera_ms).iniciar(host, port)
+    direcciones = ', '.join(str(s.getsockname()) for s in servidor.sockets)
+    print(f"Servicio de puntuación escuchando en {direcciones}", flush=True)
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def servir(host: str = '127.0.0.1', port: int = 8000, tam_lote: int = 512,
+           espera_ms: float = 0.0) -> None:
+    """
+    Ejecuta el servicio hasta que se interrumpa (Ctrl+C).
+
+    Args:
+        host: Dirección de escucha
+        port: Puerto de escucha
+        tam_lote: Tamaño máximo de lote del programador
+        espera_ms: Espera máxima en milisegundos para agrupar solicitudes
+    """
+    try:
+        asyncio.run(_servir(host, port, tam_lote, espera_ms))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,210 @@
+"""
+Módulo de almacén columnar en memoria compartida.
+
+``AlmacenColumnas`` guarda los campos de entrada de una cartera y los arreglos
+de resultados en bloques de ``multiprocessing.shared_memory``. Los procesos de
+trabajo reciben solo un descriptor (nombres de los bloques y número de filas),
+crean vistas de NumPy sobre su tramo de filas sin copiar datos y escriben los
+ratios y el Z-Score directamente en los arreglos de salida preasignados.
+"""
+
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from risk_engine.batch import puntuar_lote
+from risk_engine.registry import ratios_disponibles
+
+
+def columnas_salida(campos: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Columnas float64 de salida para los campos de entrada de un almacén: los
+    ratios calculables con esos campos y el Z-Score.
+    """
+    return ratios_disponibles(campos) + ('z_score',)
+
+
+class DescriptorAlmacen(NamedTuple):
+    """
+    Referencia serializable a un almacén en memoria compartida.
+
+    Attributes:
+        entrada: Nombre del bloque con los campos de entrada
+        salida: Nombre del bloque con los resultados
+        n_filas: Número de filas de la cartera
+        campos: Campos de entrada presentes, en el orden del bloque
+    """
+    entrada: str
+    salida: str
+    n_filas: int
+    campos: Tuple[str, ...]
+
+
+def _vistas_entrada(buf, n_filas: int, campos: Tuple[str, ...]) -> Dict[str, np.ndarray]:
+    """Crea una vista float64 por campo sobre el bloque de entrada."""
+    matriz = np.ndarray((len(campos), n_filas), dtype=np.float64, buffer=buf)
+    return {campo: matriz[i] for i, campo in enumerate(campos)}
+
+
+def _vistas_salida(buf, n_filas: int, columnas: Tuple[str, ...]) -> Dict[str, np.ndarray]:
+    """
+    Crea las vistas de resultados: una fila float64 por columna de salida
+    seguida de la zona de riesgo en int8.
+    """
+    matriz = np.ndarray((len(columnas), n_filas), dtype=np.float64, buffer=buf)
+    vistas = {nombre: matriz[i] for i, nombre in enumerate(columnas)}
+    vistas['zona'] = np.ndarray(
+        (n_filas,), dtype=np.int8, buffer=buf, offset=matriz.nbytes
+    )
+    return vistas
+
+
+def _tamano_salida(n_filas: int, columnas: Tuple[str, ...]) -> int:
+    return max(1, n_filas * (8 * len(columnas) + 1))
+
+
+def _cerrar(shm: shared_memory.SharedMemory) -> None:
+    """
+    Cierra un bloque de memoria compartida. Si aún quedan vistas sobre él
+    (por ejemplo, en el traceback de una excepción en curso) se omite el
+    error: el mapeo se libera al soltarlas.
+    """
+    try:
+        shm.close()
+    except BufferError:
+        pass
+
+
+class AlmacenColumnas:
+    """
+    Columnas de entrada y salida de una cartera en memoria compartida.
+
+    El proceso que crea el almacén es su dueño y debe liberarlo con
+    ``liberar`` (o usándolo como context manager).
+
+    Examples:
+        >>> with AlmacenColumnas.desde_columnas(columnas) as almacen:
+        ...     puntuar_tramo(almacen.descriptor, 0, almacen.n_filas)
+        ...     z = almacen.salida['z_score'].copy()
+    """
+
+    def __init__(self, n_filas: int, campos: Tuple[str, ...]):
+        self.n_filas = n_filas
+        self.campos = tuple(campos)
+        self.columnas_salida = columnas_salida(self.campos)
+        self._shm_entrada = shared_memory.SharedMemory(
+            create=True, size=max(1, 8 * n_filas * len(self.campos))
+        )
+        self._shm_salida = shared_memory.SharedMemory(
+            create=True, size=_tamano_salida(n_filas, self.columnas_salida)
+        )
+        self.entrada = _vistas_entrada(self._shm_entrada.buf, n_filas, self.campos)
+        self.salida = _vistas_salida(self._shm_salida.buf, n_filas, self.columnas_salida)
+
+    @classmethod
+    def desde_columnas(cls, columnas: Mapping[str, np.ndarray],
+                       n_filas: Optional[int] = None) -> 'AlmacenColumnas':
+        """
+        Crea un almacén copiando (una sola vez) las columnas de entrada.
+
+        Args:
+            columnas: Diccionario campo → arreglo, como el de
+                ``risk_engine.parallel.columnas_motor``
+            n_filas: Número de filas; por defecto el largo de las columnas
+
+        Returns:
+            AlmacenColumnas con los datos cargados
+        """
+        campos = tuple(columnas)
+        if n_filas is None:
+            n_filas = len(next(iter(columnas.values()))) if campos else 0
+        almacen = cls(n_filas, campos)
+        for campo in campos:
+            almacen.entrada[campo][:] = columnas[campo]
+        return almacen
+
+    @property
+    def descriptor(self) -> DescriptorAlmacen:
+        """Descriptor serializable para enviar a los procesos de trabajo."""
+        return DescriptorAlmacen(
+            self._shm_entrada.name, self._shm_salida.name, self.n_filas, self.campos
+        )
+
+    def resultados(self) -> Dict[str, np.ndarray]:
+        """
+        Copia los resultados fuera de la memoria compartida.
+
+        Returns:
+            Diccionario con un arreglo por ratio más ``z_score`` y ``zona``
+        """
+        return {nombre: vista.copy() for nombre, vista in self.salida.items()}
+
+    def liberar(self) -> None:
+        """Cierra y elimina los bloques de memoria compartida."""
+        self.entrada = {}
+        self.salida = {}
+        for shm in (self._shm_entrada, self._shm_salida):
+            _cerrar(shm)
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.liberar()
+
+
+def _puntuar_vistas(entrada, salida, inicio: int, fin: int,
+                    decimales: Optional[int]) -> None:
+    """Puntúa un tramo de vistas y escribe los resultados en la salida."""
+    tramo = {campo: valores[inicio:fin] for campo, valores in entrada.items()}
+    resultados = puntuar_lote(tramo, decimales=decimales)
+    for nombre, destino in salida.items():
+        destino[inicio:fin] = resultados[nombre]
+
+
+def puntuar_tramo(descriptor: DescriptorAlmacen, inicio: int, fin: int,
+                  decimales: Optional[int] = 3) -> int:
+    """
+    Puntúa las filas [inicio, fin) de un almacén compartido.
+
+    Pensada para ejecutarse en un proceso de trabajo: se conecta a los
+    bloques por nombre, lee el tramo sin copiarlo y escribe los resultados en
+    los arreglos de salida compartidos.
+
+    Args:
+        descriptor: Descriptor del almacén
+        inicio: Primera fila del tramo
+        fin: Fila siguiente a la última del tramo
+        decimales: Decimales de redondeo del Z-Score
+
+    Returns:
+        Número de filas puntuadas
+    """
+    shm_entrada = shared_memory.SharedMemory(name=descriptor.entrada)
+    shm_salida = shared_memory.SharedMemory(name=descriptor.salida)
+    try:
+        entrada = _vistas_entrada(shm_entrada.buf, descriptor.n_filas, descriptor.campos)
+        salida = _vistas_salida(shm_salida.buf, descriptor.n_filas,
+                                columnas_salida(descriptor.campos))
+        _puntuar_vistas(entrada, salida, inicio, fin, decimales)
+        # Soltar las vistas antes de cerrar los bloques
+        del entrada, salida
+    finally:
+        # Si la puntuación falló, las vistas siguen vivas en el traceback:
+        # _cerrar no deja que un BufferError oculte la excepción original
+        _cerrar(shm_entrada)
+        _cerrar(shm_salida)
+    return fin - inicio
+
+
+def tramos(n_filas: int, n_tramos: int) -> Iterator[Tuple[int, int]]:
+    """
+    Divide n_filas en como máximo n_tramos rangos contiguos de tamaño similar.
+    """
+    n_tramos = max(1, min(n_tramos, n_filas))
+    limites = np.linspace(0, n_filas, n_tramos + 1).astype(int)
+    for inicio, fin in zip(limites[:-1], limites[1:]):
+        if fin > inicio:
+            yield int(inicio), int(fin)
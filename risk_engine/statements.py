@@ -0,0 +1,110 @@
+"""
+Módulo de estados financieros compactos.
+
+Define ``FinancialStatement``, un registro con ``__slots__`` para los 15 campos
+de entrada del análisis. Se comporta como un diccionario de solo lectura, por
+lo que ``risk_engine.pipeline`` lo acepta directamente, pero ocupa una fracción
+de la memoria de un ``dict`` con claves de texto.
+
+La contraparte columnar para carteras completas es
+``risk_engine.batch.FinancialStatementBatch``.
+"""
+
+from collections.abc import Mapping
+from typing import Iterator, Optional
+
+
+# Campos que el formulario exige siempre
+CAMPOS_OBLIGATORIOS = (
+    'activo_corriente',
+    'pasivo_corriente',
+    'pasivo_total',
+    'patrimonio',
+    'ventas',
+    'utilidad_neta',
+    'ebit',
+    'total_assets',
+    'working_capital',
+    'retained_earnings',
+    'market_value_equity',
+)
+
+# Campos que pueden omitirse (el motor usa aproximaciones)
+CAMPOS_OPCIONALES = (
+    'inventarios',
+    'inventario_promedio',
+    'costo_ventas',
+    'total_liabilities',
+)
+
+CAMPOS = CAMPOS_OBLIGATORIOS + CAMPOS_OPCIONALES
+
+
+class FinancialStatement(Mapping):
+    """
+    Estado financiero de una empresa con almacenamiento por ``__slots__``.
+
+    Los campos opcionales no informados se guardan como None y no aparecen
+    entre las claves, igual que en el diccionario que produce el formulario.
+
+    Examples:
+        >>> estado = FinancialStatement.from_dict(get_ejemplo_empresa_saludable())
+        >>> estado['ventas']
+        2000000.0
+        >>> 'inventarios' in estado
+        True
+    """
+
+    __slots__ = CAMPOS
+
+    def __init__(self, **valores: Optional[float]):
+        desconocidos = set(valores) - set(CAMPOS)
+        if desconocidos:
+            raise TypeError(f"Campos desconocidos: {', '.join(sorted(desconocidos))}")
+
+        for campo in CAMPOS_OBLIGATORIOS:
+            if valores.get(campo) is None:
+                raise TypeError(f"Falta el campo obligatorio '{campo}'")
+            setattr(self, campo, float(valores[campo]))
+
+        for campo in CAMPOS_OPCIONALES:
+            valor = valores.get(campo)
+            setattr(self, campo, None if valor is None else float(valor))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'FinancialStatement':
+        """
+        Crea un estado financiero a partir de un diccionario de datos.
+
+        Args:
+            data: Diccionario con los campos del formulario
+
+        Returns:
+            FinancialStatement con los campos conocidos del diccionario
+        """
+        return cls(**{campo: data[campo] for campo in CAMPOS if campo in data})
+
+    def to_dict(self) -> dict:
+        """
+        Retorna el estado financiero como diccionario (sin campos vacíos).
+        """
+        return dict(self.items())
+
+    def __getitem__(self, campo: str) -> float:
+        if campo not in CAMPOS:
+            raise KeyError(campo)
+        valor = getattr(self, campo)
+        if valor is None:
+            raise KeyError(campo)
+        return valor
+
+    def __iter__(self) -> Iterator[str]:
+        for campo in CAMPOS:
+            if getattr(self, campo) is not None:
+                yield campo
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"FinancialStatement({self.to_dict()!r})"
@@ -0,0 +1,237 @@
+"""
+Módulo de puntuación en flujo NDJSON (entrada y salida estándar).
+
+Lee estados financieros como JSON delimitado por líneas (las mismas claves
+que ``utils.sample_data.get_ejemplo_empresa_saludable``), los puntúa en
+micro-lotes vectorizados y escribe un resultado NDJSON por línea de entrada,
+en el mismo orden.
+
+Un lote se emite cuando alcanza ``tam_lote`` líneas, cuando la entrada deja
+de tener datos disponibles durante ``espera_ms`` o al terminar el flujo. Solo
+se mantiene en memoria el lote en curso, y como la escritura es bloqueante,
+un consumidor lento frena la lectura (contrapresión) en lugar de acumular
+resultados.
+
+Uso:
+    cat estados.ndjson | python -m risk_engine.cli stream > resultados.ndjson
+"""
+
+import json
+import os
+import select
+from operator import itemgetter
+from typing import BinaryIO, Dict, List, Optional
+
+import numpy as np
+
+from risk_engine.batch import puntuar_lote, ratios_por_fila
+from risk_engine.classification import ETIQUETAS_RIESGO
+from risk_engine.service import validar_registros
+
+TAM_LECTURA = 64 * 1024
+
+# Marcador de líneas que no son JSON válido
+_LINEA_INVALIDA = object()
+
+_DECODIFICADOR = json.JSONDecoder()
+
+
+def _hay_datos(fd: int, espera: float) -> bool:
+    """
+    Indica si el descriptor tiene datos para leer antes de ``espera`` segundos.
+
+    En plataformas donde ``select`` no admite el descriptor (tuberías en
+    Windows) se asume que hay datos, y los lotes se emiten por tamaño.
+    """
+    try:
+        listos, _, _ = select.select([fd], [], [], espera)
+    except (OSError, ValueError):
+        return True
+    return bool(listos)
+
+
+def _decodificar(lineas: List[bytes]) -> list:
+    """
+    Decodifica un lote de líneas JSON (ya sin espacios en los extremos).
+
+    Cada línea debe contener exactamente un valor: ``raw_decode`` indica
+    dónde termina, y si no termina al final de la línea (por ejemplo
+    ``{"id":2},{"id":3}`` o el comienzo de un valor partido en dos líneas)
+    la línea es inválida. Decodificar cada línea ya convertida a str cuesta
+    lo mismo que una sola llamada a ``json.loads`` sobre el lote unido.
+    """
+    decodificar = _DECODIFICADOR.raw_decode
+    registros = []
+    for linea in lineas:
+        try:
+            texto = linea.decode('utf-8')
+            registro, fin = decodificar(texto)
+            if fin != len(texto):
+                registro = _LINEA_INVALIDA
+        except ValueError:  # incluye UnicodeDecodeError
+            registro = _LINEA_INVALIDA
+        registros.append(registro)
+    return registros
+
+
+def _textos_json(valores: np.ndarray) -> List[str]:
+    """Convierte un arreglo float64 en literales JSON (null si no es finito)."""
+    # repr de float ya produce el literal JSON más corto para valores finitos
+    textos = list(map(repr, valores.tolist()))
+    for i in np.flatnonzero(~np.isfinite(valores)).tolist():
+        textos[i] = 'null'
+    return textos
+
+
+def _lineas_resultados(resultados: Dict[str, np.ndarray],
+                       columnas: Dict[str, np.ndarray]) -> List[str]:
+    """
+    Da formato JSON a los resultados de ``puntuar_lote`` sin crear un
+    diccionario por empresa. Produce el mismo contenido que serializar
+    ``registros_de_resultados``: cada grupo de filas con los mismos ratios
+    (``ratios_por_fila``) usa su propia plantilla.
+    """
+    grupos, indices = ratios_por_fila(resultados, columnas)
+    usados = set().union(*grupos)
+    nombres = [nombre for nombre in resultados if nombre in usados]
+    posiciones = {nombre: j for j, nombre in enumerate(nombres)}
+    formatos = []
+    for grupo in grupos:
+        plantilla = (
+            '"ratios":{' + ','.join(f'"{nombre}":%s' for nombre in grupo) + '},'
+            '"zscore":%s,"clasificacion":%s}'
+        )
+        # Los ratios del grupo más el Z-Score y la clasificación, al final de la fila
+        seleccion = itemgetter(*(posiciones[nombre] for nombre in grupo),
+                               len(nombres), len(nombres) + 1)
+        formatos.append((plantilla, seleccion))
+    etiquetas = [json.dumps(etiqueta, ensure_ascii=False) for etiqueta in ETIQUETAS_RIESGO]
+
+    textos = [_textos_json(resultados[nombre]) for nombre in nombres]
+    textos.append(_textos_json(resultados['z_score']))
+    textos.append([etiquetas[zona] for zona in resultados['zona'].tolist()])
+    lineas = []
+    for grupo, fila in zip(indices.tolist(), zip(*textos)):
+        plantilla, seleccion = formatos[grupo]
+        lineas.append(plantilla % seleccion(fila))
+    return lineas
+
+
+class FiltroNDJSON:
+    """
+    Puntúa líneas NDJSON en micro-lotes y escribe los resultados.
+
+    Args:
+        salida: Flujo binario de salida
+        tam_lote: Líneas máximas por lote
+        col_id: Clave identificadora a copiar en cada resultado, o None
+    """
+
+    def __init__(self, salida: BinaryIO, tam_lote: int = 1000, col_id: Optional[str] = 'id'):
+        self.salida = salida
+        self.tam_lote = tam_lote
+        self.col_id = col_id
+        # Clave ya serializada: el nombre puede contener comillas o barras
+        self._clave_id = json.dumps(col_id, ensure_ascii=False) if col_id else None
+        self._lote: List[bytes] = []
+        self.estadisticas = {'lineas': 0, 'errores': 0, 'lotes': 0}
+
+    @property
+    def pendientes(self) -> int:
+        """Líneas leídas que aún no se emitieron."""
+        return len(self._lote)
+
+    def agregar(self, linea: bytes) -> None:
+        """
+        Agrega una línea al lote en curso (las líneas vacías se ignoran).
+        """
+        linea = linea.strip()
+        if not linea:
+            return
+        self._lote.append(linea)
+        if len(self._lote) >= self.tam_lote:
+            self.emitir()
+
+    def emitir(self) -> None:
+        """Decodifica, valida y puntúa el lote en curso y escribe sus resultados."""
+        if not self._lote:
+            return
+        lineas, self._lote = self._lote, []
+        primera = self.estadisticas['lineas'] + 1
+        self.estadisticas['lineas'] += len(lineas)
+
+        registros = _decodificar(lineas)
+        columnas, errores = validar_registros(registros)
+        validos = np.ones(len(registros), dtype=bool)
+        validos[list(errores)] = False
+
+        resultados = iter(())
+        if validos.any():
+            columnas = {campo: valores[validos] for campo, valores in columnas.items()}
+            resultados = iter(_lineas_resultados(puntuar_lote(columnas), columnas))
+
+        salida = []
+        for i, registro in enumerate(registros):
+            identificador = None
+            if self.col_id and isinstance(registro, dict):
+                identificador = registro.get(self.col_id)
+            if identificador is None:
+                prefijo = '{'
+            elif type(identificador) is int:
+                prefijo = f'{{{self._clave_id}:{identificador},'
+            else:
+                prefijo = f'{{{self._clave_id}:{json.dumps(identificador, ensure_ascii=False)},'
+
+            if validos[i]:
+                salida.append(prefijo + next(resultados))
+            else:
+                error = ("La línea no es JSON válido." if registro is _LINEA_INVALIDA
+                         else errores[i])
+                cuerpo = json.dumps({'linea': primera + i, 'error': error}, ensure_ascii=False,
+                                    separators=(',', ':'))
+                salida.append(prefijo + cuerpo[1:])
+                self.estadisticas['errores'] += 1
+
+        self.salida.write(('\n'.join(salida) + '\n').encode('utf-8'))
+        self.salida.flush()
+        self.estadisticas['lotes'] += 1
+
+
+def filtrar_ndjson(
+    fd_entrada: int,
+    salida: BinaryIO,
+    tam_lote: int = 1000,
+    espera_ms: float = 0.0,
+    col_id: Optional[str] = 'id'
+) -> Dict[str, int]:
+    """
+    Procesa un flujo NDJSON completo desde un descriptor de archivo.
+
+    Args:
+        fd_entrada: Descriptor de la entrada (por ejemplo ``sys.stdin.fileno()``)
+        salida: Flujo binario de salida (por ejemplo ``sys.stdout.buffer``)
+        tam_lote: Líneas máximas por lote
+        espera_ms: Tiempo sin datos de entrada tras el cual se emite un lote
+            incompleto (0 = en cuanto la entrada no tenga datos disponibles)
+        col_id: Clave identificadora a copiar en cada resultado, o None
+
+    Returns:
+        Contadores de líneas, errores y lotes emitidos
+    """
+    filtro = FiltroNDJSON(salida, tam_lote, col_id)
+    resto = b''
+    while True:
+        if filtro.pendientes and not _hay_datos(fd_entrada, espera_ms / 1000):
+            filtro.emitir()
+
+        datos = os.read(fd_entrada, TAM_LECTURA)
+        if not datos:
+            break
+        lineas = (resto + datos).split(b'\n')
+        resto = lineas.pop()
+        for linea in lineas:
+            filtro.agregar(linea)
+
+    filtro.agregar(resto)
+    filtro.emitir()
+    return filtro.estadisticas
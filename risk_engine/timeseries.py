@@ -0,0 +1,252 @@
+"""
+Módulo de análisis multiperíodo (series de estados financieros).
+
+Recibe estados financieros en formato largo, una fila por (empresa,
+período), y calcula sobre arreglos completos, sin recorrer empresas en
+Python:
+
+    - Los ratios, el Z-Score y la zona de riesgo de cada período
+      (``puntuar_lote``), con los flujos del período anualizados.
+    - El inventario promedio a partir de saldos consecutivos, y con él la
+      rotación y los días de inventario.
+    - Medias móviles y variaciones por empresa de cada indicador.
+
+Uso::
+
+    series = analizar_series(estados, col_empresa='id', col_periodo='periodo')
+    series['roe_media_4'], series['z_score_delta_1']
+
+Las filas se ordenan por empresa y período; los cálculos entre períodos
+nunca cruzan de una empresa a otra. El período anterior es la fila anterior
+de la misma empresa, aunque falten períodos intermedios.
+"""
+
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+
+from risk_engine.batch import CAMPOS_MOTOR, puntuar_lote
+
+# Campos que son flujos del período (el resto son saldos al cierre)
+CAMPOS_FLUJO = (
+    'ventas',
+    'utilidad_neta',
+    'ebit',
+    'costo_ventas',
+    'ventas_credito',
+    'compras_credito',
+)
+
+
+def ordenar_panel(
+    empresas, periodos
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ordena las filas por empresa y período.
+
+    Args:
+        empresas: Identificador de la empresa de cada fila
+        periodos: Período de cada fila (números, fechas o textos que se
+            ordenan cronológicamente, como '2024Q1')
+
+    Returns:
+        Tupla (orden, inicio_grupo):
+        - orden: Posiciones que ordenan las filas
+        - inicio_grupo: Para cada fila ya ordenada, la posición de la primera
+          fila de su empresa
+
+    Raises:
+        ValueError: Si una empresa repite un período
+    """
+    import pandas as pd
+
+    codigos_empresa, _ = pd.factorize(np.asarray(empresas), sort=True)
+    codigos_periodo, _ = pd.factorize(np.asarray(periodos), sort=True)
+    orden = np.lexsort((codigos_periodo, codigos_empresa))
+
+    empresa = codigos_empresa[orden]
+    periodo = codigos_periodo[orden]
+    nueva = np.empty(len(orden), dtype=bool)
+    nueva[:1] = True
+    np.not_equal(empresa[1:], empresa[:-1], out=nueva[1:])
+    if np.any(~nueva[1:] & (periodo[1:] == periodo[:-1])):
+        raise ValueError("Hay empresas con más de una fila para el mismo período.")
+
+    inicio_grupo = np.where(nueva, np.arange(len(orden)), 0)
+    np.maximum.accumulate(inicio_grupo, out=inicio_grupo)
+    return orden, inicio_grupo
+
+
+def promedio_consecutivo(saldos: np.ndarray, inicio_grupo: np.ndarray) -> np.ndarray:
+    """
+    Promedia cada saldo con el del período anterior de la misma empresa.
+
+    En el primer período de cada empresa, o si el saldo anterior es NaN, se
+    usa el saldo del período.
+
+    Args:
+        saldos: Saldos de cierre ordenados por empresa y período
+        inicio_grupo: Resultado de ``ordenar_panel``
+
+    Returns:
+        Arreglo float64 con el saldo promedio
+    """
+    saldos = np.asarray(saldos, dtype=np.float64)
+    anterior = np.empty_like(saldos)
+    anterior[:1] = np.nan
+    anterior[1:] = saldos[:-1]
+    posiciones = np.arange(len(saldos))
+    anterior[posiciones == inicio_grupo] = np.nan
+    return np.where(np.isnan(anterior), saldos, (saldos + anterior) / 2)
+
+
+def media_movil(
+    valores: np.ndarray,
+    inicio_grupo: np.ndarray,
+    ventana: int,
+    min_periodos: Optional[int] = None
+) -> np.ndarray:
+    """
+    Media móvil de los últimos ``ventana`` períodos de cada empresa.
+
+    Se calcula con sumas acumuladas, por lo que el costo no depende de la
+    ventana. Los NaN se excluyen de la media.
+
+    Args:
+        valores: Indicador ordenado por empresa y período
+        inicio_grupo: Resultado de ``ordenar_panel``
+        ventana: Períodos de la ventana
+        min_periodos: Valores no NaN requeridos en la ventana (por defecto
+            la ventana completa); con menos, el resultado es NaN
+
+    Returns:
+        Arreglo float64 con la media móvil
+    """
+    if ventana < 1:
+        raise ValueError("La ventana debe ser de al menos un período.")
+    if min_periodos is None:
+        min_periodos = ventana
+
+    valores = np.asarray(valores, dtype=np.float64)
+    validos = ~np.isnan(valores)
+    suma = np.zeros(len(valores) + 1)
+    np.cumsum(np.where(validos, valores, 0.0), out=suma[1:])
+    cuenta = np.zeros(len(valores) + 1, dtype=np.int64)
+    np.cumsum(validos, out=cuenta[1:])
+
+    fin = np.arange(1, len(valores) + 1)
+    inicio = np.maximum(fin - ventana, inicio_grupo)
+    n_validos = cuenta[fin] - cuenta[inicio]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media = (suma[fin] - suma[inicio]) / n_validos
+    media[n_validos < max(min_periodos, 1)] = np.nan
+    return media
+
+
+def diferencia(valores: np.ndarray, inicio_grupo: np.ndarray, rezago: int = 1) -> np.ndarray:
+    """
+    Variación de cada indicador respecto de ``rezago`` períodos antes en la
+    misma empresa (NaN si la empresa no tiene ese período).
+
+    Args:
+        valores: Indicador ordenado por empresa y período
+        inicio_grupo: Resultado de ``ordenar_panel``
+        rezago: Períodos hacia atrás
+
+    Returns:
+        Arreglo float64 con la diferencia
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    resultado = np.full(len(valores), np.nan)
+    if rezago < len(valores):
+        resultado[rezago:] = valores[rezago:] - valores[:-rezago]
+    resultado[np.arange(len(valores)) - rezago < inicio_grupo] = np.nan
+    return resultado
+
+
+def analizar_series(
+    estados: Mapping,
+    col_empresa: str = 'id',
+    col_periodo: str = 'periodo',
+    ventana: int = 4,
+    rezago: int = 1,
+    periodos_por_anio: int = 4,
+    indicadores: Optional[Iterable[str]] = None,
+    decimales: Optional[int] = 3
+) -> Dict[str, np.ndarray]:
+    """
+    Analiza estados financieros de varios períodos por empresa.
+
+    Si ``inventario_promedio`` no viene informado, se calcula como el
+    promedio entre el saldo de ``inventarios`` del período y el del período
+    anterior. Los flujos del período (``CAMPOS_FLUJO``) se anualizan
+    multiplicándolos por ``periodos_por_anio`` antes de puntuar, así todos los
+    ratios, el Z-Score y la zona usan la misma escala anual que el motor: una
+    empresa con trimestres iguales obtiene la misma zona con datos
+    trimestrales que con los anuales.
+
+    Args:
+        estados: DataFrame o diccionario de arreglos con ``col_empresa``,
+            ``col_periodo`` y los campos financieros de cada período
+        col_empresa: Columna identificadora de la empresa
+        col_periodo: Columna del período
+        ventana: Períodos de las medias móviles
+        rezago: Períodos hacia atrás de las variaciones
+        periodos_por_anio: Períodos por año (4 = trimestral, 1 = anual)
+        indicadores: Indicadores con media móvil y variación (por defecto
+            todos los ratios y el Z-Score)
+        decimales: Decimales de redondeo del Z-Score o None
+
+    Returns:
+        Diccionario de arreglos ordenados por empresa y período: la empresa,
+        el período, los ratios, ``z_score``, ``zona`` y,
+        por indicador, ``<indicador>_media_<ventana>`` y
+        ``<indicador>_delta_<rezago>``
+
+    Raises:
+        KeyError: Si falta un campo obligatorio o la columna de empresa o
+            período
+        ValueError: Si una empresa repite un período o ``periodos_por_anio``
+            es menor que 1
+    """
+    if periodos_por_anio < 1:
+        raise ValueError("Debe haber al menos un período por año.")
+
+    empresas = np.asarray(estados[col_empresa])
+    periodos = np.asarray(estados[col_periodo])
+    orden, inicio_grupo = ordenar_panel(empresas, periodos)
+
+    columnas = {
+        campo: np.asarray(estados[campo], dtype=np.float64)[orden]
+        for campo in CAMPOS_MOTOR if campo in estados
+    }
+
+    # Inventario promedio a partir de saldos consecutivos (si no viene dado)
+    if 'inventarios' in columnas:
+        promedio = promedio_consecutivo(columnas['inventarios'], inicio_grupo)
+        if 'inventario_promedio' in columnas:
+            promedio = np.where(np.isnan(columnas['inventario_promedio']), promedio,
+                                columnas['inventario_promedio'])
+        columnas['inventario_promedio'] = promedio
+
+    # El motor supone flujos anuales
+    if periodos_por_anio != 1:
+        for campo in CAMPOS_FLUJO:
+            if campo in columnas:
+                columnas[campo] *= periodos_por_anio
+
+    resultados = puntuar_lote(columnas, decimales=decimales)
+
+    series = {col_empresa: empresas[orden], col_periodo: periodos[orden]}
+    zona = resultados.pop('zona')
+    z_score = resultados.pop('z_score')
+    series.update(resultados)
+    series['z_score'] = z_score
+    series['zona'] = zona
+
+    if indicadores is None:
+        indicadores = list(resultados) + ['z_score']
+    for nombre in indicadores:
+        series[f'{nombre}_media_{ventana}'] = media_movil(series[nombre], inicio_grupo, ventana)
+        series[f'{nombre}_delta_{rezago}'] = diferencia(series[nombre], inicio_grupo, rezago)
+    return series
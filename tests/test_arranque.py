@@ -0,0 +1,85 @@
+"""
+Tests del tiempo de arranque en frío de la aplicación.
+
+Verifican con ``python -X importtime`` que los módulos que app.py importa al
+inicio no cargan librerías pesadas (pandas, numpy, pyarrow, plotly.express) y
+que su costo de importación se mantiene dentro del presupuesto.
+"""
+
+import ast
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Presupuesto de importación de los módulos propios (con Streamlit ya cargado)
+PRESUPUESTO_MS = 150
+
+MODULOS_PESADOS = ('pandas', 'numpy', 'pyarrow', 'plotly.express')
+
+
+def modulos_importados_por_app() -> list:
+    """Módulos importados en el nivel superior de app.py (sin Streamlit)."""
+    with open(os.path.join(RAIZ, 'app.py'), encoding='utf-8') as archivo:
+        arbol = ast.parse(archivo.read())
+
+    modulos = []
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.Import):
+            modulos.extend(alias.name for alias in nodo.names)
+        elif isinstance(nodo, ast.ImportFrom) and nodo.module:
+            modulos.append(nodo.module)
+    return [m for m in modulos if m.split('.')[0] != 'streamlit']
+
+
+def ejecutar_con_importtime(modulos: list) -> subprocess.CompletedProcess:
+    """Importa Streamlit y luego los módulos indicados con -X importtime."""
+    codigo = (
+        "import sys\n"
+        "import streamlit\n"
+        "previos = set(sys.modules)\n"
+        f"for modulo in {modulos!r}:\n"
+        "    __import__(modulo)\n"
+        f"pesados = [m for m in {MODULOS_PESADOS!r} if m in sys.modules and m not in previos]\n"
+        "print(','.join(pesados))\n"
+    )
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        capture_output=True, text=True, cwd=RAIZ
+    )
+
+
+class TestArranqueEnFrio(unittest.TestCase):
+    """La página de inicio no debe pagar el costo de pandas ni plotly."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.modulos = modulos_importados_por_app()
+        cls.resultado = ejecutar_con_importtime(cls.modulos)
+
+    def test_app_importa_modulos_propios(self):
+        """app.py importa la capa de UI y el motor en el arranque."""
+        self.assertIn('ui.layout', self.modulos)
+        self.assertIn('risk_engine.pipeline', self.modulos)
+
+    def test_sin_librerias_pesadas(self):
+        """Ningún módulo del arranque carga pandas, numpy o plotly.express."""
+        self.assertEqual(self.resultado.returncode, 0, self.resultado.stderr)
+        self.assertEqual(self.resultado.stdout.strip(), "")
+
+    def test_presupuesto_de_importacion(self):
+        """El tiempo acumulado de los módulos propios respeta el presupuesto."""
+        raices = {m.split('.')[0] for m in self.modulos}
+        total_us = 0
+        for linea in self.resultado.stderr.splitlines():
+            coincidencia = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S+)$", linea)
+            if coincidencia and coincidencia.group(2).split('.')[0] in raices:
+                total_us += int(coincidencia.group(1))
+        self.assertLess(total_us / 1000, PRESUPUESTO_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
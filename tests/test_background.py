@@ -0,0 +1,87 @@
+"""
+Tests de la puntuación de carteras en segundo plano.
+"""
+
+import io
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.background import FALLIDA, TERMINADA, TareaCartera, estimar_filas
+from risk_engine.batch import puntuar_lote
+from utils.sample_data import generar_cartera
+
+
+def archivo_subido(contenido: bytes, nombre: str) -> io.BytesIO:
+    """Archivo en memoria con nombre, como los de st.file_uploader."""
+    archivo = io.BytesIO(contenido)
+    archivo.name = nombre
+    return archivo
+
+
+def cartera_csv(n_filas: int, **opciones) -> bytes:
+    """Cartera sintética en CSV."""
+    bloque = next(generar_cartera(n_filas, tam_bloque=n_filas))
+    return pd.DataFrame(bloque).to_csv(index=False, **opciones).encode('utf-8')
+
+
+def ejecutar(tarea: TareaCartera) -> TareaCartera:
+    """Ejecuta la tarea y espera a que termine."""
+    tarea.start()
+    tarea.join(timeout=30)
+    return tarea
+
+
+class TestTareaCartera(unittest.TestCase):
+    """Tests de TareaCartera."""
+
+    def test_csv_en_bloques(self):
+        """Los resultados conservan el orden del archivo y coinciden con puntuar_lote."""
+        bloque = next(generar_cartera(2500, tam_bloque=2500))
+        bloque['sector'] = np.array(['Retail', 'Industria'] * 1250, dtype=object)
+        archivo = archivo_subido(
+            pd.DataFrame(bloque).to_csv(index=False, sep=';', decimal=',').encode('utf-8'),
+            'cartera.csv'
+        )
+        tarea = ejecutar(TareaCartera(archivo, tam_bloque=1000, sep=';', decimal=','))
+
+        self.assertEqual(tarea.estado, TERMINADA)
+        self.assertEqual((tarea.filas, tarea.total, tarea.fraccion), (2500, 2500, 1.0))
+        self.assertEqual(list(tarea.resultados['id']), [str(i) for i in bloque['id']])
+        self.assertEqual(list(tarea.resultados.columns[:3]), ['id', 'sector', 'liquidez'])
+        self.assertEqual(list(tarea.resultados['sector']), list(bloque['sector']))
+        esperado = puntuar_lote(bloque)
+        np.testing.assert_allclose(tarea.resultados['z_score'], esperado['z_score'])
+        np.testing.assert_array_equal(tarea.resultados['zona'], esperado['zona'])
+
+    def test_excel_sin_columna_id(self):
+        """Sin columna id se numeran las filas desde 1."""
+        bloque = next(generar_cartera(30, tam_bloque=30))
+        del bloque['id']
+        contenido = io.BytesIO()
+        pd.DataFrame(bloque).to_excel(contenido, index=False)
+        archivo = archivo_subido(contenido.getvalue(), 'cartera.xlsx')
+
+        self.assertEqual(estimar_filas(archivo), 30)
+        tarea = ejecutar(TareaCartera(archivo, tam_bloque=7))
+        self.assertEqual(tarea.estado, TERMINADA)
+        self.assertEqual(list(tarea.resultados['fila']), list(range(1, 31)))
+
+    def test_columna_faltante(self):
+        """Una columna obligatoria ausente deja la tarea fallida con un mensaje."""
+        archivo = archivo_subido(b'id,ventas\n1,100\n', 'cartera.csv')
+        tarea = ejecutar(TareaCartera(archivo))
+        self.assertEqual(tarea.estado, FALLIDA)
+        self.assertIn("Falta la columna obligatoria", tarea.error)
+
+    def test_estimar_filas_csv(self):
+        """Cuenta las filas con o sin salto de línea final y no mueve la posición."""
+        self.assertEqual(estimar_filas(archivo_subido(b'a,b\n1,2\n3,4', 'x.csv')), 2)
+        archivo = archivo_subido(cartera_csv(10), 'x.csv')
+        self.assertEqual(estimar_filas(archivo), 10)
+        self.assertEqual(archivo.tell(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,266 @@
+"""
+Tests unitarios para el cálculo vectorizado de ratios, Z-Score y clasificación.
+"""
+
+import math
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.batch import (
+    classify_risk_batch,
+    columnas_de_registros,
+    compute_ratios,
+    compute_zscore,
+    etiquetas_riesgo,
+    puntuar_lote,
+    registros_de_resultados,
+    z_score_batch
+)
+from risk_engine.classification import classify_risk
+from risk_engine.pipeline import analizar_empresa
+from risk_engine.ratios import (
+    ratio_liquidez,
+    ratio_prueba_acida,
+    ratio_endeudamiento,
+    ratio_apalancamiento,
+    roa,
+    roe,
+    margen_neto,
+    rotacion_activos,
+    rotacion_inventarios
+)
+from risk_engine.zscore import z_score
+from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
+
+
+def ratios_escalares(data: dict) -> dict:
+    """Referencia escalar con la misma lógica de respaldo que calcular_ratios."""
+    activo_total = data.get('total_assets', data.get('activo_total', 0))
+    inventarios = data.get('inventarios', data['activo_corriente'] * 0.3)
+    inventario_promedio = data.get('inventario_promedio', inventarios)
+    costo_ventas = data.get('costo_ventas', data['ventas'] * 0.6)
+    return {
+        'liquidez': ratio_liquidez(data['activo_corriente'], data['pasivo_corriente']),
+        'prueba_acida': ratio_prueba_acida(
+            data['activo_corriente'], inventarios, data['pasivo_corriente']),
+        'endeudamiento': ratio_endeudamiento(data['pasivo_total'], activo_total),
+        'apalancamiento': ratio_apalancamiento(activo_total, data['patrimonio']),
+        'roa': roa(data['utilidad_neta'], activo_total),
+        'roe': roe(data['utilidad_neta'], data['patrimonio']),
+        'margen_neto': margen_neto(data['utilidad_neta'], data['ventas']),
+        'rotacion_activos': rotacion_activos(data['ventas'], activo_total),
+        'rotacion_inventarios': rotacion_inventarios(costo_ventas, inventario_promedio),
+    }
+
+
+def a_columnas(empresas: list) -> dict:
+    """Convierte una lista de diccionarios en columnas (NaN si falta el campo)."""
+    campos = sorted({campo for empresa in empresas for campo in empresa})
+    return {
+        campo: np.array([empresa.get(campo, np.nan) for empresa in empresas], dtype=float)
+        for campo in campos
+    }
+
+
+class TestComputeRatios(unittest.TestCase):
+    """Tests de equivalencia entre el cálculo vectorizado y el escalar."""
+
+    def assert_equivalente(self, empresas: list, ratios: dict, validos: dict):
+        for i, empresa in enumerate(empresas):
+            esperado = ratios_escalares(empresa)
+            for nombre, valor in esperado.items():
+                if valor is None:
+                    self.assertTrue(math.isnan(ratios[nombre][i]), nombre)
+                    self.assertFalse(validos[nombre][i], nombre)
+                else:
+                    self.assertEqual(ratios[nombre][i], valor, nombre)
+                    self.assertTrue(validos[nombre][i], nombre)
+
+    def test_empresas_de_ejemplo(self):
+        """Los datos de ejemplo dan exactamente los mismos ratios."""
+        empresas = [get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()]
+        ratios, validos = compute_ratios(a_columnas(empresas))
+        self.assert_equivalente(empresas, ratios, validos)
+
+    def test_datos_aleatorios_con_ceros(self):
+        """Coincide con las funciones escalares incluyendo denominadores en cero."""
+        rng = np.random.default_rng(42)
+        n = 500
+        columnas = {
+            campo: rng.integers(-1, 5, n).astype(float) * 100000
+            for campo in ['activo_corriente', 'pasivo_corriente', 'pasivo_total',
+                          'patrimonio', 'ventas', 'utilidad_neta', 'total_assets',
+                          'inventarios', 'inventario_promedio', 'costo_ventas']
+        }
+        empresas = [{campo: float(v[i]) for campo, v in columnas.items()} for i in range(n)]
+        ratios, validos = compute_ratios(columnas)
+        self.assert_equivalente(empresas, ratios, validos)
+
+    def test_campos_opcionales_ausentes(self):
+        """Los NaN en campos opcionales usan las mismas aproximaciones."""
+        completa = get_ejemplo_empresa_saludable()
+        parcial = {k: v for k, v in get_ejemplo_empresa_riesgo().items()
+                   if k not in ('inventarios', 'inventario_promedio', 'costo_ventas')}
+        empresas = [completa, parcial]
+        ratios, validos = compute_ratios(a_columnas(empresas))
+        self.assert_equivalente(empresas, ratios, validos)
+
+    def test_columnas_opcionales_inexistentes(self):
+        """Funciona sin columnas opcionales y con activo_total como alias."""
+        empresa = {k: v for k, v in get_ejemplo_empresa_saludable().items()
+                   if k not in ('inventarios', 'inventario_promedio', 'costo_ventas')}
+        empresa['activo_total'] = empresa.pop('total_assets')
+        ratios, validos = compute_ratios(a_columnas([empresa]))
+        self.assert_equivalente([empresa], ratios, validos)
+
+    def test_dataframe(self):
+        """Acepta un DataFrame de pandas."""
+        empresas = [get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()]
+        ratios, validos = compute_ratios(pd.DataFrame(empresas))
+        self.assert_equivalente(empresas, ratios, validos)
+
+    def test_campo_obligatorio_faltante(self):
+        """Un campo obligatorio ausente lanza KeyError."""
+        columnas = a_columnas([get_ejemplo_empresa_saludable()])
+        del columnas['ventas']
+        with self.assertRaises(KeyError):
+            compute_ratios(columnas)
+
+
+def zscore_escalar(data: dict):
+    """Referencia escalar con el mismo mapeo de campos que calcular_zscore."""
+    return z_score(
+        working_capital=data.get(
+            'working_capital', data['activo_corriente'] - data['pasivo_corriente']),
+        retained_earnings=data.get(
+            'retained_earnings', data.get('utilidades_retenidas', 0)),
+        ebit=data['ebit'],
+        market_value_equity=data.get(
+            'market_value_equity', data.get('valor_mercado_patrimonio', data['patrimonio'])),
+        total_liabilities=data.get('total_liabilities', data['pasivo_total']),
+        sales=data['ventas'],
+        total_assets=data.get('total_assets', data.get('activo_total', 0))
+    )
+
+
+class TestZScoreBatch(unittest.TestCase):
+    """Tests del Z-Score vectorizado."""
+
+    def test_valores_conocidos(self):
+        """Reproduce los casos de test_zscore en un solo llamado."""
+        z = z_score_batch(
+            working_capital=np.array([200000.0, 10000.0]),
+            retained_earnings=np.array([150000.0, 5000.0]),
+            ebit=np.array([120000.0, 3000.0]),
+            market_value_equity=np.array([500000.0, 20000.0]),
+            total_liabilities=np.array([300000.0, 50000.0]),
+            sales=np.array([800000.0, 10000.0]),
+            total_assets=np.array([1000000.0, 100000.0])
+        )
+        self.assertEqual(z.dtype, np.float64)
+        np.testing.assert_allclose(z, [2.646, 0.629])
+
+    def test_denominadores_cero(self):
+        """Activo total o pasivo total en cero producen NaN."""
+        z = z_score_batch(
+            working_capital=np.array([1.0, 1.0, 1.0]),
+            retained_earnings=np.array([1.0, 1.0, 1.0]),
+            ebit=np.array([1.0, 1.0, 1.0]),
+            market_value_equity=np.array([1.0, 1.0, 1.0]),
+            total_liabilities=np.array([1.0, 0.0, 1.0]),
+            sales=np.array([1.0, 1.0, 1.0]),
+            total_assets=np.array([0.0, 1.0, 1.0])
+        )
+        self.assertTrue(np.isnan(z[0]))
+        self.assertTrue(np.isnan(z[1]))
+        self.assertAlmostEqual(z[2], 7.5)
+
+    def test_sin_redondeo(self):
+        """Con decimales=None no se redondea el resultado."""
+        kwargs = dict(
+            working_capital=np.array([1.0]), retained_earnings=np.array([0.0]),
+            ebit=np.array([0.0]), market_value_equity=np.array([0.0]),
+            total_liabilities=np.array([1.0]), sales=np.array([0.0]),
+            total_assets=np.array([3.0])
+        )
+        self.assertAlmostEqual(z_score_batch(**kwargs)[0], 0.4)
+        self.assertAlmostEqual(z_score_batch(**kwargs, decimales=None)[0], 0.4, places=12)
+        self.assertNotEqual(z_score_batch(**kwargs, decimales=None)[0], 0.4)
+
+    def test_compute_zscore_equivalente(self):
+        """Coincide con z_score escalar usando el mapeo de calcular_zscore."""
+        rng = np.random.default_rng(7)
+        n = 500
+        columnas = {
+            campo: rng.integers(-1, 6, n).astype(float) * 50000
+            for campo in ['activo_corriente', 'pasivo_corriente', 'pasivo_total',
+                          'patrimonio', 'ventas', 'ebit', 'total_assets',
+                          'working_capital', 'retained_earnings',
+                          'market_value_equity', 'total_liabilities']
+        }
+        for campo in ['working_capital', 'market_value_equity', 'total_liabilities']:
+            columnas[campo][rng.random(n) < 0.3] = np.nan
+        empresas = [
+            {campo: float(v[i]) for campo, v in columnas.items() if not np.isnan(v[i])}
+            for i in range(n)
+        ]
+        z = compute_zscore(columnas)
+        for i, empresa in enumerate(empresas):
+            esperado = zscore_escalar(empresa)
+            if esperado is None:
+                self.assertTrue(np.isnan(z[i]))
+            else:
+                self.assertAlmostEqual(z[i], esperado, places=9)
+
+    def test_compute_zscore_ejemplos(self):
+        """Los datos de ejemplo dan el mismo Z-Score que el cálculo escalar."""
+        empresas = [get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()]
+        z = compute_zscore(pd.DataFrame(empresas))
+        for i, empresa in enumerate(empresas):
+            self.assertAlmostEqual(z[i], zscore_escalar(empresa), places=9)
+
+
+class TestClassifyRiskBatch(unittest.TestCase):
+    """Tests de la clasificación de riesgo vectorizada."""
+
+    def test_codigos_por_zona(self):
+        """Asigna los códigos 0-3 respetando los límites de cada zona."""
+        z = np.array([np.nan, -1.0, 1.5, 1.81, 2.5, 2.99, 3.2])
+        codigos = classify_risk_batch(z)
+        self.assertEqual(codigos.dtype, np.int8)
+        np.testing.assert_array_equal(codigos, [0, 1, 1, 2, 2, 3, 3])
+
+    def test_etiquetas_coinciden_con_classify_risk(self):
+        """La vista categórica usa las mismas etiquetas que classify_risk."""
+        z = np.array([np.nan, 1.5, 1.81, 2.5, 2.99, 3.2])
+        etiquetas = etiquetas_riesgo(classify_risk_batch(z))
+        esperado = [classify_risk(None if np.isnan(v) else v) for v in z]
+        self.assertEqual(list(etiquetas), esperado)
+
+
+
+class TestRegistros(unittest.TestCase):
+    """Tests de la conversión entre registros por empresa y columnas."""
+
+    def test_ida_y_vuelta_igual_a_analizar_empresa(self):
+        """Registros → columnas → resultados coincide con el análisis escalar."""
+        sin_activos = dict(get_ejemplo_empresa_riesgo(), total_assets=0)
+        sin_opcionales = {
+            clave: valor for clave, valor in get_ejemplo_empresa_saludable().items()
+            if clave not in ('inventarios', 'costo_ventas')
+        }
+        empresas = [get_ejemplo_empresa_saludable(), sin_activos, sin_opcionales]
+
+        columnas = columnas_de_registros(empresas)
+        self.assertTrue(np.isnan(columnas['costo_ventas'][2]))
+        self.assertNotIn('activo_total', columnas)
+
+        registros = registros_de_resultados(puntuar_lote(columnas), columnas)
+        self.assertEqual(registros, [analizar_empresa(e) for e in empresas])
+        self.assertIsNone(registros[1]['zscore'])
+
+
+if __name__ == '__main__':
+    unittest.main()
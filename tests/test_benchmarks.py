@@ -0,0 +1,45 @@
+"""
+Tests de la suite de benchmarks (mediciones pequeñas y comparación de informes).
+"""
+
+import unittest
+
+from benchmarks.motor import comparar, medir_latencia, rendimiento
+from risk_engine.ratios import ratio_liquidez
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Tests de la suite de benchmarks."""
+
+    def test_medir_latencia(self):
+        """La latencia se reporta en nanosegundos por llamada."""
+        medicion = medir_latencia(ratio_liquidez, (400000.0, 200000.0), repeticiones=1)
+        self.assertGreater(medicion['ns_por_llamada'], 0)
+        self.assertGreater(medicion['llamadas'], 0)
+
+    def test_rendimiento(self):
+        """Cada ruta se mide con cada tamaño, incluyendo el pico de memoria."""
+        resultados = rendimiento(tamanos=[50], repeticiones=1)
+        self.assertEqual(set(resultados), {'escalar_50', 'lote_50'})
+        for medicion in resultados.values():
+            self.assertEqual(medicion['filas'], 50)
+            self.assertGreater(medicion['pico_memoria_mb'], 0)
+
+    def test_comparar(self):
+        """Solo se reportan las métricas que empeoran más que la tolerancia."""
+        base = {
+            'latencias': {'ratios.roe': {'ns_por_llamada': 100.0}},
+            'rendimiento': {'lote_1000': {'segundos': 1.0, 'pico_memoria_mb': 10.0}},
+        }
+        actual = {
+            'latencias': {'ratios.roe': {'ns_por_llamada': 110.0},
+                          'ratios.nuevo': {'ns_por_llamada': 500.0}},
+            'rendimiento': {'lote_1000': {'segundos': 2.0, 'pico_memoria_mb': 9.0}},
+        }
+        regresiones = comparar(actual, base, tolerancia=0.25)
+        self.assertEqual([r['metrica'] for r in regresiones], ['rendimiento.lote_1000.segundos'])
+        self.assertAlmostEqual(regresiones[0]['cambio'], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
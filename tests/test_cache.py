@@ -0,0 +1,115 @@
+"""
+Tests de la caché de resultados direccionada por contenido.
+"""
+
+import unittest
+
+from risk_engine.cache import TAMANO_NO_ESTIMABLE, CacheResultados, huella_datos
+from risk_engine.pipeline import analizar_empresa
+from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
+
+
+class TestHuellaDatos(unittest.TestCase):
+    """Tests de la huella canónica de los datos de entrada."""
+
+    def test_independiente_del_orden(self):
+        """El orden de las claves no cambia la huella."""
+        data = get_ejemplo_empresa_saludable()
+        invertido = dict(reversed(list(data.items())))
+        self.assertEqual(huella_datos(data), huella_datos(invertido))
+
+    def test_enteros_y_flotantes(self):
+        """100000 y 100000.0 producen la misma huella."""
+        data = get_ejemplo_empresa_saludable()
+        flotantes = {k: float(v) for k, v in data.items()}
+        self.assertEqual(huella_datos(data), huella_datos(flotantes))
+
+    def test_datos_distintos(self):
+        """Datos distintos producen huellas distintas."""
+        self.assertNotEqual(huella_datos(get_ejemplo_empresa_saludable()),
+                            huella_datos(get_ejemplo_empresa_riesgo()))
+
+
+class TestCacheResultados(unittest.TestCase):
+    """Tests de la caché LRU con presupuesto de bytes."""
+
+    def test_aciertos_y_fallos(self):
+        """Cuenta un fallo al calcular y un acierto al reutilizar."""
+        cache = CacheResultados()
+        data = get_ejemplo_empresa_saludable()
+        llamadas = []
+
+        def calcular():
+            llamadas.append(1)
+            return analizar_empresa(data)
+
+        primero = cache.obtener_o_calcular(huella_datos(data), calcular)
+        segundo = cache.obtener_o_calcular(huella_datos(dict(data)), calcular)
+
+        self.assertEqual(primero, segundo)
+        self.assertEqual(len(llamadas), 1)
+        estadisticas = cache.estadisticas()
+        self.assertEqual(estadisticas['aciertos'], 1)
+        self.assertEqual(estadisticas['fallos'], 1)
+        self.assertEqual(estadisticas['tasa_aciertos'], 0.5)
+
+    def test_expulsion_lru_por_bytes(self):
+        """Al superar el presupuesto se expulsa la entrada menos usada."""
+        cache = CacheResultados(max_bytes=300)
+        cache.guardar('a', 'A', tamano=100)
+        cache.guardar('b', 'B', tamano=100)
+        cache.guardar('c', 'C', tamano=100)
+        cache.obtener('a')  # 'a' pasa a ser la más reciente
+        cache.guardar('d', 'D', tamano=100)
+
+        self.assertNotIn('b', cache)
+        self.assertIn('a', cache)
+        self.assertEqual(cache.estadisticas()['bytes'], 300)
+        self.assertEqual(cache.expulsiones, 1)
+
+    def test_limite_de_entradas(self):
+        """Respeta el número máximo de entradas."""
+        cache = CacheResultados(max_entradas=2)
+        for clave in 'xyz':
+            cache.guardar(clave, clave)
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn('x', cache)
+
+    def test_valor_mayor_al_presupuesto(self):
+        """Un valor que no cabe en el presupuesto no se guarda."""
+        cache = CacheResultados(max_bytes=10)
+        cache.guardar('grande', 'x' * 100)
+        self.assertNotIn('grande', cache)
+
+    def test_reemplazo_actualiza_bytes(self):
+        """Guardar dos veces la misma clave no duplica el tamaño."""
+        cache = CacheResultados()
+        cache.guardar('a', 1, tamano=50)
+        cache.guardar('a', 2, tamano=70)
+        self.assertEqual(cache.estadisticas()['bytes'], 70)
+        self.assertEqual(cache.obtener('a'), 2)
+
+    def test_entrega_copias(self):
+        """Modificar un valor obtenido no altera el guardado."""
+        cache = CacheResultados()
+        resultado = cache.obtener_o_calcular('a', lambda: {'ratios': {'roe': 0.1}})
+        resultado['ratios']['roe'] = 99.0
+        cache.obtener('a')['ratios'].clear()
+        self.assertEqual(cache.obtener('a'), {'ratios': {'roe': 0.1}})
+
+    def test_sin_copias(self):
+        """Con copiar=None se comparte el mismo objeto."""
+        cache = CacheResultados(copiar=None)
+        valor = {'x': 1}
+        cache.guardar('a', valor)
+        self.assertIs(cache.obtener('a'), valor)
+
+    def test_valor_no_serializable(self):
+        """Un valor que no se puede serializar cuenta con un tamaño conservador."""
+        cache = CacheResultados(copiar=None)
+        cache.guardar('f', lambda: None)
+        self.assertEqual(cache.estadisticas()['bytes'], TAMANO_NO_ESTIMABLE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests de la interfaz de línea de comandos de puntuación masiva.
+"""
+
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from unittest import mock
+
+import pandas as pd
+
+from risk_engine.cli import main
+from risk_engine.classification import classify_risk
+from risk_engine.zscore import z_score
+from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
+
+
+class TestComandoScore(unittest.TestCase):
+    """Tests del subcomando score."""
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.entrada = os.path.join(self.directorio.name, "cartera.csv")
+        empresas = [get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()] * 5
+        cartera = pd.DataFrame(empresas)
+        cartera.insert(0, "id", range(len(empresas)))
+        cartera.to_csv(self.entrada, index=False)
+        self.empresas = empresas
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def ejecutar(self, *argumentos) -> int:
+        with redirect_stderr(StringIO()):
+            return main(list(argumentos))
+
+    def verificar_resultados(self, resultados: pd.DataFrame):
+        self.assertEqual([str(valor) for valor in resultados["id"]],
+                         [str(i) for i in range(len(self.empresas))])
+        for empresa, (_, fila) in zip(self.empresas, resultados.iterrows()):
+            esperado = z_score(
+                working_capital=empresa["working_capital"],
+                retained_earnings=empresa["retained_earnings"],
+                ebit=empresa["ebit"],
+                market_value_equity=empresa["market_value_equity"],
+                total_liabilities=empresa["total_liabilities"],
+                sales=empresa["ventas"],
+                total_assets=empresa["total_assets"]
+            )
+            self.assertAlmostEqual(fila["z_score"], esperado, places=9)
+            self.assertEqual(fila["clasificacion"], classify_risk(esperado))
+
+    def test_score_csv_por_bloques(self):
+        """Procesa en varios bloques y conserva el orden y la columna id."""
+        salida = os.path.join(self.directorio.name, "resultados.csv")
+        self.assertEqual(self.ejecutar("score", self.entrada, "-o", salida,
+                                       "--tam-bloque", "3"), 0)
+        self.verificar_resultados(pd.read_csv(salida))
+
+    def test_score_parquet(self):
+        """Escribe los resultados en Parquet."""
+        salida = os.path.join(self.directorio.name, "resultados.parquet")
+        self.assertEqual(self.ejecutar("score", self.entrada, "-o", salida,
+                                       "--tam-bloque", "4"), 0)
+        self.verificar_resultados(pd.read_parquet(salida))
+
+    def test_ids_mixtos_parquet(self):
+        """Identificadores numéricos y alfanuméricos en distintos bloques."""
+        cartera = pd.read_csv(self.entrada)
+        cartera["id"] = [str(i) for i in range(len(cartera) - 1)] + ["X9"]
+        cartera.to_csv(self.entrada, index=False)
+        salida = os.path.join(self.directorio.name, "resultados.parquet")
+        self.assertEqual(self.ejecutar("score", self.entrada, "-o", salida,
+                                       "--tam-bloque", "3"), 0)
+        self.assertEqual(list(pd.read_parquet(salida)["id"]), list(cartera["id"]))
+
+    @mock.patch('risk_engine.parallel.os.cpu_count', return_value=2)
+    def test_score_con_workers(self, _):
+        """Con varios procesos el orden de salida es el mismo."""
+        salida = os.path.join(self.directorio.name, "resultados.csv")
+        self.assertEqual(self.ejecutar("score", self.entrada, "-o", salida,
+                                       "--tam-bloque", "2", "--workers", "2"), 0)
+        self.verificar_resultados(pd.read_csv(salida))
+
+    def test_columna_obligatoria_faltante(self):
+        """Una cartera sin columnas obligatorias termina con error."""
+        pd.read_csv(self.entrada).drop(columns=["ventas"]).to_csv(self.entrada, index=False)
+        salida = os.path.join(self.directorio.name, "resultados.csv")
+        self.assertEqual(self.ejecutar("score", self.entrada, "-o", salida), 2)
+
+
+class TestComandoGenerate(unittest.TestCase):
+    """Tests del subcomando generate."""
+
+    def test_generar_y_puntuar(self):
+        """La cartera generada se puede puntuar y respeta la mezcla."""
+        with tempfile.TemporaryDirectory() as directorio:
+            cartera = os.path.join(directorio, "cartera.csv")
+            salida = os.path.join(directorio, "resultados.csv")
+            with redirect_stderr(StringIO()):
+                self.assertEqual(main(["generate", "-n", "50", "-o", cartera,
+                                       "--mezcla", "0,1,0", "--tam-bloque", "20"]), 0)
+                self.assertEqual(main(["score", cartera, "-o", salida]), 0)
+
+            resultados = pd.read_csv(salida)
+            self.assertEqual(list(resultados["id"]), list(range(50)))
+            self.assertEqual(set(resultados["clasificacion"]),
+                             {"🔶 Riesgo moderado (zona gris)"})
+
+    def test_mezcla_invalida(self):
+        """Una mezcla con proporciones negativas termina con error."""
+        with tempfile.TemporaryDirectory() as directorio, redirect_stderr(StringIO()):
+            salida = os.path.join(directorio, "cartera.csv")
+            self.assertEqual(main(["generate", "-n", "10", "-o", salida,
+                                   "--mezcla", "1,-1,1"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
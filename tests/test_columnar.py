@@ -0,0 +1,148 @@
+"""
+Tests del formato columnar binario de carteras.
+"""
+
+import csv
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.batch import puntuar_lote
+from risk_engine.cli import main
+from risk_engine.columnar import (
+    ARCHIVO_CABECERA,
+    PortafolioColumnar,
+    convertir_portafolio,
+    es_portafolio_columnar,
+)
+from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
+
+
+class TestFormatoColumnar(unittest.TestCase):
+    """Tests de convertir_portafolio y PortafolioColumnar."""
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.entrada = os.path.join(self.directorio.name, "cartera.csv")
+        self.salida = os.path.join(self.directorio.name, "cartera_brs")
+        empresas = [get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()] * 6
+        self.cartera = pd.DataFrame(empresas)
+        self.cartera.insert(0, "id", range(100, 100 + len(empresas)))
+        self.cartera.to_csv(self.entrada, index=False)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_conversion_y_mapeo(self):
+        """La cartera convertida se abre mapeada en memoria con los mismos datos."""
+        cabecera = convertir_portafolio(self.entrada, self.salida, tam_bloque=5)
+
+        self.assertTrue(es_portafolio_columnar(self.salida))
+        self.assertEqual(cabecera["n_filas"], len(self.cartera))
+        with open(os.path.join(self.salida, ARCHIVO_CABECERA), encoding="utf-8") as archivo:
+            self.assertEqual(json.load(archivo), cabecera)
+
+        cartera = PortafolioColumnar(self.salida)
+        self.assertEqual(len(cartera), len(self.cartera))
+        self.assertIsInstance(cartera.columnas["ventas"], np.memmap)
+        np.testing.assert_array_equal(cartera.columnas["ventas"], self.cartera["ventas"])
+        np.testing.assert_array_equal(cartera.identificadores(), self.cartera["id"])
+
+    def test_bloques_puntuan_igual(self):
+        """Puntuar los bloques mapeados equivale a puntuar el DataFrame."""
+        convertir_portafolio(self.entrada, self.salida)
+        bloques = list(PortafolioColumnar(self.salida).bloques(5))
+
+        self.assertEqual([len(b["ventas"]) for b in bloques], [5, 5, 2])
+        z = np.concatenate([puntuar_lote(b)["z_score"] for b in bloques])
+        np.testing.assert_array_equal(z, puntuar_lote(self.cartera)["z_score"])
+
+    def test_identificadores_de_texto(self):
+        """Los identificadores no numéricos se guardan como texto."""
+        self.cartera["id"] = [f"EMP-{i}" for i in range(len(self.cartera))]
+        self.cartera.to_csv(self.entrada, index=False)
+        convertir_portafolio(self.entrada, self.salida)
+        ids = PortafolioColumnar(self.salida).identificadores()
+        self.assertEqual(list(ids), list(self.cartera["id"]))
+
+    def test_identificadores_mixtos(self):
+        """Un identificador alfanumérico en un bloque posterior guarda todos como texto."""
+        self.cartera["id"] = [str(i) for i in range(len(self.cartera) - 1)] + ["X9"]
+        self.cartera.to_csv(self.entrada, index=False)
+        cabecera = convertir_portafolio(self.entrada, self.salida, tam_bloque=5)
+
+        self.assertEqual(cabecera["id"]["tipo"], "texto")
+        self.assertFalse(os.path.exists(os.path.join(self.salida, "id.npy")))
+        ids = PortafolioColumnar(self.salida).identificadores()
+        self.assertEqual(list(ids), list(self.cartera["id"]))
+
+    def test_identificadores_con_saltos_y_faltantes(self):
+        """Cualquier texto conserva su fila y los faltantes siguen siendo nulos."""
+        especiales = ["a\rb", "c\x0bd", "e\x0cf", "g\x1ch", "i\u2028j", None, "ñ\nk"]
+        ids = especiales + [f"EMP-{i}" for i in range(len(self.cartera) - len(especiales))]
+        self.cartera.assign(id=ids).to_csv(self.entrada, index=False,
+                                           quoting=csv.QUOTE_NONNUMERIC)
+        cabecera = convertir_portafolio(self.entrada, self.salida, tam_bloque=5)
+        self.assertEqual(cabecera["id"]["tipo"], "texto")
+
+        cartera = PortafolioColumnar(self.salida)
+        self.assertEqual(list(cartera.identificadores()), ids)
+        self.assertEqual(list(cartera.identificadores()[5:7]), [None, "ñ\nk"])
+        self.assertIsInstance(cartera.identificadores().utf8, np.memmap)
+        bloques = list(cartera.bloques(4))
+        self.assertEqual([i for b in bloques for i in b["id"]], ids)
+
+    def test_error_elimina_la_salida(self):
+        """Si la conversión falla no quedan archivos a medio escribir."""
+        self.cartera["ventas"] = self.cartera["ventas"].astype(object)
+        self.cartera.loc[len(self.cartera) - 1, "ventas"] = "N/D"
+        self.cartera.to_csv(self.entrada, index=False)
+        with self.assertRaises(ValueError):
+            convertir_portafolio(self.entrada, self.salida, tam_bloque=5)
+        self.assertFalse(os.path.exists(self.salida))
+
+        # En un directorio existente solo se eliminan los archivos propios
+        os.makedirs(self.salida)
+        otro = os.path.join(self.salida, "notas.txt")
+        open(otro, "w").close()
+        with self.assertRaises(ValueError):
+            convertir_portafolio(self.entrada, self.salida, tam_bloque=5)
+        self.assertEqual(os.listdir(self.salida), ["notas.txt"])
+
+    def test_sin_columnas_financieras(self):
+        """Una cartera sin campos del motor no se convierte."""
+        pd.DataFrame({"id": [1, 2]}).to_csv(self.entrada, index=False)
+        with self.assertRaises(ValueError):
+            convertir_portafolio(self.entrada, self.salida)
+
+    def test_cli_convert_y_score(self):
+        """El subcomando score acepta un directorio columnar."""
+        resultados = os.path.join(self.directorio.name, "resultados.csv")
+        with redirect_stderr(StringIO()):
+            self.assertEqual(main(["convert", self.entrada, "-o", self.salida]), 0)
+            self.assertEqual(main(["score", self.salida, "-o", resultados,
+                                   "--tam-bloque", "5"]), 0)
+
+        tabla = pd.read_csv(resultados)
+        self.assertEqual(list(tabla["id"]), list(self.cartera["id"]))
+        np.testing.assert_allclose(tabla["z_score"], puntuar_lote(self.cartera)["z_score"])
+
+    def test_cli_score_otra_columna_id(self):
+        """Puntuar con un --id-col distinto al de la conversión es un error."""
+        resultados = os.path.join(self.directorio.name, "resultados.csv")
+        with redirect_stderr(StringIO()) as errores:
+            self.assertEqual(main(["convert", self.entrada, "-o", self.salida]), 0)
+            self.assertEqual(main(["score", self.salida, "-o", resultados,
+                                   "--id-col", "empresa"]), 1)
+        self.assertIn("--id-col 'id'", errores.getvalue())
+        self.assertFalse(os.path.exists(resultados))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Tests de las fábricas de figuras cacheadas de ui.view_results.
+"""
+
+import unittest
+
+from ui.view_results import (
+    estadisticas_cache_figuras,
+    figura_barras_categoria,
+    figura_gauge_zscore,
+    figura_radar
+)
+
+
+class TestFabricasFiguras(unittest.TestCase):
+    """Las fábricas son puras y reutilizan la figura ya construida."""
+
+    def test_gauge_reutiliza_figura(self):
+        """Dos llamadas con el mismo valor reutilizan el JSON guardado."""
+        antes = estadisticas_cache_figuras()['aciertos']
+        primera = figura_gauge_zscore(2.5)
+        segunda = figura_gauge_zscore(2.5)
+        self.assertEqual(primera.to_dict(), segunda.to_dict())
+        self.assertEqual(estadisticas_cache_figuras()['aciertos'], antes + 1)
+
+    def test_acierto_entrega_figura_propia(self):
+        """Modificar una figura entregada no altera las siguientes."""
+        primera = figura_gauge_zscore(1.5)
+        primera.update_layout(title="modificada")
+        segunda = figura_gauge_zscore(1.5)
+        self.assertIsNot(primera, segunda)
+        self.assertNotEqual(segunda.layout.title.text, "modificada")
+
+    def test_gauge_valores_distintos(self):
+        """Valores distintos generan figuras distintas."""
+        self.assertNotEqual(figura_gauge_zscore(1.0).to_dict(), figura_gauge_zscore(3.5).to_dict())
+        self.assertEqual(figura_gauge_zscore(1.0).data[0].gauge.bar.color, "red")
+
+    def test_radar_depende_del_modo_oscuro(self):
+        """El modo oscuro forma parte de la clave de la figura."""
+        categorias = ("Liquidez", "ROA", "ROE")
+        valores = (5.0, 7.5, 10.0)
+        oscuro = figura_radar(categorias, valores, True)
+        claro = figura_radar(categorias, valores, False)
+        self.assertEqual(oscuro.layout.font.color, '#FFFFFF')
+        self.assertEqual(claro.layout.font.color, '#333333')
+
+    def test_barras_porcentaje(self):
+        """Multiplica por 100 los ratios porcentuales."""
+        fig = figura_barras_categoria(("ROA", "ROE"), (0.1, 0.25), "Rentabilidad", None, True)
+        self.assertEqual(list(fig.data[0].y), [10.0, 25.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
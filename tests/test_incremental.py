@@ -0,0 +1,158 @@
+"""
+Tests de la repuntuación incremental de carteras.
+"""
+
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.batch import puntuar_lote
+from risk_engine.cli import main
+from risk_engine.incremental import EstadoIncremental, PuntuadorIncremental, huellas_filas
+from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
+
+
+class TestPuntuadorIncremental(unittest.TestCase):
+    """Tests de PuntuadorIncremental."""
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.estado = os.path.join(self.directorio.name, "estado")
+        empresas = [get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()] * 10
+        self.cartera = pd.DataFrame(empresas)
+        self.cartera.insert(0, "id", [f"EMP-{i}" for i in range(len(empresas))])
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def puntuar(self, cartera, tam_bloque=6, **kwargs):
+        """Puntúa la cartera por bloques y retorna (resultados, estadísticas)."""
+        partes = []
+        with PuntuadorIncremental(self.estado, **kwargs) as puntuador:
+            for inicio in range(0, len(cartera), tam_bloque):
+                bloque = cartera.iloc[inicio:inicio + tam_bloque]
+                partes.append(puntuador.puntuar(bloque, bloque["id"]))
+        resultados = {n: np.concatenate([p[n] for p in partes]) for n in partes[0]}
+        return resultados, puntuador.estadisticas
+
+    def verificar_igual_a_completo(self, resultados, cartera):
+        esperado = puntuar_lote(cartera)
+        for nombre, valores in esperado.items():
+            np.testing.assert_array_equal(resultados[nombre], valores)
+
+    def test_solo_recalcula_filas_modificadas(self):
+        """La segunda corrida recalcula solo las empresas con cambios."""
+        _, estadisticas = self.puntuar(self.cartera)
+        self.assertEqual(estadisticas["recalculadas"], len(self.cartera))
+
+        modificada = self.cartera.copy()
+        modificada.loc[[3, 11], "ventas"] *= 2
+        resultados, estadisticas = self.puntuar(modificada)
+
+        self.assertEqual(estadisticas["recalculadas"], 2)
+        self.assertEqual(estadisticas["reutilizadas"], len(self.cartera) - 2)
+        self.verificar_igual_a_completo(resultados, modificada)
+
+    def test_filas_reordenadas_nuevas_y_eliminadas(self):
+        """Las empresas se ubican por identificador aunque cambie el orden."""
+        self.puntuar(self.cartera)
+
+        nueva = self.cartera.iloc[::-1].iloc[2:].copy()
+        extra = self.cartera.iloc[:1].copy()
+        extra["id"] = "EMP-NUEVA"
+        nueva = pd.concat([nueva, extra], ignore_index=True)
+
+        resultados, estadisticas = self.puntuar(nueva, tam_bloque=4)
+        self.assertEqual(estadisticas["recalculadas"], 1)
+        self.verificar_igual_a_completo(resultados, nueva)
+        self.assertEqual(len(EstadoIncremental(self.estado).ids), len(nueva))
+
+    def test_cambio_de_parametros_invalida_el_estado(self):
+        """Con otros decimales de redondeo se recalcula todo."""
+        self.puntuar(self.cartera)
+        _, estadisticas = self.puntuar(self.cartera, decimales=None)
+        self.assertEqual(estadisticas["reutilizadas"], 0)
+
+    def test_cambio_de_columnas_invalida_el_estado(self):
+        """Una columna nueva agrega sus ratios aunque la huella no cambie."""
+        self.puntuar(self.cartera)
+        con_caja = self.cartera.assign(caja_bancos=np.nan)
+        resultados, estadisticas = self.puntuar(con_caja)
+
+        self.assertEqual(estadisticas["reutilizadas"], 0)
+        self.assertIn("tesoreria", resultados)
+        self.verificar_igual_a_completo(resultados, con_caja)
+
+    def test_error_conserva_el_estado_anterior(self):
+        """Si la corrida falla, el estado previo no se modifica."""
+        self.puntuar(self.cartera)
+        with self.assertRaises(KeyError):
+            with PuntuadorIncremental(self.estado) as puntuador:
+                puntuador.puntuar(self.cartera.drop(columns=["ventas"]), self.cartera["id"])
+
+        _, estadisticas = self.puntuar(self.cartera)
+        self.assertEqual(estadisticas["reutilizadas"], len(self.cartera))
+        self.assertFalse(os.path.exists(self.estado + ".nuevo"))
+
+    def test_huella_campo_ausente_igual_a_nan(self):
+        """Un opcional ausente y uno en NaN producen la misma huella."""
+        base = {"ventas": np.array([1.0, -0.0])}
+        con_nan = {"ventas": np.array([1.0, 0.0]), "inventarios": np.array([np.nan, np.nan])}
+        np.testing.assert_array_equal(huellas_filas(base, 2), huellas_filas(con_nan, 2))
+        otro = {"ventas": np.array([1.0, 1e-300])}
+        self.assertNotEqual(huellas_filas(base, 2)[1], huellas_filas(otro, 2)[1])
+
+    def test_cli_estado(self):
+        """El subcomando score acepta --estado."""
+        entrada = os.path.join(self.directorio.name, "cartera.csv")
+        salida = os.path.join(self.directorio.name, "resultados.csv")
+        self.cartera.to_csv(entrada, index=False)
+
+        for _ in range(2):
+            errores = StringIO()
+            with redirect_stderr(errores):
+                self.assertEqual(main(["score", entrada, "-o", salida,
+                                       "--estado", self.estado]), 0)
+        self.assertIn(f"Reutilizadas: {len(self.cartera)}", errores.getvalue())
+        np.testing.assert_allclose(
+            pd.read_csv(salida)["z_score"], puntuar_lote(self.cartera)["z_score"]
+        )
+
+    def test_cli_estado_rechaza_workers(self):
+        """--estado con --workers es un error de uso, no se ignora."""
+        entrada = os.path.join(self.directorio.name, "cartera.csv")
+        self.cartera.to_csv(entrada, index=False)
+        errores = StringIO()
+        with redirect_stderr(errores), self.assertRaises(SystemExit) as salida:
+            main(["score", entrada, "-o", os.path.join(self.directorio.name, "r.csv"),
+                  "--estado", self.estado, "--workers", "2"])
+        self.assertEqual(salida.exception.code, 2)
+        self.assertIn("--estado no admite --workers", errores.getvalue())
+        self.assertFalse(os.path.exists(self.estado))
+
+    def test_cli_mismo_esquema_sin_estado(self):
+        """Con --estado la salida tiene las columnas de un score sin estado."""
+        cartera = self.cartera.assign(caja_bancos=50000.0, cuentas_por_cobrar=100000.0,
+                                      ventas_credito=730000.0, cuentas_por_pagar=80000.0,
+                                      compras_credito=584000.0)
+        entrada = os.path.join(self.directorio.name, "cartera.csv")
+        cartera.to_csv(entrada, index=False)
+
+        salidas = {}
+        for nombre, opciones in (("simple", []), ("estado", ["--estado", self.estado])):
+            salidas[nombre] = os.path.join(self.directorio.name, f"{nombre}.csv")
+            with redirect_stderr(StringIO()):
+                self.assertEqual(main(["score", entrada, "-o", salidas[nombre]] + opciones), 0)
+
+        simple = pd.read_csv(salidas["simple"])
+        self.assertIn("periodo_medio_pago", simple.columns)
+        pd.testing.assert_frame_equal(pd.read_csv(salidas["estado"]), simple)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Tests de la capa de instrumentación de etapas.
+"""
+
+import io
+import json
+import threading
+import unittest
+
+from risk_engine.instrumentation import Instrumentacion, instrumentacion
+from risk_engine.pipeline import analizar_empresa
+from utils.sample_data import get_ejemplo_empresa_saludable
+
+
+class TestInstrumentacion(unittest.TestCase):
+    """Tests de Instrumentacion."""
+
+    def test_desactivada_no_registra(self):
+        """Desactivada, las etapas y contadores no acumulan nada."""
+        registro = Instrumentacion(activa=False)
+        with registro.etapa('a'):
+            pass
+        registro.contar('b')
+        self.assertIs(registro.etapa('a'), registro.etapa('c'))
+        self.assertEqual(registro.resumen()['etapas'], {})
+        self.assertEqual(registro.resumen()['contadores'], {})
+
+    def test_etapas_y_contadores(self):
+        """Acumula llamadas, tiempos, errores y contadores."""
+        registro = Instrumentacion(activa=True)
+        for _ in range(3):
+            with registro.etapa('calculo'):
+                sum(range(1000))
+        with self.assertRaises(ZeroDivisionError):
+            with registro.etapa('calculo'):
+                1 / 0
+        registro.contar('figuras', 2)
+        registro.contar('figuras')
+
+        resumen = registro.resumen()
+        calculo = resumen['etapas']['calculo']
+        self.assertEqual(calculo['llamadas'], 4)
+        self.assertEqual(calculo['errores'], 1)
+        self.assertGreater(calculo['total_ms'], 0)
+        self.assertGreaterEqual(calculo['max_ms'], calculo['media_ms'])
+        self.assertEqual(resumen['contadores'], {'figuras': 3})
+
+        registro.reiniciar()
+        self.assertEqual(registro.resumen()['etapas'], {})
+
+    def test_concurrente(self):
+        """Los registros desde varios hilos no se pierden."""
+        registro = Instrumentacion(activa=True)
+
+        def trabajar():
+            for _ in range(500):
+                with registro.etapa('hilo'):
+                    registro.contar('n')
+
+        hilos = [threading.Thread(target=trabajar) for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(registro.resumen()['etapas']['hilo']['llamadas'], 2000)
+        self.assertEqual(registro.resumen()['contadores']['n'], 2000)
+
+    def test_volcar_json(self):
+        """El volcado es JSON con el mismo contenido que el resumen."""
+        registro = Instrumentacion(activa=True)
+        with registro.etapa('validacion'):
+            pass
+        salida = io.StringIO()
+        registro.volcar(salida)
+        self.assertEqual(json.loads(salida.getvalue()), registro.resumen())
+
+    def test_analizar_empresa_instrumentado(self):
+        """Con la instancia global activa se miden las etapas del análisis."""
+        empresa = get_ejemplo_empresa_saludable()
+        esperado = analizar_empresa(empresa)
+        activa = instrumentacion.activa
+        instrumentacion.reiniciar()
+        instrumentacion.activa = True
+        try:
+            self.assertEqual(analizar_empresa(empresa), esperado)
+            etapas = instrumentacion.resumen()['etapas']
+        finally:
+            instrumentacion.activa = activa
+            instrumentacion.reiniciar()
+        self.assertEqual(set(etapas), {'analisis.ratios', 'analisis.zscore'})
+
+
+if __name__ == "__main__":
+    unittest.main()
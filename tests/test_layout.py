@@ -0,0 +1,47 @@
+"""
+Tests del contenido estático cacheado de ui.layout.
+"""
+
+import unittest
+from unittest import mock
+
+import ui.layout as layout
+from ui.layout import _compactar_html, _css_tema, _html_estatico, _markdown_estatico
+
+
+class TestContenidoEstatico(unittest.TestCase):
+    """La hoja de estilos y los bloques fijos se construyen una vez."""
+
+    def test_css_por_tema(self):
+        """Cada tema reutiliza su hoja de estilos, compactada en una línea."""
+        oscuro = _css_tema(True)
+        self.assertIs(_css_tema(True), oscuro)
+        self.assertIn('background-color: #0e1117;', oscuro)
+        self.assertIn('background-color: #ffffff;', _css_tema(False))
+        self.assertNotIn('\n', oscuro)
+        self.assertTrue(oscuro.startswith('<style>') and oscuro.endswith('</style>'))
+
+    def test_bloques_estaticos(self):
+        """El markdown pierde la sangría y el HTML queda en una línea."""
+        self.assertEqual(_markdown_estatico("\n    ### Título\n    - a\n      - b\n    "),
+                         "### Título\n- a\n  - b")
+        self.assertEqual(_html_estatico("\n    <div>\n        <p>x</p>\n    </div>\n"),
+                         "<div> <p>x</p> </div>")
+
+    def test_texto_en_varias_lineas(self):
+        """Las líneas se unen con un espacio y no pegan palabras."""
+        self.assertEqual(_compactar_html("<p>Riesgo\n    financiero</p>"),
+                         "<p>Riesgo financiero</p>")
+
+    def test_html_dinamico_sin_cache(self):
+        """Las tarjetas con f-strings no llenan la caché de bloques fijos."""
+        layout._html_estatico.cache_clear()
+        with mock.patch.object(layout.st, 'markdown') as markdown:
+            layout.crear_card("Título", "Contenido")
+            layout.mostrar_header("App", "Sub")
+        self.assertEqual(layout._html_estatico.cache_info().currsize, 0)
+        self.assertIn('<h4>ℹ️ Título</h4> <p>Contenido</p>', markdown.call_args_list[0].args[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
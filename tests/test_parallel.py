@@ -0,0 +1,72 @@
+"""
+Tests de la puntuación en paralelo con varios procesos.
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.batch import puntuar_lote
+from risk_engine.parallel import columnas_motor, puntuar_bloques, resolver_workers
+from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
+
+
+# Simula varios núcleos para ejercitar el pool de procesos en cualquier equipo
+@mock.patch('risk_engine.parallel.os.cpu_count', return_value=4)
+class TestPuntuarBloques(unittest.TestCase):
+    """Tests de puntuar_bloques."""
+
+    def setUp(self):
+        empresas = [get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()] * 10
+        cartera = pd.DataFrame(empresas)
+        cartera.insert(0, "id", range(len(empresas)))
+        self.bloques = [cartera.iloc[i:i + 3] for i in range(0, len(cartera), 3)]
+
+    def test_orden_determinista(self, _):
+        """Los resultados en paralelo coinciden bloque a bloque con los secuenciales."""
+        secuencial = list(puntuar_bloques(self.bloques, workers=1))
+        paralelo = list(puntuar_bloques(iter(self.bloques), workers=2, en_vuelo=3))
+
+        self.assertEqual(len(paralelo), len(self.bloques))
+        for (bloque_s, res_s), (bloque_p, res_p) in zip(secuencial, paralelo):
+            self.assertIs(bloque_s, bloque_p)
+            for nombre in res_s:
+                np.testing.assert_array_equal(res_s[nombre], res_p[nombre])
+
+    def test_error_en_worker(self, _):
+        """Un campo obligatorio faltante se propaga como KeyError."""
+        bloques = [bloque.drop(columns=["ventas"]) for bloque in self.bloques]
+        with self.assertRaises(KeyError):
+            list(puntuar_bloques(bloques, workers=2))
+
+    def test_columnas_motor(self, _):
+        """Solo se envían a los procesos los campos que usa el motor."""
+        columnas = columnas_motor(self.bloques[0])
+        self.assertNotIn("id", columnas)
+        self.assertTrue(all(c.dtype == np.float64 for c in columnas.values()))
+        resultados = puntuar_lote(columnas)
+        np.testing.assert_array_equal(
+            resultados["z_score"], puntuar_lote(self.bloques[0])["z_score"]
+        )
+
+    def test_resolver_workers(self, cpu_count):
+        """0 o None usan todos los núcleos; negativos son inválidos."""
+        self.assertEqual(resolver_workers(0), 4)
+        self.assertEqual(resolver_workers(None), 4)
+        self.assertEqual(resolver_workers(3), 3)
+        with self.assertRaises(ValueError):
+            resolver_workers(-1)
+
+    def test_un_nucleo_es_secuencial(self, cpu_count):
+        """Con un solo núcleo no se crean procesos aunque se pidan."""
+        cpu_count.return_value = 1
+        self.assertEqual(resolver_workers(4), 1)
+        with mock.patch('risk_engine.parallel.ProcessPoolExecutor') as pool:
+            list(puntuar_bloques(self.bloques, workers=4))
+        pool.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Tests del índice de percentiles por pares.
+"""
+
+import unittest
+
+import numpy as np
+
+from risk_engine.batch import puntuar_lote
+from risk_engine.peers import IndicePares, SerieOrdenada
+from utils.sample_data import generar_cartera
+
+
+def percentil_directo(valores: np.ndarray, valor: float) -> float:
+    """Percentil de rango medio calculado recorriendo todos los pares."""
+    valores = valores[~np.isnan(valores)]
+    return 100.0 * (np.sum(valores < valor) + 0.5 * np.sum(valores == valor)) / len(valores)
+
+
+class TestSerieOrdenada(unittest.TestCase):
+    """Tests de SerieOrdenada."""
+
+    def test_rango_medio_con_empates(self):
+        """Los empates cuentan la mitad y los NaN no son pares."""
+        serie = SerieOrdenada(np.array([1.0, 2.0, 2.0, 3.0, np.nan]))
+        self.assertEqual(len(serie), 4)
+        np.testing.assert_array_equal(serie.percentiles([0.5, 1.0, 2.0, 3.5]),
+                                      [0.0, 12.5, 50.0, 100.0])
+        self.assertTrue(np.isnan(serie.percentiles(np.nan)))
+        self.assertTrue(np.isnan(SerieOrdenada().percentiles(1.0)))
+
+    def test_inserciones_equivalen_a_reconstruir(self):
+        """Insertar de a uno (con fusiones del búfer) da los mismos percentiles."""
+        rng = np.random.default_rng(0)
+        valores = rng.normal(size=500)
+        serie = SerieOrdenada(valores[:100], tam_bufer=16)
+        for valor in valores[100:]:
+            serie.agregar(valor)
+        consultas = rng.normal(size=50)
+        np.testing.assert_allclose(serie.percentiles(consultas),
+                                   SerieOrdenada(valores).percentiles(consultas))
+        self.assertLessEqual(len(serie.pendientes), 16)
+
+
+class TestIndicePares(unittest.TestCase):
+    """Tests de IndicePares sobre una cartera puntuada."""
+
+    @classmethod
+    def setUpClass(cls):
+        bloque = next(generar_cartera(20_000, tam_bloque=20_000, semilla=3))
+        cls.resultados = puntuar_lote(bloque)
+        cls.resultados['sector'] = np.array(['A', 'B', None, 'A'] * 5000, dtype=object)
+        cls.indice = IndicePares.desde_tabla(cls.resultados, col_sector='sector')
+
+    def test_coincide_con_calculo_directo(self):
+        """Los percentiles coinciden con contar los pares uno a uno."""
+        roe = self.resultados['roe']
+        for valor in (-0.5, 0.0, 0.1, float(np.nanmedian(roe)), 2.0):
+            self.assertAlmostEqual(self.indice.percentil('roe', valor),
+                                   percentil_directo(roe, valor))
+
+    def test_sectores(self):
+        """Cada sector es su propio grupo de pares; sin sector solo cuenta en el total."""
+        self.assertEqual(self.indice.sectores, ['A', 'B'])
+        self.assertEqual(self.indice.n_pares('z_score', 'A'),
+                         np.count_nonzero(~np.isnan(self.resultados['z_score'][
+                             self.resultados['sector'] == 'A'])))
+        z_b = self.resultados['z_score'][self.resultados['sector'] == 'B']
+        self.assertAlmostEqual(self.indice.percentil('z_score', 2.5, sector='B'),
+                               percentil_directo(z_b, 2.5))
+        self.assertNotIn('zona', self.indice.indicadores)
+
+    def test_agregar_y_valores_faltantes(self):
+        """Agregar una empresa suma un par en su sector; None y NaN no cuentan."""
+        indice = IndicePares.desde_tabla(self.resultados, columnas=['roe'], col_sector='sector')
+        antes = indice.n_pares('roe', 'B')
+        indice.agregar({'roe': 0.2, 'sector': 'B'}, col_sector='sector')
+        indice.agregar({'roe': None, 'sector': 'B'}, col_sector='sector')
+        self.assertEqual(indice.n_pares('roe', 'B'), antes + 1)
+        self.assertIsNone(indice.percentil('roe', None))
+        self.assertIsNone(indice.percentil('otro', 1.0))
+        self.assertEqual(indice.percentiles_empresa({'roe': None}), {'roe': None})
+
+
+if __name__ == "__main__":
+    unittest.main()
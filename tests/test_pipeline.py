@@ -0,0 +1,93 @@
+"""
+Tests del módulo de orquestación del análisis (risk_engine.pipeline).
+"""
+
+import subprocess
+import sys
+import unittest
+
+from risk_engine.pipeline import (
+    analizar_empresa,
+    analizar_empresas,
+    calcular_ratios,
+    calcular_zscore,
+    resolver_esquema
+)
+from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
+
+
+class TestCalculoPorEmpresa(unittest.TestCase):
+    """Tests de calcular_ratios, calcular_zscore y analizar_empresa."""
+
+    def test_ratios_empresa_saludable(self):
+        """Calcula los ratios esperados para la empresa saludable."""
+        ratios = calcular_ratios(get_ejemplo_empresa_saludable())
+        self.assertEqual(ratios['liquidez'], 2.0)
+        self.assertEqual(ratios['prueba_acida'], 1.4)
+        self.assertEqual(ratios['endeudamiento'], 0.4)
+        self.assertEqual(ratios['roa'], 0.15)
+        self.assertEqual(ratios['rotacion_inventarios'], 12.0)
+
+    def test_aproximaciones_campos_opcionales(self):
+        """Sin campos opcionales usa 30% del activo corriente y 60% de ventas."""
+        data = get_ejemplo_empresa_saludable()
+        for campo in ('inventarios', 'inventario_promedio', 'costo_ventas'):
+            del data[campo]
+        ratios = calcular_ratios(data)
+        self.assertAlmostEqual(ratios['prueba_acida'], (400000 - 120000) / 200000)
+        self.assertAlmostEqual(ratios['rotacion_inventarios'], 1200000 / 120000)
+
+    def test_alias_activo_total(self):
+        """Acepta activo_total y utilidades_retenidas como alias."""
+        data = get_ejemplo_empresa_saludable()
+        data['activo_total'] = data.pop('total_assets')
+        data['utilidades_retenidas'] = data.pop('retained_earnings')
+        self.assertEqual(calcular_ratios(data), calcular_ratios(get_ejemplo_empresa_saludable()))
+        self.assertEqual(calcular_zscore(data), calcular_zscore(get_ejemplo_empresa_saludable()))
+
+    def test_zscore_sin_activo_total(self):
+        """Sin activo total el Z-Score no es calculable."""
+        data = get_ejemplo_empresa_saludable()
+        del data['total_assets']
+        self.assertIsNone(calcular_zscore(data))
+
+    def test_analizar_empresa(self):
+        """El registro incluye ratios, Z-Score y clasificación."""
+        resultado = analizar_empresa(get_ejemplo_empresa_riesgo())
+        self.assertEqual(set(resultado), {'ratios', 'zscore', 'clasificacion'})
+        self.assertAlmostEqual(resultado['zscore'], 1.146)
+        self.assertEqual(resultado['clasificacion'], "⚠️ Alto riesgo (posible quiebra)")
+
+    def test_analizar_empresas_esquemas_mixtos(self):
+        """Procesa en orden empresas con distintos conjuntos de claves."""
+        parcial = get_ejemplo_empresa_riesgo()
+        del parcial['inventarios']
+        empresas = [get_ejemplo_empresa_saludable(), parcial, get_ejemplo_empresa_saludable()]
+        resultados = list(analizar_empresas(empresas))
+        self.assertEqual(resultados, [analizar_empresa(e) for e in empresas])
+
+    def test_esquema_cacheado(self):
+        """El esquema se resuelve una vez por conjunto de claves."""
+        claves = frozenset(get_ejemplo_empresa_saludable())
+        self.assertIs(resolver_esquema(claves), resolver_esquema(frozenset(claves)))
+
+
+class TestImportacion(unittest.TestCase):
+    """El pipeline debe poder importarse sin Streamlit ni librerías pesadas."""
+
+    def test_importa_sin_streamlit(self):
+        codigo = (
+            "import sys, time\n"
+            "inicio = time.perf_counter()\n"
+            "import risk_engine.pipeline\n"
+            "duracion = time.perf_counter() - inicio\n"
+            "pesados = [m for m in ('streamlit', 'numpy', 'pandas') if m in sys.modules]\n"
+            "assert not pesados, pesados\n"
+            "assert duracion < 0.05, duracion\n"
+        )
+        resultado = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True)
+        self.assertEqual(resultado.returncode, 0, resultado.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+"""
+Tests de los escritores de resultados por bloques (CSV, Excel y Parquet).
+"""
+
+import codecs
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from risk_engine import portfolio
+from risk_engine.batch import puntuar_lote
+from risk_engine.portfolio import crear_escritor, leer_portafolio, tabla_resultados
+from utils.sample_data import generar_cartera
+
+
+def tabla_ejemplo() -> dict:
+    """Bloque con textos especiales, NaN, enteros y categorías."""
+    return {
+        'id': np.array(['a;b', 'c"d', 'e<&>f'], dtype=object),
+        'valor': np.array([1.5, np.nan, -0.25]),
+        'zona': np.array([1, 2, 3], dtype=np.int8),
+        'clasificacion': pd.Categorical(['🟢 sana', 'gris', '🟢 sana']),
+    }
+
+
+class TestEscritores(unittest.TestCase):
+    """Tests de crear_escritor y los escritores por formato."""
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def ruta(self, nombre: str) -> str:
+        return os.path.join(self.directorio.name, nombre)
+
+    def escribir(self, nombre: str, bloques, **opciones) -> str:
+        ruta = self.ruta(nombre)
+        with crear_escritor(ruta, **opciones) as escritor:
+            for bloque in bloques:
+                escritor.escribir(bloque)
+        return ruta
+
+    def test_csv_formato_excel_es(self):
+        """Separador ';', coma decimal, BOM y comillas solo donde hacen falta."""
+        ruta = self.escribir('r.csv', [tabla_ejemplo(), pd.DataFrame(tabla_ejemplo())],
+                             sep=';', decimal=',', bom=True)
+        with open(ruta, 'rb') as archivo:
+            contenido = archivo.read()
+        self.assertTrue(contenido.startswith(codecs.BOM_UTF8))
+        lineas = contenido[len(codecs.BOM_UTF8):].decode('utf-8').splitlines()
+        self.assertEqual(lineas[:4], [
+            'id;valor;zona;clasificacion',
+            '"a;b";1,5;1;🟢 sana',
+            '"c""d";;2;gris',
+            'e<&>f;-0,25;3;🟢 sana',
+        ])
+        self.assertEqual(len(lineas), 7)
+
+    def test_csv_valores_exactos(self):
+        """Los números se leen de vuelta sin pérdida."""
+        bloque = next(generar_cartera(5000, tam_bloque=5000))
+        resultados = tabla_resultados(puntuar_lote(bloque), bloque['id'])
+        with mock.patch.object(portfolio, 'TAM_TRAMO_TEXTO', 1024):
+            ruta = self.escribir('r.csv', [resultados])
+        leido = pd.read_csv(ruta, float_precision='round_trip')
+        for columna in resultados.columns.drop(['zona', 'clasificacion']):
+            np.testing.assert_array_equal(leido[columna], resultados[columna])
+        self.assertEqual(list(leido['clasificacion']), list(resultados['clasificacion']))
+
+    def test_csv_en_flujo(self):
+        """El CSV puede escribirse en un flujo abierto, que queda sin cerrar."""
+        flujo = io.BytesIO()
+        with portfolio.EscritorCSV(flujo, sep=';', decimal=',') as escritor:
+            escritor.escribir(tabla_ejemplo())
+        self.assertFalse(flujo.closed)
+        self.assertEqual(flujo.getvalue().decode('utf-8').splitlines()[3],
+                         'e<&>f;-0,25;3;🟢 sana')
+
+    def test_excel(self):
+        """El .xlsx se lee con openpyxl y conserva textos, vacíos y números."""
+        ruta = self.escribir('r.xlsx', [tabla_ejemplo(), tabla_ejemplo()])
+        leido = next(leer_portafolio(ruta))
+        self.assertEqual(list(leido['id']), ['a;b', 'c"d', 'e<&>f'] * 2)
+        self.assertEqual(list(leido['valor'].isna()), [False, True, False] * 2)
+        self.assertEqual(leido['valor'][2], -0.25)
+        self.assertEqual(list(leido['clasificacion'])[:2], ['🟢 sana', 'gris'])
+
+    def test_excel_continua_en_hoja_nueva(self):
+        """Al superar el límite de filas se continúa en otra hoja con encabezado."""
+        from openpyxl import load_workbook
+
+        with mock.patch.object(portfolio, 'MAX_FILAS_EXCEL', 3):
+            ruta = self.escribir('r.xlsx', [tabla_ejemplo()])
+        libro = load_workbook(ruta, read_only=True)
+        self.assertEqual(libro.sheetnames, ['resultados', 'resultados_2'])
+        filas = list(libro['resultados_2'].iter_rows(values_only=True))
+        self.assertEqual(filas, [('id', 'valor', 'zona', 'clasificacion'),
+                                 ('e<&>f', -0.25, 3, '🟢 sana')])
+        libro.close()
+
+    def test_excel_sin_pyarrow(self):
+        """Sin pyarrow se escribe con openpyxl en modo write-only."""
+        with mock.patch.dict(sys.modules, {'pyarrow': None, 'pyarrow.compute': None}):
+            ruta = self.escribir('r.xlsx', [tabla_ejemplo()])
+        leido = next(leer_portafolio(ruta))
+        self.assertEqual(list(leido['id']), ['a;b', 'c"d', 'e<&>f'])
+        self.assertTrue(np.isnan(leido['valor'][1]))
+
+    def test_excel_textos_de_control_y_espacios(self):
+        """Los caracteres que XML no admite se quitan y los espacios se conservan."""
+        from openpyxl import load_workbook
+
+        bloque = {'id': np.array(['a\x0bb', '  c  ', 'd\x00\x1fe'], dtype=object),
+                  'valor': np.array([1.0, 2.0, 3.0])}
+        rutas = [self.escribir('r.xlsx', [bloque])]
+        with mock.patch.dict(sys.modules, {'pyarrow': None, 'pyarrow.compute': None}):
+            rutas.append(self.escribir('r_openpyxl.xlsx', [bloque]))
+
+        for ruta in rutas:
+            libro = load_workbook(ruta)
+            self.assertEqual([fila[0] for fila in libro.active.iter_rows(values_only=True)],
+                             ['id', 'ab', '  c  ', 'de'])
+            libro.close()
+
+    def test_parquet_desde_diccionario(self):
+        """El escritor Parquet acepta diccionarios de arreglos."""
+        ruta = self.escribir('r.parquet', [tabla_ejemplo()])
+        self.assertEqual(list(pd.read_parquet(ruta)['id']), ['a;b', 'c"d', 'e<&>f'])
+
+    def test_extension_no_soportada(self):
+        """Una extensión desconocida produce ValueError."""
+        with self.assertRaises(ValueError):
+            crear_escritor(self.ruta('r.txt'))
+
+    def test_escritor_incompleto(self):
+        """Un escritor sin ``escribir`` falla al crearse, no al exportar."""
+        class SinEscribir(portfolio.EscritorResultados):
+            pass
+
+        with self.assertRaises(TypeError):
+            SinEscribir()
+
+
+class TestLeerPortafolio(unittest.TestCase):
+    """Tests de la lectura de carteras por bloques."""
+
+    def leer(self, contenido: str, **opciones) -> pd.DataFrame:
+        archivo = io.BytesIO(contenido.encode('utf-8'))
+        return pd.concat(list(leer_portafolio(archivo, **opciones)), ignore_index=True)
+
+    def test_decimal_coma(self):
+        """Con decimal=',' se usa el punto como separador de miles."""
+        cartera = self.leer('id;ventas;activo_corriente\n'
+                            'a;1,5;1.234,5\n'
+                            'b;;2\n'
+                            'c;3;2,25\n',
+                            tam_bloque=2, sep=';', decimal=',')
+        np.testing.assert_array_equal(cartera['ventas'], [1.5, np.nan, 3.0])
+        np.testing.assert_array_equal(cartera['activo_corriente'], [1234.5, 2.0, 2.25])
+
+    def test_celdas_no_numericas(self):
+        """Una celda con texto no numérico es un error con su fila y columna."""
+        with self.assertRaisesRegex(ValueError, "fila 3, columna 'ventas': 'N/D'"):
+            self.leer('id;ventas\na;1,5\nb;2\nc;N/D\n', tam_bloque=2, sep=';', decimal=',')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Tests del registro declarativo de ratios y sus evaluadores compilados.
+"""
+
+import math
+import unittest
+
+import numpy as np
+
+from risk_engine.batch import compute_ratios
+from risk_engine.pipeline import calcular_ratios
+from risk_engine.ratios import (
+    dias_inventario,
+    periodo_medio_cobro,
+    periodo_medio_pago,
+    ratio_tesoreria
+)
+from risk_engine.registry import RATIOS, ratios_disponibles
+from risk_engine.statements import CAMPOS
+from utils.sample_data import get_ejemplo_empresa_saludable
+
+COMPLEMENTARIOS = {
+    'caja_bancos': 50000,
+    'inversiones_cp': 30000,
+    'cuentas_por_cobrar': 100000,
+    'ventas_credito': 730000,
+    'cuentas_por_pagar': 80000,
+    'compras_credito': 584000,
+}
+
+
+class TestRegistro(unittest.TestCase):
+    """Tests del evaluador escalar compilado."""
+
+    def setUp(self):
+        self.data = get_ejemplo_empresa_saludable()
+
+    def test_coincide_con_funciones_de_ratios(self):
+        """Los ratios agregados usan las mismas fórmulas que risk_engine.ratios."""
+        data = {**self.data, **COMPLEMENTARIOS}
+        ratios = calcular_ratios(data)
+        self.assertEqual(list(ratios), [ratio.nombre for ratio in RATIOS])
+        self.assertEqual(ratios['tesoreria'], ratio_tesoreria(50000, 30000, data['pasivo_corriente']))
+        self.assertEqual(ratios['dias_inventario'],
+                         dias_inventario(data['costo_ventas'], data['inventario_promedio']))
+        self.assertEqual(ratios['periodo_medio_cobro'], periodo_medio_cobro(100000, 730000))
+        self.assertEqual(ratios['periodo_medio_pago'], periodo_medio_pago(80000, 584000))
+
+    def test_omite_ratios_sin_entradas(self):
+        """Sin datos complementarios solo se calculan los ratios del formulario."""
+        ratios = calcular_ratios(self.data)
+        self.assertEqual(tuple(ratios), ratios_disponibles(CAMPOS))
+        self.assertNotIn('tesoreria', ratios)
+        self.assertIn('dias_inventario', ratios)
+
+    def test_sin_aproximaciones_complementarias(self):
+        """Sin ventas ni compras a crédito se omiten los plazos de cobro y pago."""
+        data = {**self.data, 'cuentas_por_cobrar': 100000, 'cuentas_por_pagar': 80000}
+        ratios = calcular_ratios(data)
+        self.assertNotIn('periodo_medio_cobro', ratios)
+        self.assertNotIn('periodo_medio_pago', ratios)
+        ratios = calcular_ratios({**data, 'ventas_credito': 730000})
+        self.assertEqual(ratios['periodo_medio_cobro'], periodo_medio_cobro(100000, 730000))
+
+    def test_subconjunto(self):
+        """Solo se calculan los ratios pedidos y sus campos obligatorios."""
+        self.assertEqual(calcular_ratios(self.data, ['roe']), {'roe': 0.25})
+        self.assertEqual(calcular_ratios({'utilidad_neta': 1.0, 'patrimonio': 4.0}, ['roe']),
+                         {'roe': 0.25})
+        with self.assertRaises(KeyError):
+            calcular_ratios({'utilidad_neta': 1.0}, ['roe'])
+        with self.assertRaises(ValueError):
+            calcular_ratios(self.data, ['ratio_inexistente'])
+
+
+class TestRegistroLote(unittest.TestCase):
+    """Tests del evaluador vectorizado con el plan del registro."""
+
+    def test_igual_al_escalar_con_valores_ausentes(self):
+        """Un NaN aplica la aproximación de esa fila, igual que una clave ausente."""
+        base = get_ejemplo_empresa_saludable()
+        empresas = [
+            {**base, **COMPLEMENTARIOS},
+            {**base, 'caja_bancos': 20000, 'cuentas_por_cobrar': 90000, 'cuentas_por_pagar': 0},
+            {**base, 'caja_bancos': 20000, 'cuentas_por_cobrar': 90000,
+             'cuentas_por_pagar': 70000, 'compras_credito': 0},
+        ]
+        campos = sorted({campo for empresa in empresas for campo in empresa})
+        columnas = {
+            campo: np.array([empresa.get(campo, np.nan) for empresa in empresas])
+            for campo in campos
+        }
+
+        ratios, _ = compute_ratios(columnas)
+        self.assertEqual(list(ratios), [ratio.nombre for ratio in RATIOS])
+        for i, empresa in enumerate(empresas):
+            for nombre, valor in calcular_ratios(empresa).items():
+                if valor is None:
+                    self.assertTrue(math.isnan(ratios[nombre][i]), nombre)
+                else:
+                    self.assertEqual(ratios[nombre][i], valor, nombre)
+
+    def test_subconjunto(self):
+        """El lote calcula solo los ratios pedidos."""
+        columnas = {'ventas': np.array([100.0, 0.0]), 'utilidad_neta': np.array([10.0, 5.0])}
+        ratios, validos = compute_ratios(columnas, ['margen_neto'])
+        self.assertEqual(list(ratios), ['margen_neto'])
+        np.testing.assert_array_equal(validos['margen_neto'], [True, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests del generador de carteras sintéticas.
+"""
+
+import unittest
+
+import numpy as np
+
+from risk_engine.batch import puntuar_lote
+from risk_engine.classification import ZONA_ALTO_RIESGO, ZONA_GRIS, ZONA_SEGURA
+from risk_engine.statements import CAMPOS
+from utils.sample_data import generar_cartera
+
+
+class TestGenerarCartera(unittest.TestCase):
+    """Tests de generar_cartera."""
+
+    def setUp(self):
+        self.bloque = next(generar_cartera(20_000, tam_bloque=20_000, semilla=7))
+
+    def test_bloques_e_identificadores(self):
+        """Genera bloques del tamaño pedido con identificadores consecutivos."""
+        bloques = list(generar_cartera(25, tam_bloque=10))
+        self.assertEqual([len(bloque['id']) for bloque in bloques], [10, 10, 5])
+        ids = np.concatenate([bloque['id'] for bloque in bloques])
+        np.testing.assert_array_equal(ids, np.arange(25))
+        self.assertEqual(set(bloques[0]), set(CAMPOS) | {'id'})
+
+    def test_reproducible(self):
+        """La misma semilla produce la misma cartera; otra semilla, otra."""
+        igual = next(generar_cartera(20_000, tam_bloque=20_000, semilla=7))
+        distinto = next(generar_cartera(20_000, tam_bloque=20_000, semilla=8))
+        np.testing.assert_array_equal(igual['ventas'], self.bloque['ventas'])
+        self.assertFalse(np.array_equal(distinto['ventas'], self.bloque['ventas']))
+
+    def test_estados_coherentes(self):
+        """Los estados cumplen las identidades contables."""
+        b = self.bloque
+        for campo in CAMPOS:
+            self.assertTrue(np.isfinite(b[campo]).all(), campo)
+        self.assertTrue((b['activo_corriente'] <= b['total_assets']).all())
+        self.assertTrue((b['pasivo_corriente'] <= b['pasivo_total']).all())
+        self.assertTrue((b['inventarios'] <= b['activo_corriente']).all())
+        self.assertTrue((b['patrimonio'] > 0).all())
+        self.assertTrue((b['ebit'] <= b['ventas'] - b['costo_ventas']).all())
+        self.assertTrue((b['utilidad_neta'] <= b['ebit']).all())
+        np.testing.assert_allclose(b['patrimonio'], b['total_assets'] - b['pasivo_total'])
+        np.testing.assert_allclose(b['working_capital'],
+                                   b['activo_corriente'] - b['pasivo_corriente'])
+        np.testing.assert_array_equal(b['total_liabilities'], b['pasivo_total'])
+
+    def test_mezcla_de_zonas(self):
+        """La proporción de empresas por zona sigue la mezcla pedida."""
+        bloque = next(generar_cartera(20_000, tam_bloque=20_000, mezcla=(0.1, 0.3, 0.6)))
+        zonas = np.bincount(puntuar_lote(bloque)['zona'], minlength=4) / 20_000
+        self.assertAlmostEqual(zonas[ZONA_ALTO_RIESGO], 0.1, delta=0.01)
+        self.assertAlmostEqual(zonas[ZONA_GRIS], 0.3, delta=0.01)
+        self.assertAlmostEqual(zonas[ZONA_SEGURA], 0.6, delta=0.01)
+
+        solo_gris = next(generar_cartera(1000, mezcla=(0, 1, 0)))
+        self.assertTrue((puntuar_lote(solo_gris)['zona'] == ZONA_GRIS).all())
+
+    def test_mezcla_invalida(self):
+        """Rechaza mezclas sin tres proporciones no negativas."""
+        for mezcla in [(1, 1), (0, 0, 0), (1, -1, 1)]:
+            with self.assertRaises(ValueError):
+                next(generar_cartera(10, mezcla=mezcla))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+Tests del servicio HTTP asíncrono de puntuación.
+"""
+
+import asyncio
+import json
+import unittest
+
+from risk_engine.pipeline import analizar_empresa
+from risk_engine.service import (
+    ErrorSolicitud,
+    ProgramadorLotes,
+    ServicioPuntuacion,
+    validar_registro,
+    validar_registros,
+)
+from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
+
+
+async def solicitar(puerto: int, metodo: str, ruta: str, cuerpo=None):
+    """Envía una solicitud HTTP/1.1 y retorna (estado, json)."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', puerto)
+    datos = json.dumps(cuerpo).encode() if cuerpo is not None else b''
+    writer.write(
+        f"{metodo} {ruta} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+        f"Content-Length: {len(datos)}\r\n\r\n".encode() + datos
+    )
+    respuesta = await reader.read()
+    writer.close()
+    cabecera, _, contenido = respuesta.partition(b'\r\n\r\n')
+    return int(cabecera.split()[1]), json.loads(contenido)
+
+
+class TestServicioPuntuacion(unittest.IsolatedAsyncioTestCase):
+    """Tests de los endpoints del servicio."""
+
+    async def asyncSetUp(self):
+        self.servicio = ServicioPuntuacion()
+        self.servidor = await self.servicio.iniciar('127.0.0.1', 0)
+        self.puerto = self.servidor.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.servidor.close()
+        await self.servidor.wait_closed()
+
+    async def test_score_igual_a_analizar_empresa(self):
+        """POST /score retorna lo mismo que el análisis escalar."""
+        empresa = get_ejemplo_empresa_saludable()
+        estado, cuerpo = await solicitar(self.puerto, 'POST', '/score', empresa)
+        self.assertEqual(estado, 200)
+        self.assertEqual(cuerpo, analizar_empresa(empresa))
+
+    async def test_score_batch(self):
+        """POST /score/batch puntúa la lista en orden."""
+        empresas = [get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()]
+        estado, cuerpo = await solicitar(self.puerto, 'POST', '/score/batch',
+                                         {'empresas': empresas})
+        self.assertEqual(estado, 200)
+        self.assertEqual(cuerpo['resultados'], [analizar_empresa(e) for e in empresas])
+
+        empresas[1] = {**empresas[1], 'caja_bancos': 20000}
+        _, cuerpo = await solicitar(self.puerto, 'POST', '/score/batch', {'empresas': empresas})
+        self.assertEqual(cuerpo['resultados'], [analizar_empresa(e) for e in empresas])
+
+    async def test_solicitudes_concurrentes_se_agrupan(self):
+        """Solicitudes simultáneas se resuelven en menos lotes que solicitudes."""
+        empresas = [get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()] * 10
+        respuestas = await asyncio.gather(*(
+            solicitar(self.puerto, 'POST', '/score', e) for e in empresas
+        ))
+        for empresa, (estado, cuerpo) in zip(empresas, respuestas):
+            self.assertEqual(estado, 200)
+            self.assertEqual(cuerpo['zscore'], analizar_empresa(empresa)['zscore'])
+
+        _, salud = await solicitar(self.puerto, 'GET', '/salud')
+        self.assertEqual(salud['solicitudes'], len(empresas))
+        self.assertLess(salud['lotes'], len(empresas))
+
+    async def test_errores(self):
+        """Errores de validación, ruta y método."""
+        estado, cuerpo = await solicitar(self.puerto, 'POST', '/score', {'ventas': 'abc'})
+        self.assertEqual((estado, cuerpo['error']), (400, "El campo 'ventas' debe ser numérico."))
+
+        estado, cuerpo = await solicitar(self.puerto, 'POST', '/score/batch',
+                                         {'empresas': [get_ejemplo_empresa_riesgo(), {}]})
+        self.assertEqual(estado, 400)
+        self.assertTrue(cuerpo['error'].startswith("Empresa 1:"))
+
+        self.assertEqual((await solicitar(self.puerto, 'POST', '/otra', {}))[0], 404)
+        self.assertEqual((await solicitar(self.puerto, 'GET', '/score'))[0], 405)
+
+    async def test_content_length_invalido(self):
+        """Un Content-Length negativo o no entero se responde con 400."""
+        for valor in ('-5', '+5', '1_0', 'abc', '5.0'):
+            reader, writer = await asyncio.open_connection('127.0.0.1', self.puerto)
+            writer.write(f"POST /score HTTP/1.1\r\nHost: test\r\n"
+                         f"Content-Length: {valor}\r\n\r\n{{}}".encode())
+            respuesta = await asyncio.wait_for(reader.read(), timeout=1.0)
+            writer.close()
+            cabecera, _, contenido = respuesta.partition(b'\r\n\r\n')
+            self.assertEqual(int(cabecera.split()[1]), 400, valor)
+            self.assertEqual(json.loads(contenido), {'error': "Content-Length inválido."})
+
+    async def test_keep_alive(self):
+        """Varias solicitudes por la misma conexión."""
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.puerto)
+        for _ in range(3):
+            writer.write(b"GET /salud HTTP/1.1\r\nHost: test\r\n\r\n")
+            cabecera = await reader.readuntil(b'\r\n\r\n')
+            self.assertIn(b'200 OK', cabecera)
+            largo = int(cabecera.split(b'Content-Length: ')[1].split(b'\r\n')[0])
+            await reader.readexactly(largo)
+        writer.close()
+
+
+class TestProgramadorLotes(unittest.IsolatedAsyncioTestCase):
+    """Tests del programador de micro-lotes."""
+
+    async def test_tam_max_vacia_de_inmediato(self):
+        """Al alcanzar el tamaño máximo el lote se evalúa sin esperar."""
+        programador = ProgramadorLotes(tam_max=4, espera_max=10.0)
+        empresa = validar_registro(get_ejemplo_empresa_saludable())
+        resultados = await asyncio.wait_for(
+            asyncio.gather(*(programador.puntuar(empresa) for _ in range(8))), timeout=1.0
+        )
+        self.assertEqual(len(resultados), 8)
+        self.assertEqual(programador.estadisticas()['lotes'], 2)
+
+    async def test_lote_heterogeneo_igual_a_analizar_empresa(self):
+        """Cada solicitud de un lote recibe solo los ratios de sus propios campos."""
+        programador = ProgramadorLotes(tam_max=2, espera_max=10.0)
+        completa = {**get_ejemplo_empresa_saludable(), 'caja_bancos': 50000,
+                    'cuentas_por_cobrar': 100000, 'ventas_credito': 730000}
+        simple = get_ejemplo_empresa_riesgo()
+        resultados = await asyncio.wait_for(asyncio.gather(
+            programador.puntuar(validar_registro(simple)),
+            programador.puntuar(validar_registro(completa)),
+        ), timeout=1.0)
+
+        self.assertEqual(programador.estadisticas()['lotes'], 1)
+        self.assertEqual(resultados, [analizar_empresa(simple), analizar_empresa(completa)])
+        self.assertNotIn('tesoreria', resultados[0]['ratios'])
+        self.assertIn('periodo_medio_cobro', resultados[1]['ratios'])
+
+    def test_validar_registro(self):
+        """Acepta textos con separadores y rechaza booleanos."""
+        empresa = {**get_ejemplo_empresa_saludable(), 'ventas': '2,000,000', 'inventarios': None}
+        datos = validar_registro(empresa)
+        self.assertEqual(datos['ventas'], 2000000.0)
+        self.assertNotIn('inventarios', datos)
+        with self.assertRaises(ErrorSolicitud):
+            validar_registro({**empresa, 'ebit': True})
+
+    def test_mismas_reglas_que_el_formulario(self):
+        """Los negativos se rechazan en los mismos campos que en el formulario."""
+        empresa = get_ejemplo_empresa_saludable()
+        with self.assertRaisesRegex(ErrorSolicitud, "'ventas' no puede ser negativo"):
+            validar_registro({**empresa, 'ventas': -1})
+        self.assertEqual(validar_registro({**empresa, 'ebit': '-5'})['ebit'], -5.0)
+        with self.assertRaisesRegex(ErrorSolicitud, "'ventas' debe ser numérico"):
+            validar_registro({**empresa, 'ventas': float('inf')})
+
+        _, errores = validar_registros([
+            empresa, {**empresa, 'caja_bancos': -10.0}, {**empresa, 'ventas': '-1'},
+            {**empresa, 'ventas': float('nan')}, {**empresa, 'ebit': -5.0},
+        ])
+        self.assertEqual(errores, {
+            1: "El campo 'caja_bancos' no puede ser negativo.",
+            2: "El campo 'ventas' no puede ser negativo.",
+            3: "El campo 'ventas' debe ser numérico.",
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
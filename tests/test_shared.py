@@ -0,0 +1,87 @@
+"""
+Tests del almacén columnar en memoria compartida.
+"""
+
+import unittest
+from multiprocessing import shared_memory
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.batch import puntuar_lote
+from risk_engine.parallel import columnas_motor, puntuar_bloques
+from risk_engine.shared import AlmacenColumnas, puntuar_tramo, tramos
+from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
+
+
+class TestAlmacenColumnas(unittest.TestCase):
+    """Tests de AlmacenColumnas y puntuar_tramo."""
+
+    def setUp(self):
+        empresas = [get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()] * 7
+        self.cartera = pd.DataFrame(empresas)
+        # Un campo opcional ausente en algunas filas usa la aproximación
+        self.cartera.loc[::3, 'inventarios'] = np.nan
+        self.columnas = columnas_motor(self.cartera)
+
+    def test_tramos_equivalen_al_lote_completo(self):
+        """Puntuar por tramos escribe lo mismo que puntuar todo el lote."""
+        esperado = puntuar_lote(self.cartera)
+        with AlmacenColumnas.desde_columnas(self.columnas) as almacen:
+            for inicio, fin in tramos(almacen.n_filas, 4):
+                puntuar_tramo(almacen.descriptor, inicio, fin)
+            resultados = almacen.resultados()
+
+        self.assertEqual(set(resultados), set(esperado))
+        for nombre, valores in esperado.items():
+            np.testing.assert_array_equal(resultados[nombre], valores)
+        self.assertEqual(resultados['zona'].dtype, np.int8)
+
+    def test_vistas_sin_copia(self):
+        """Las columnas de entrada son vistas sobre la memoria compartida."""
+        with AlmacenColumnas.desde_columnas(self.columnas) as almacen:
+            vista = almacen.entrada['ventas']
+            self.assertFalse(vista.flags.owndata)
+            np.testing.assert_array_equal(vista, self.cartera['ventas'])
+            del vista
+
+    def test_tramos(self):
+        """Los tramos cubren todas las filas sin solaparse."""
+        self.assertEqual(list(tramos(10, 3)), [(0, 3), (3, 6), (6, 10)])
+        self.assertEqual(list(tramos(2, 8)), [(0, 1), (1, 2)])
+        self.assertEqual(list(tramos(0, 4)), [])
+
+    def test_error_no_queda_oculto(self):
+        """Un error al puntuar se propaga aunque cerrar el bloque falle."""
+        cerrar = shared_memory.SharedMemory.close
+        fallos = []
+
+        def cerrar_con_vistas(shm):
+            # Los dos cierres de puntuar_tramo fallan como si quedaran vistas vivas
+            if len(fallos) < 2:
+                fallos.append(shm)
+                raise BufferError("cannot close exported pointers exist")
+            cerrar(shm)
+
+        with AlmacenColumnas.desde_columnas(self.columnas) as almacen, \
+                mock.patch('risk_engine.shared.puntuar_lote', side_effect=ValueError('fallo')), \
+                mock.patch.object(shared_memory.SharedMemory, 'close', cerrar_con_vistas):
+            with self.assertRaisesRegex(ValueError, 'fallo'):
+                puntuar_tramo(almacen.descriptor, 0, almacen.n_filas)
+        self.assertEqual(len(fallos), 2)
+        for shm in fallos:
+            cerrar(shm)
+
+    @mock.patch('risk_engine.parallel.os.cpu_count', return_value=2)
+    def test_puntuar_bloques_con_memoria_compartida(self, _):
+        """Varios procesos escriben en la salida compartida en orden."""
+        bloques = [self.cartera.iloc[i:i + 5] for i in range(0, len(self.cartera), 5)]
+        for bloque, resultados in puntuar_bloques(bloques, workers=2):
+            np.testing.assert_array_equal(
+                resultados['z_score'], puntuar_lote(bloque)['z_score']
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests de los registros compactos de estados financieros.
+"""
+
+import sys
+import unittest
+
+import numpy as np
+
+from risk_engine.batch import (
+    DTYPE_ESTADOS,
+    FinancialStatementBatch,
+    compute_ratios,
+    compute_zscore,
+    puntuar_lote
+)
+from risk_engine.pipeline import analizar_empresa
+from risk_engine.statements import CAMPOS, FinancialStatement
+from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
+
+
+class TestFinancialStatement(unittest.TestCase):
+    """Tests del registro con __slots__."""
+
+    def test_sin_diccionario_de_instancia(self):
+        """Usa __slots__ en lugar de __dict__."""
+        estado = FinancialStatement.from_dict(get_ejemplo_empresa_saludable())
+        self.assertFalse(hasattr(estado, '__dict__'))
+
+    def test_ida_y_vuelta_dict(self):
+        """to_dict devuelve los mismos datos que recibió from_dict."""
+        data = get_ejemplo_empresa_riesgo()
+        self.assertEqual(FinancialStatement.from_dict(data).to_dict(), data)
+
+    def test_opcionales_vacios_no_son_claves(self):
+        """Los campos opcionales no informados no aparecen como claves."""
+        data = get_ejemplo_empresa_saludable()
+        del data['inventarios']
+        estado = FinancialStatement.from_dict(data)
+        self.assertNotIn('inventarios', estado)
+        self.assertIsNone(estado.get('inventarios'))
+        with self.assertRaises(KeyError):
+            estado['inventarios']
+
+    def test_campo_obligatorio_faltante(self):
+        """Falta un campo obligatorio: TypeError."""
+        data = get_ejemplo_empresa_saludable()
+        del data['ventas']
+        with self.assertRaises(TypeError):
+            FinancialStatement.from_dict(data)
+
+    def test_pipeline_acepta_estado(self):
+        """El pipeline da el mismo resultado con FinancialStatement que con dict."""
+        for data in (get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()):
+            self.assertEqual(analizar_empresa(FinancialStatement.from_dict(data)),
+                             analizar_empresa(data))
+
+
+class TestFinancialStatementBatch(unittest.TestCase):
+    """Tests de la cartera en arreglo estructurado."""
+
+    def setUp(self):
+        parcial = get_ejemplo_empresa_riesgo()
+        del parcial['costo_ventas']
+        self.empresas = [get_ejemplo_empresa_saludable(), parcial]
+        self.lote = FinancialStatementBatch.desde_estados(
+            FinancialStatement.from_dict(e) for e in self.empresas)
+
+    def test_motores_aceptan_lote(self):
+        """compute_ratios y compute_zscore aceptan el lote directamente."""
+        ratios, _ = compute_ratios(self.lote)
+        z = compute_zscore(self.lote)
+        for i, empresa in enumerate(self.empresas):
+            esperado = analizar_empresa(empresa)
+            for nombre, valor in esperado['ratios'].items():
+                self.assertEqual(ratios[nombre][i], valor, nombre)
+            self.assertAlmostEqual(z[i], esperado['zscore'], places=9)
+
+    def test_arreglo_estructurado_directo(self):
+        """Los motores aceptan también el ndarray estructurado."""
+        np.testing.assert_array_equal(puntuar_lote(self.lote.datos)['zona'],
+                                      puntuar_lote(self.lote)['zona'])
+
+    def test_desde_columnas_y_estado(self):
+        """desde_columnas y estado(i) conservan los datos."""
+        columnas = {campo: np.array([e.get(campo, np.nan) for e in self.empresas], dtype=float)
+                    for campo in CAMPOS}
+        lote = FinancialStatementBatch.desde_columnas(columnas)
+        self.assertEqual(lote.estado(1).to_dict(), self.empresas[1])
+
+    def test_memoria_por_empresa(self):
+        """El registro columnar ocupa al menos 5 veces menos que un dict."""
+        data = get_ejemplo_empresa_saludable()
+        bytes_dict = sys.getsizeof(data) + sum(sys.getsizeof(float(v)) for v in data.values())
+        self.assertEqual(DTYPE_ESTADOS.itemsize, 8 * len(CAMPOS))
+        self.assertGreaterEqual(bytes_dict / DTYPE_ESTADOS.itemsize, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
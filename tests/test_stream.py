@@ -0,0 +1,127 @@
+"""
+Tests del filtro NDJSON de puntuación en flujo.
+"""
+
+import io
+import json
+import os
+import select
+import tempfile
+import threading
+import unittest
+
+from risk_engine.pipeline import analizar_empresa
+from risk_engine.stream import filtrar_ndjson
+from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
+
+
+class TestFiltroNDJSON(unittest.TestCase):
+    """Tests de filtrar_ndjson."""
+
+    def filtrar(self, lineas, **kwargs):
+        """Ejecuta el filtro sobre un archivo temporal y retorna (salida, estadísticas)."""
+        with tempfile.TemporaryFile() as entrada:
+            entrada.write(('\n'.join(lineas)).encode('utf-8'))
+            entrada.seek(0)
+            salida = io.BytesIO()
+            estadisticas = filtrar_ndjson(entrada.fileno(), salida, **kwargs)
+        return [json.loads(linea) for linea in salida.getvalue().splitlines()], estadisticas
+
+    def test_resultados_igual_a_analizar_empresa(self):
+        """Cada línea produce el mismo análisis que la aplicación, en orden."""
+        empresas = [get_ejemplo_empresa_saludable(), get_ejemplo_empresa_riesgo()] * 4
+        lineas = [json.dumps(dict(e, id=i)) for i, e in enumerate(empresas)]
+        resultados, estadisticas = self.filtrar(lineas, tam_lote=3)
+
+        self.assertEqual(estadisticas, {'lineas': 8, 'errores': 0, 'lotes': 3})
+        for i, (empresa, resultado) in enumerate(zip(empresas, resultados)):
+            self.assertEqual(resultado, dict(analizar_empresa(empresa), id=i))
+
+    def test_lote_con_campos_distintos(self):
+        """Los ratios de cada línea dependen solo de sus campos, no de su lote."""
+        empresas = [
+            get_ejemplo_empresa_saludable(),
+            {**get_ejemplo_empresa_riesgo(), 'caja_bancos': 20000, 'cuentas_por_pagar': 50000,
+             'compras_credito': 400000},
+            {**get_ejemplo_empresa_saludable(), 'caja_bancos': 0},
+        ]
+        resultados, _ = self.filtrar([json.dumps(e) for e in empresas])
+        self.assertEqual(resultados, [analizar_empresa(e) for e in empresas])
+
+    def test_lineas_con_error(self):
+        """Las líneas inválidas producen un registro de error sin cortar el flujo."""
+        lineas = [
+            '{no es json',
+            json.dumps({'id': 'A', 'ventas': 'abc'}),
+            '',
+            json.dumps(get_ejemplo_empresa_riesgo()),
+        ]
+        resultados, estadisticas = self.filtrar(lineas)
+
+        self.assertEqual(estadisticas['errores'], 2)
+        self.assertEqual(resultados[0], {'linea': 1, 'error': "La línea no es JSON válido."})
+        self.assertEqual(resultados[1]['id'], 'A')
+        self.assertEqual(resultados[1]['error'], "El campo 'ventas' debe ser numérico.")
+        self.assertEqual(resultados[2]['zscore'], analizar_empresa(get_ejemplo_empresa_riesgo())['zscore'])
+
+    def test_linea_con_utf8_invalido(self):
+        """Una línea que no es UTF-8 es un error de esa línea, aunque sea la primera."""
+        with tempfile.TemporaryFile() as entrada:
+            entrada.write(b'\xff{}\n' + json.dumps(get_ejemplo_empresa_riesgo()).encode())
+            entrada.seek(0)
+            salida = io.BytesIO()
+            estadisticas = filtrar_ndjson(entrada.fileno(), salida)
+        resultados = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+
+        self.assertEqual(estadisticas['errores'], 1)
+        self.assertEqual(resultados[0], {'linea': 1, 'error': "La línea no es JSON válido."})
+        self.assertEqual(resultados[1], analizar_empresa(get_ejemplo_empresa_riesgo()))
+
+    def test_valores_partidos_o_unidos_en_una_linea(self):
+        """Cada línea debe ser un único valor JSON, aunque el lote unido lo sea."""
+        empresa = json.dumps(get_ejemplo_empresa_saludable())
+        # Unidas con comas forman una lista JSON válida de cuatro elementos
+        lineas = ['{"id":1,"x":[1', '2]}', '{"id":2},{"id":3}', empresa]
+        resultados, estadisticas = self.filtrar(lineas)
+
+        self.assertEqual(estadisticas['errores'], 3)
+        for numero in (1, 2, 3):
+            self.assertEqual(resultados[numero - 1],
+                             {'linea': numero, 'error': "La línea no es JSON válido."})
+        self.assertEqual(resultados[3], analizar_empresa(get_ejemplo_empresa_saludable()))
+
+    def test_columna_id_con_caracteres_especiales(self):
+        """El nombre de la clave identificadora se escapa en la salida."""
+        col_id = 'id "interno" \\ ñ'
+        lineas = [json.dumps({**get_ejemplo_empresa_saludable(), col_id: 7}),
+                  json.dumps({col_id: 'B', 'ventas': 'abc'})]
+        resultados, _ = self.filtrar(lineas, col_id=col_id)
+        self.assertEqual([resultado[col_id] for resultado in resultados], [7, 'B'])
+
+    def test_emite_sin_esperar_fin_del_flujo(self):
+        """Un lote incompleto se emite en cuanto la entrada queda sin datos."""
+        lectura_entrada, escritura_entrada = os.pipe()
+        lectura_salida, escritura_salida = os.pipe()
+        salida = os.fdopen(escritura_salida, 'wb')
+        hilo = threading.Thread(
+            target=filtrar_ndjson, args=(lectura_entrada, salida), kwargs={'tam_lote': 1000}
+        )
+        hilo.start()
+        try:
+            linea = json.dumps(get_ejemplo_empresa_saludable()) + '\n'
+            os.write(escritura_entrada, linea.encode('utf-8'))
+
+            listos, _, _ = select.select([lectura_salida], [], [], 5.0)
+            self.assertTrue(listos, "El resultado no se emitió antes del fin del flujo")
+            resultado = json.loads(os.read(lectura_salida, 65536))
+            self.assertEqual(resultado['zscore'], 4.46)
+        finally:
+            os.close(escritura_entrada)
+            hilo.join(5.0)
+            salida.close()
+            os.close(lectura_entrada)
+            os.close(lectura_salida)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Tests del análisis multiperíodo.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.batch import puntuar_lote
+from risk_engine.timeseries import (CAMPOS_FLUJO, analizar_series, diferencia, media_movil,
+                                    ordenar_panel, promedio_consecutivo)
+from utils.sample_data import generar_cartera
+
+
+def panel_sintetico(n_empresas: int = 30, n_periodos: int = 6, semilla: int = 0) -> dict:
+    """Panel de estados desordenado, una fila por (empresa, período)."""
+    estados = next(generar_cartera(n_empresas * n_periodos, tam_bloque=n_empresas * n_periodos,
+                                   semilla=semilla))
+    estados.pop('inventario_promedio')
+    estados['id'] = np.repeat(np.arange(n_empresas), n_periodos)
+    estados['periodo'] = np.tile(np.arange(2015, 2015 + n_periodos), n_empresas)
+    orden = np.random.default_rng(semilla).permutation(n_empresas * n_periodos)
+    return {campo: valores[orden] for campo, valores in estados.items()}
+
+
+class TestOperacionesPorEmpresa(unittest.TestCase):
+    """Tests de las operaciones entre períodos."""
+
+    def setUp(self):
+        empresas = np.array(['b', 'a', 'b', 'a', 'a', 'c'])
+        periodos = np.array(['2024Q2', '2024Q3', '2024Q1', '2024Q1', '2024Q2', '2024Q1'])
+        self.orden, self.inicio = ordenar_panel(empresas, periodos)
+        self.empresas = empresas[self.orden]
+
+    def test_ordenar_panel(self):
+        """Las filas quedan por empresa y período, con el inicio de cada empresa."""
+        np.testing.assert_array_equal(self.orden, [3, 4, 1, 2, 0, 5])
+        np.testing.assert_array_equal(self.inicio, [0, 0, 0, 3, 3, 5])
+
+    def test_periodo_repetido(self):
+        """Una empresa con dos filas del mismo período es un error."""
+        with self.assertRaises(ValueError):
+            ordenar_panel(['a', 'a', 'b'], [1, 1, 1])
+
+    def test_no_cruza_empresas(self):
+        """El primer período de cada empresa no usa datos de la anterior."""
+        saldos = np.array([10.0, 20.0, 30.0, 100.0, 200.0, 7.0])
+        np.testing.assert_array_equal(promedio_consecutivo(saldos, self.inicio),
+                                      [10.0, 15.0, 25.0, 100.0, 150.0, 7.0])
+        np.testing.assert_array_equal(diferencia(saldos, self.inicio),
+                                      [np.nan, 10.0, 10.0, np.nan, 100.0, np.nan])
+        np.testing.assert_array_equal(media_movil(saldos, self.inicio, 2, min_periodos=1),
+                                      [10.0, 15.0, 25.0, 100.0, 150.0, 7.0])
+
+    def test_equivale_a_pandas(self):
+        """Medias móviles y variaciones coinciden con groupby de pandas."""
+        rng = np.random.default_rng(1)
+        empresas = np.repeat(np.arange(50), 12)
+        valores = rng.normal(size=len(empresas))
+        valores[rng.random(len(valores)) < 0.1] = np.nan
+        _, inicio = ordenar_panel(empresas, np.tile(np.arange(12), 50))
+        grupos = pd.Series(valores).groupby(empresas)
+
+        np.testing.assert_allclose(
+            media_movil(valores, inicio, 4, min_periodos=2),
+            grupos.rolling(4, min_periods=2).mean().to_numpy()
+        )
+        np.testing.assert_allclose(diferencia(valores, inicio, 3), grupos.diff(3).to_numpy())
+
+
+class TestAnalizarSeries(unittest.TestCase):
+    """Tests de analizar_series."""
+
+    def test_coincide_con_cada_periodo(self):
+        """Los ratios de cada período son los del motor con el inventario promedio."""
+        estados = panel_sintetico()
+        series = analizar_series(estados, ventana=3, periodos_por_anio=1)
+        orden, inicio = ordenar_panel(estados['id'], estados['periodo'])
+
+        columnas = {campo: valores[orden] for campo, valores in estados.items()}
+        columnas['inventario_promedio'] = promedio_consecutivo(columnas['inventarios'], inicio)
+        esperados = puntuar_lote(columnas)
+
+        np.testing.assert_array_equal(series['id'], columnas['id'])
+        np.testing.assert_array_equal(series['periodo'], columnas['periodo'])
+        for nombre, valores in esperados.items():
+            np.testing.assert_array_equal(series[nombre], valores)
+        np.testing.assert_allclose(series['roe_media_3'],
+                                   media_movil(series['roe'], inicio, 3), equal_nan=True)
+        np.testing.assert_allclose(series['z_score_delta_1'],
+                                   diferencia(series['z_score'], inicio), equal_nan=True)
+
+    def test_trimestral_igual_a_anual(self):
+        """Los mismos estados en trimestres dan los ratios y la zona de los anuales."""
+        anual = next(generar_cartera(40, tam_bloque=40, semilla=3))
+        anual.pop('inventario_promedio')
+        anual['id'] = np.arange(40)
+        anual['periodo'] = np.full(40, 2024)
+
+        trimestral = {campo: np.repeat(valores, 4) for campo, valores in anual.items()}
+        trimestral['periodo'] = np.tile(['2024Q1', '2024Q2', '2024Q3', '2024Q4'], 40)
+        for campo in CAMPOS_FLUJO:
+            if campo in trimestral:
+                trimestral[campo] = trimestral[campo] / 4
+
+        series_anual = analizar_series(anual, periodos_por_anio=1, decimales=None)
+        series_trimestral = analizar_series(trimestral, periodos_por_anio=4, decimales=None)
+
+        np.testing.assert_array_equal(series_trimestral['zona'],
+                                      np.repeat(series_anual['zona'], 4))
+        for nombre in puntuar_lote(anual):
+            if nombre != 'zona':
+                np.testing.assert_allclose(series_trimestral[nombre],
+                                           np.repeat(series_anual[nombre], 4), err_msg=nombre)
+
+    def test_periodos_por_anio_invalido(self):
+        """Con menos de un período por año no hay escala anual."""
+        with self.assertRaises(ValueError):
+            analizar_series(panel_sintetico(2, 2), periodos_por_anio=0)
+
+    def test_indicadores_elegidos(self):
+        """Solo se calculan medias y variaciones de los indicadores pedidos."""
+        series = analizar_series(panel_sintetico(5, 4), indicadores=['z_score'], rezago=4)
+        self.assertIn('z_score_media_4', series)
+        self.assertTrue(np.all(np.isnan(series['z_score_delta_4'])))
+        self.assertNotIn('roe_media_4', series)
+
+
+if __name__ == '__main__':
+    unittest.main()
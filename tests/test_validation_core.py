@@ -0,0 +1,132 @@
+"""
+Tests del núcleo de validación independiente de Streamlit.
+"""
+
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.validation_core import (
+    ErrorValidacion,
+    errores_columna,
+    parsear_columna,
+    parsear_numero,
+    validar_campos,
+    verificar_no_negativo,
+)
+
+
+class TestParsearNumero(unittest.TestCase):
+    """Tests del parser escalar."""
+
+    def test_separadores_de_miles(self):
+        """Comas y espacios se eliminan antes de convertir."""
+        self.assertEqual(parsear_numero("100,000", "ventas"), (100000.0, None))
+        self.assertEqual(parsear_numero("100 000", "ventas"), (100000.0, None))
+
+    def test_vacio_es_obligatorio(self):
+        """Valores vacíos devuelven un error 'obligatorio'."""
+        for valor in (None, "", "   ", ","):
+            numero, error = parsear_numero(valor, "ventas")
+            self.assertIsNone(numero)
+            self.assertEqual(error.codigo, 'obligatorio')
+            self.assertEqual(error.mensaje, "El campo 'ventas' es obligatorio.")
+
+    def test_no_numerico(self):
+        """Texto no numérico devuelve un error 'no_numerico'."""
+        numero, error = parsear_numero("abc", "ventas")
+        self.assertIsNone(numero)
+        self.assertEqual(error, ErrorValidacion(
+            'ventas', 'no_numerico', "El campo 'ventas' debe ser numérico."
+        ))
+
+    def test_no_negativo(self):
+        """Solo los valores menores que cero generan error."""
+        self.assertIsNone(verificar_no_negativo(0.0, "ventas"))
+        self.assertEqual(verificar_no_negativo(-1.0, "ventas").codigo, 'negativo')
+
+    def test_no_usa_streamlit(self):
+        """El núcleo de validación no importa Streamlit."""
+        import utils.validation_core
+        self.assertNotIn('streamlit', vars(utils.validation_core))
+
+
+class TestValidarCampos(unittest.TestCase):
+    """Tests de la validación de formularios completos."""
+
+    def test_acumula_todos_los_errores(self):
+        """Se reportan todos los errores, no solo el primero."""
+        datos, errores = validar_campos(
+            {'ventas': 'abc', 'patrimonio': '-5', 'ebit': '-5'},
+            {},
+            {'ventas', 'patrimonio'}
+        )
+        self.assertEqual(datos, {'ebit': -5.0})
+        self.assertEqual(
+            [(e.campo, e.codigo) for e in errores],
+            [('ventas', 'no_numerico'), ('patrimonio', 'negativo')]
+        )
+
+    def test_opcionales_vacios_se_omiten(self):
+        """Los opcionales vacíos no aparecen en los datos ni generan error."""
+        datos, errores = validar_campos(
+            {'ventas': '1,000'}, {'inventarios': '', 'costo_ventas': '600'}, set()
+        )
+        self.assertEqual(datos, {'ventas': 1000.0, 'costo_ventas': 600.0})
+        self.assertEqual(errores, [])
+
+
+class TestParsearColumna(unittest.TestCase):
+    """Tests del parser vectorizado de columnas."""
+
+    def test_equivale_al_parser_escalar(self):
+        """Cada celda se interpreta igual que con parsear_numero."""
+        valores = ["100,000", " 100 000 ", "-1,000.5", "1e3", ".5", "abc", "", None, "1.2.3",
+                   "nan", "inf", "-Infinity", "1_000", "1e999"]
+        columna = parsear_columna(valores)
+
+        for i, valor in enumerate(valores):
+            numero, error = parsear_numero(valor, 'x')
+            if error is None:
+                self.assertEqual(columna.valores[i], numero)
+            else:
+                self.assertTrue(np.isnan(columna.valores[i]))
+                self.assertEqual(bool(columna.vacios[i]), error.codigo == 'obligatorio')
+                self.assertEqual(bool(columna.invalidos[i]), error.codigo == 'no_numerico')
+
+    def test_decimal_coma(self):
+        """Con decimal=',' el punto separa miles, igual en ambos parsers."""
+        valores = ["1,5", "1.234,5", "1 234,5", "12,5,1"]
+        columna = parsear_columna(valores, decimal=',')
+        np.testing.assert_array_equal(columna.valores, [1.5, 1234.5, 1234.5, np.nan])
+        self.assertEqual(parsear_numero("1.234,5", 'x', decimal=','), (1234.5, None))
+        self.assertEqual(parsear_numero("12,5,1", 'x', decimal=',')[1].codigo, 'no_numerico')
+
+    def test_columna_numerica(self):
+        """Las columnas numéricas se convierten sin parsear texto."""
+        columna = parsear_columna(np.array([1, 2, 3]))
+        np.testing.assert_array_equal(columna.valores, [1.0, 2.0, 3.0])
+        self.assertFalse(columna.invalidos.any())
+
+    def test_columna_mixta(self):
+        """Columnas object con números y texto (como las de Excel)."""
+        columna = parsear_columna(pd.Series([1500, "2,500", None, "n/d"], dtype=object))
+        np.testing.assert_array_equal(columna.valores[:2], [1500.0, 2500.0])
+        np.testing.assert_array_equal(columna.vacios, [False, False, True, False])
+        np.testing.assert_array_equal(columna.invalidos, [False, False, False, True])
+
+    def test_errores_columna(self):
+        """Las máscaras se convierten en errores por fila."""
+        columna = parsear_columna(["10", "", "abc", "-3"])
+        errores = errores_columna(columna, 'ventas', no_negativo=True)
+        self.assertEqual(
+            [(fila, error.codigo) for fila, error in errores],
+            [(1, 'obligatorio'), (2, 'no_numerico'), (3, 'negativo')]
+        )
+        self.assertEqual(len(errores_columna(columna, 'ventas', max_errores=1)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+"""
+Tests del orden y filtrado de la tabla paginada de ui.view_portfolio.
+"""
+
+import unittest
+
+import numpy as np
+
+from ui.view_portfolio import filtrar_orden, orden_por_zscore
+
+
+class TestOrdenCartera(unittest.TestCase):
+    """Tests de orden_por_zscore y filtrar_orden."""
+
+    def test_nan_al_final_en_ambos_sentidos(self):
+        """Las empresas sin Z-Score quedan al final y los empates son estables."""
+        z = np.array([2.0, np.nan, 1.0, 3.0, 1.0])
+        self.assertEqual(orden_por_zscore(z).tolist(), [2, 4, 0, 3, 1])
+        self.assertEqual(orden_por_zscore(z, descendente=True).tolist(), [3, 0, 2, 4, 1])
+
+    def test_filtrar_orden(self):
+        """El filtro por zona conserva el orden recibido."""
+        zonas = np.array([3, 0, 1, 3, 1], dtype=np.int8)
+        orden = np.array([2, 4, 0, 3, 1])
+        self.assertEqual(filtrar_orden(orden, zonas, [1, 3]).tolist(), [2, 4, 0, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import streamlit as st
-import pandas as pd
-from utils.validation import validate_number, validate_positive
+from risk_engine.instrumentation import etapa
+from utils.validation_core import CAMPOS_NO_NEGATIVOS, validar_campos
 from utils.sample_data import get_ejemplo_empresa_saludable, get_ejemplo_empresa_riesgo
 
 
@@ -77,6 +77,30 @@ def financial_input_form():
                 value=str(datos_precargados.get('total_liabilities', '')),
                 help="Dejar vacío para usar pasivo_total")
 
+        st.markdown("### Tesorería y plazos (opcional)")
+
+        col7, col8 = st.columns(2)
+        with col7:
+            caja_bancos = st.text_input("Caja y bancos",
+                value=str(datos_precargados.get('caja_bancos', '')),
+                help="Necesario para el ratio de tesorería")
+            inversiones_cp = st.text_input("Inversiones de corto plazo",
+                value=str(datos_precargados.get('inversiones_cp', '')),
+                help="Dejar vacío para considerar cero")
+            cuentas_por_cobrar = st.text_input("Cuentas por cobrar",
+                value=str(datos_precargados.get('cuentas_por_cobrar', '')),
+                help="Necesario para el período medio de cobro")
+        with col8:
+            ventas_credito = st.text_input("Ventas a crédito",
+                value=str(datos_precargados.get('ventas_credito', '')),
+                help="Necesario para el período medio de cobro")
+            cuentas_por_pagar = st.text_input("Cuentas por pagar",
+                value=str(datos_precargados.get('cuentas_por_pagar', '')),
+                help="Necesario para el período medio de pago")
+            compras_credito = st.text_input("Compras a crédito",
+                value=str(datos_precargados.get('compras_credito', '')),
+                help="Necesario para el período medio de pago")
+
         submitted = st.form_submit_button("Calcular riesgo")
     
     # Limpiar datos de ejemplo después de enviar el formulario
@@ -108,46 +132,66 @@ def financial_input_form():
         "inventario_promedio": inventario_promedio,
         "costo_ventas": costo_ventas,
         "total_liabilities": total_liabilities,
+        "caja_bancos": caja_bancos,
+        "inversiones_cp": inversiones_cp,
+        "cuentas_por_cobrar": cuentas_por_cobrar,
+        "ventas_credito": ventas_credito,
+        "cuentas_por_pagar": cuentas_por_pagar,
+        "compras_credito": compras_credito,
     }
     
-    # Campos que NO pueden ser negativos (>=0)
-    campos_no_negativos = {
-        "activo_corriente", "pasivo_corriente", "pasivo_total", 
-        "patrimonio", "ventas", "total_assets", "market_value_equity",
-        "inventarios", "inventario_promedio", "costo_ventas", "total_liabilities"
-    }
-    
-    # Campos que SÍ pueden ser negativos
-    # (utilidad_neta, ebit, working_capital, retained_earnings)
-
-    data = {}
-
-    # Validar campos obligatorios
-    for name, value in campos_obligatorios.items():
-        value = validate_number(value, name)
-        if value is None:
-            return None
-        # Solo validar positividad si el campo está en campos_no_negativos
-        if name in campos_no_negativos:
-            value = validate_positive(value, name)
-            if value is None:
-                return None
-        data[name] = value
-    
-    # Validar campos opcionales (si están llenos)
-    for name, value in campos_opcionales.items():
-        if value and str(value).strip():  # Si el usuario ingresó algo
-            value = validate_number(value, name)
-            if value is None:
-                return None
-            # Solo validar positividad si el campo está en campos_no_negativos
-            if name in campos_no_negativos:
-                value = validate_positive(value, name)
-                if value is None:
-                    return None
-            data[name] = value
-        # Si está vacío, no agregarlo al diccionario (el backend usará aproximaciones)
+    # Validar todos los campos y mostrar todos los errores juntos
+    # (los opcionales vacíos se omiten: el backend usará aproximaciones).
+    # CAMPOS_NO_NEGATIVOS es la misma regla que aplica el servicio HTTP.
+    with etapa('validacion'):
+        data, errores = validar_campos(
+            campos_obligatorios, campos_opcionales, CAMPOS_NO_NEGATIVOS
+        )
+    if errores:
+        for error in errores:
+            st.error(error.mensaje)
+        return None
 
     st.success("Datos validados correctamente")
 
     return data
+
+
+def portfolio_upload_form():
+    """
+    Formulario para subir una cartera CSV/Excel con una empresa por fila.
+
+    Returns:
+        Diccionario con el archivo subido y el formato CSV (``sep`` y
+        ``decimal``) si se envió el formulario, o None
+    """
+    st.subheader("Carga de cartera")
+    st.markdown(
+        "Sube un archivo **CSV** o **Excel (.xlsx)** con una empresa por fila y "
+        "una columna por campo (`activo_corriente`, `pasivo_corriente`, `ventas`, ...). "
+        "Si incluye una columna `id`, se usará para identificar a cada empresa."
+    )
+
+    with st.form("portfolio_form"):
+        archivo = st.file_uploader("Archivo de cartera", type=["csv", "xlsx"])
+
+        col1, col2 = st.columns(2)
+        with col1:
+            formato = st.radio(
+                "Formato CSV",
+                ["Internacional (, y .)", "Excel en español (; y ,)"],
+                help="Separador de columnas y separador decimal (no aplica a Excel)"
+            )
+
+        submitted = st.form_submit_button("Puntuar cartera")
+
+    if not submitted:
+        return None
+
+    if archivo is None:
+        st.error("Selecciona un archivo de cartera.")
+        return None
+
+    if formato.startswith("Excel"):
+        return {'archivo': archivo, 'sep': ';', 'decimal': ','}
+    return {'archivo': archivo, 'sep': ',', 'decimal': '.'}
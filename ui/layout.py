@@ -5,6 +5,9 @@ Este módulo contiene funciones para configurar el diseño general de la aplicac
 estilos personalizados y componentes visuales reutilizables.
 """
 
+import functools
+import textwrap
+
 import streamlit as st
 from typing import Literal
 
@@ -31,24 +34,71 @@ def configurar_pagina() -> None:
     )
 
 
-def aplicar_estilos_personalizados() -> None:
-    dark_mode = st.session_state.get("dark_mode", True)
+# Colores por tema (modo oscuro / claro)
+_TEMAS = {
+    True: {
+        "bg_color": "#0e1117",
+        "text_color": "#fafafa",
+        "card_bg": "#1e293b",
+        "secondary_bg": "#262730",
+        "border_color": "#374151",
+    },
+    False: {
+        "bg_color": "#ffffff",
+        "text_color": "#1f2937",
+        "card_bg": "#f8fafc",
+        "secondary_bg": "#f1f5f9",
+        "border_color": "#e5e7eb",
+    },
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _markdown_estatico(texto: str) -> str:
+    """
+    Retorna un bloque de markdown constante sin su sangría.
 
-    if dark_mode:
-        bg_color = "#0e1117"
-        text_color = "#fafafa"
-        card_bg = "#1e293b"
-        secondary_bg = "#262730"
-        border_color = "#374151"
-    else:
-        bg_color = "#ffffff"
-        text_color = "#1f2937"
-        card_bg = "#f8fafc"
-        secondary_bg = "#f1f5f9"
-        border_color = "#e5e7eb"
+    Se calcula una vez por proceso; en los reruns siguientes st.markdown
+    recibe el texto ya limpio.
+    """
+    return textwrap.dedent(texto).strip()
 
-    st.markdown(
-        f"""
+
+def _compactar_html(html: str) -> str:
+    """
+    Compacta un bloque HTML en una sola línea.
+
+    Las líneas se unen con un espacio para no pegar palabras de un texto
+    partido en varias líneas. Reduce el tamaño del mensaje que se envía al
+    navegador en cada rerun.
+    """
+    return ' '.join(linea.strip() for linea in html.splitlines() if linea.strip())
+
+
+@functools.lru_cache(maxsize=None)
+def _html_estatico(html: str) -> str:
+    """
+    Compacta un bloque HTML constante (una vez por proceso).
+
+    Solo para literales fijos: el HTML construido con f-strings varía con sus
+    argumentos y se compacta con _compactar_html sin cachear.
+    """
+    return _compactar_html(html)
+
+
+@functools.lru_cache(maxsize=2)
+def _css_tema(dark_mode: bool) -> str:
+    """
+    Construye la hoja de estilos de un tema (una vez por proceso y tema).
+
+    Args:
+        dark_mode: Si se usan los colores del modo oscuro
+
+    Returns:
+        Bloque <style> compactado
+    """
+    return _compactar_html(
+        """
         <style>
         .stApp {{
             background-color: {bg_color};
@@ -83,25 +133,33 @@ def aplicar_estilos_personalizados() -> None:
             color: #64748b;
         }}
         </style>
-        """,
-        unsafe_allow_html=True
+        """.format(**_TEMAS[dark_mode])
     )
 
 
+def aplicar_estilos_personalizados() -> None:
+    dark_mode = st.session_state.get("dark_mode", True)
+
+    st.markdown(_css_tema(bool(dark_mode)), unsafe_allow_html=True)
+
+
 def mostrar_header(
     titulo: str = "Business Risk Scanner",
     subtitulo: str = "Análisis de Riesgo Financiero Empresarial"
 ) -> None:
     st.markdown(
-        f"""
-        <div class="custom-header">
-            <h1>📊 {titulo}</h1>
-            <p>{subtitulo}</p>
-        </div>
-        """,
+        _compactar_html(
+            f"""
+            <div class="custom-header">
+                <h1>📊 {titulo}</h1>
+                <p>{subtitulo}</p>
+            </div>
+            """
+        ),
         unsafe_allow_html=True
     )
 
+
 def mostrar_separador(altura: int = 20) -> None:
     """
     Muestra un espacio vertical separador.
@@ -127,30 +185,33 @@ def crear_card(
     }
 
     st.markdown(
-        f"""
-        <div class="{tipo}-card">
-            <h4>{iconos.get(tipo, "ℹ️")} {titulo}</h4>
-            <p>{contenido}</p>
-        </div>
-        """,
+        _compactar_html(
+            f"""
+            <div class="{tipo}-card">
+                <h4>{iconos.get(tipo, "ℹ️")} {titulo}</h4>
+                <p>{contenido}</p>
+            </div>
+            """
+        ),
         unsafe_allow_html=True
     )
 
 
 def crear_seccion(titulo: str, icono: str = "📌") -> None:
-    st.markdown(f"## {icono} {titulo}")
-    st.markdown("---")
+    st.markdown(f"## {icono} {titulo}\n\n---")
 
 
 def mostrar_footer() -> None:
     st.markdown(
-        """
-        <div class="custom-footer">
-            <p><strong>Business Risk Scanner</strong></p>
-            <p>Desarrollado por: Daniel, Igor, Mario, D'Alessandro y Bruno</p>
-            <p style="font-size: 0.85rem;">Última actualización: Diciembre 2025</p>
-        </div>
-        """,
+        _html_estatico(
+            """
+            <div class="custom-footer">
+                <p><strong>Business Risk Scanner</strong></p>
+                <p>Desarrollado por: Daniel, Igor, Mario, D'Alessandro y Bruno</p>
+                <p style="font-size: 0.85rem;">Última actualización: Diciembre 2025</p>
+            </div>
+            """
+        ),
         unsafe_allow_html=True
     )
 
@@ -160,7 +221,8 @@ def mostrar_sidebar_navegacion() -> str:
         st.markdown("## 📊 BRS")
         opcion = st.radio(
             "Navegación",
-            ["🏠 Inicio", "📝 Análisis de Empresa", "📚 Ayuda", "ℹ️ Acerca de"],
+            ["🏠 Inicio", "📝 Análisis de Empresa", "📂 Análisis de Cartera", "📚 Ayuda",
+             "ℹ️ Acerca de"],
             label_visibility="collapsed"
         )
         return opcion
@@ -173,7 +235,7 @@ def mostrar_pagina_inicio() -> None:
 
     with col1:
         st.markdown(
-            """
+            _markdown_estatico("""
             ### 🎯 ¿Qué es Business Risk Scanner?
             Herramienta profesional para analizar el **riesgo financiero empresarial** 
             mediante ratios financieros y el **Z-Score de Altman**.
@@ -183,7 +245,7 @@ def mostrar_pagina_inicio() -> None:
             2. Usa los botones de **datos de ejemplo** o ingresa tus propios datos
             3. Obtén ratios financieros y Z-Score automáticamente
             4. Visualiza gráficos interactivos y exporta resultados
-            """
+            """)
         )
 
     with col2:
@@ -199,9 +261,7 @@ def mostrar_pagina_inicio() -> None:
             "success"
         )
 
-    st.markdown("---")
-    
-    st.markdown("### 📊 Indicadores Analizados")
+    st.markdown("---\n\n### 📊 Indicadores Analizados")
 
     indicadores = [
         {"icono": "💧", "nombre": "Liquidez", "desc": "Capacidad de pago"},
@@ -214,25 +274,27 @@ def mostrar_pagina_inicio() -> None:
     for col, ind in zip(cols, indicadores):
         with col:
             st.markdown(
-                f"""
-                <div class="info-card" style="text-align:center">
-                    <h3>{ind['icono']} {ind['nombre']}</h3>
-                    <p>{ind['desc']}</p>
-                </div>
-                """,
+                _compactar_html(
+                    f"""
+                    <div class="info-card" style="text-align:center">
+                        <h3>{ind['icono']} {ind['nombre']}</h3>
+                        <p>{ind['desc']}</p>
+                    </div>
+                    """
+                ),
                 unsafe_allow_html=True
             )
     
-    st.markdown("---")
-    
     # Sección de comparación de ejemplos
-    st.markdown("### 📈 Ejemplos de Análisis")
-    st.markdown("Ve cómo el sistema evalúa diferentes empresas:")
+    st.markdown(
+        "---\n\n### 📈 Ejemplos de Análisis\n\n"
+        "Ve cómo el sistema evalúa diferentes empresas:"
+    )
     
     col_ej1, col_ej2 = st.columns(2)
     
     with col_ej1:
-        st.markdown("""
+        st.markdown(_html_estatico("""
         <div style="background: linear-gradient(135deg, #10b981 0%, #059669 100%); 
                     padding: 1.5rem; border-radius: 10px; color: white;">
             <h4>✅ Empresa Saludable</h4>
@@ -243,10 +305,10 @@ def mostrar_pagina_inicio() -> None:
                 <li>Z-Score: <strong>~3.5</strong> (Zona segura)</li>
             </ul>
         </div>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
     
     with col_ej2:
-        st.markdown("""
+        st.markdown(_html_estatico("""
         <div style="background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%); 
                     padding: 1.5rem; border-radius: 10px; color: white;">
             <h4>⚠️ Empresa en Riesgo</h4>
@@ -257,7 +319,7 @@ def mostrar_pagina_inicio() -> None:
                 <li>Z-Score: <strong>~1.2</strong> (Alto riesgo)</li>
             </ul>
         </div>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
 
 
 def mostrar_pagina_ayuda() -> None:
@@ -266,7 +328,7 @@ def mostrar_pagina_ayuda() -> None:
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Ratios Financieros", "📈 Z-Score de Altman", "💡 Cómo Usar", "❓ Preguntas Frecuentes"])
 
     with tab1:
-        st.markdown("""
+        st.markdown(_markdown_estatico("""
         ### 📊 Ratios Financieros - Guía Completa
         
         #### 🔵 **Ratios de Liquidez**
@@ -380,10 +442,10 @@ def mostrar_pagina_ayuda() -> None:
           - 0-30 días: Muy bueno
           - 30-60 días: Aceptable
           - > 60 días: Requiere atención
-        """)
+        """))
 
     with tab2:
-        st.markdown("""
+        st.markdown(_markdown_estatico("""
         ### 📈 Z-Score de Altman - Predicción de Quiebra
         
         #### 📖 **Historia y Contexto**
@@ -460,10 +522,10 @@ def mostrar_pagina_ayuda() -> None:
         - Alto endeudamiento
         - Baja generación de ventas
         → **Resultado:** Alta probabilidad de quiebra
-        """)
+        """))
 
     with tab3:
-        st.markdown("""
+        st.markdown(_markdown_estatico("""
         ### 💡 Cómo Usar Business Risk Scanner
         
         #### 🚀 **Paso a Paso**
@@ -556,10 +618,10 @@ def mostrar_pagina_ayuda() -> None:
         - **Pasivo Total (Z-Score):** Igual a Pasivo Total del balance
         
         *Nota: Para mayor precisión, ingresa los valores reales*
-        """)
+        """))
 
     with tab4:
-        st.markdown("""
+        st.markdown(_markdown_estatico("""
         ### ❓ Preguntas Frecuentes (FAQ)
         
         #### 🔷 **General**
@@ -671,7 +733,7 @@ def mostrar_pagina_ayuda() -> None:
         **¿Hay documentación técnica?**
         - Sí, revisa el README.md del repositorio
         - Documentación de API en el código fuente
-        """)
+        """))
 
 
 def mostrar_pagina_acerca_de() -> None:
@@ -680,7 +742,7 @@ def mostrar_pagina_acerca_de() -> None:
     col1, col2 = st.columns([2, 1])
 
     with col1:
-        st.markdown("""
+        st.markdown(_markdown_estatico("""
         ## 🎯 Business Risk Scanner
         
         ### 📌 **¿Qué es?**
@@ -868,10 +930,10 @@ def mostrar_pagina_acerca_de() -> None:
         - 📚 Proyecto académico de análisis financiero
         - 💼 Iniciativa de democratización de herramientas empresariales
         - 🌍 Contribución al software libre en español
-        """)
+        """))
 
     with col2:
-        st.info("""
+        st.info(_markdown_estatico("""
         ### 📊 Estadísticas
         
         **Métricas del Proyecto:**
@@ -905,14 +967,14 @@ def mostrar_pagina_acerca_de() -> None:
         - 📊 Plotly 6.3
         - 🔢 NumPy 2.3
         - 📑 Pandas 2.3
-        """)
+        """))
 
-        st.success("""
+        st.success(_markdown_estatico("""
         ### ✅ Calidad Garantizada
         
         - Fórmulas validadas
         - Testing automatizado
         - Código documentado
         - Actualizaciones regulares
-        """)
+        """))
 
@@ -0,0 +1,224 @@
+"""
+Módulo de visualización de carteras puntuadas.
+
+Muestra el avance de una ``TareaCartera`` y sus resultados en una tabla
+paginada: solo se envía al navegador la página visible, de modo que una
+cartera de cientos de miles de filas no se renderiza completa en cada rerun.
+"""
+
+import io
+import time
+from typing import TYPE_CHECKING, Optional, Sequence
+
+import streamlit as st
+
+from risk_engine.background import FALLIDA, TERMINADA, TareaCartera
+from risk_engine.classification import ETIQUETAS_RIESGO
+from risk_engine.instrumentation import etapa
+from risk_engine.peers import IndicePares
+from risk_engine.portfolio import EscritorCSV
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+TAMANOS_PAGINA = (25, 50, 100, 250)
+
+# Intervalo de actualización de la barra de progreso (segundos)
+INTERVALO_PROGRESO = 0.2
+
+
+def orden_por_zscore(z: 'np.ndarray', descendente: bool = False) -> 'np.ndarray':
+    """
+    Retorna las posiciones que ordenan las empresas por Z-Score.
+
+    Las empresas sin Z-Score (NaN) quedan al final en ambos sentidos y los
+    empates conservan el orden del archivo.
+
+    Args:
+        z: Arreglo de Z-Scores
+        descendente: Ordenar de mayor a menor
+
+    Returns:
+        Arreglo de posiciones
+    """
+    import numpy as np
+
+    return np.argsort(-z if descendente else z, kind='stable')
+
+
+def filtrar_orden(orden: 'np.ndarray', zonas: 'np.ndarray',
+                  zonas_visibles: Sequence[int]) -> 'np.ndarray':
+    """
+    Conserva del orden solo las empresas de las zonas indicadas.
+
+    Args:
+        orden: Posiciones ordenadas (``orden_por_zscore``)
+        zonas: Código de zona de cada empresa
+        zonas_visibles: Códigos de zona a conservar
+
+    Returns:
+        Subconjunto de ``orden`` en el mismo orden
+    """
+    import numpy as np
+
+    return orden[np.isin(zonas[orden], zonas_visibles)]
+
+
+def _orden_cacheado(tarea: TareaCartera, descendente: bool) -> 'np.ndarray':
+    """Orden por Z-Score de la cartera, calculado una vez por sentido."""
+    cacheado = st.session_state.get('cartera_orden')
+    if cacheado is None or cacheado[0] is not tarea or cacheado[1] != descendente:
+        orden = orden_por_zscore(tarea.resultados['z_score'].to_numpy(), descendente)
+        cacheado = st.session_state['cartera_orden'] = (tarea, descendente, orden)
+    return cacheado[2]
+
+
+def indice_pares_cartera(tarea: Optional[TareaCartera]) -> Optional[IndicePares]:
+    """
+    Índice de percentiles de la cartera puntuada en la sesión.
+
+    Se construye una vez por cartera y se guarda en la sesión.
+
+    Args:
+        tarea: Tarea de la sesión, o None
+
+    Returns:
+        IndicePares, o None si no hay una cartera puntuada
+    """
+    if tarea is None or tarea.estado != TERMINADA:
+        return None
+    cacheado = st.session_state.get('cartera_pares')
+    if cacheado is None or cacheado[0] is not tarea:
+        with etapa('pares.indice'):
+            indice = IndicePares.desde_tabla(tarea.resultados, col_sector=tarea.col_sector)
+        cacheado = st.session_state['cartera_pares'] = (tarea, indice)
+    return cacheado[1]
+
+
+def _csv_resultados(resultados: 'pd.DataFrame') -> bytes:
+    """CSV con formato para Excel en español (; y , con BOM)."""
+    flujo = io.BytesIO()
+    with EscritorCSV(flujo, sep=';', decimal=',', bom=True) as escritor:
+        escritor.escribir(resultados)
+    return flujo.getvalue()
+
+
+def esperar_tarea(tarea: TareaCartera) -> None:
+    """
+    Muestra una barra de progreso mientras la tarea se ejecuta.
+
+    Args:
+        tarea: Tarea iniciada
+    """
+    barra = st.progress(0.0, text="Puntuando cartera...")
+    while tarea.is_alive():
+        barra.progress(tarea.fraccion, text=f"Puntuando cartera... {tarea.filas:,} filas")
+        time.sleep(INTERVALO_PROGRESO)
+    barra.empty()
+
+
+def mostrar_resumen_cartera(zonas: 'np.ndarray') -> None:
+    """
+    Muestra el número de empresas por zona de riesgo.
+
+    Args:
+        zonas: Código de zona de cada empresa
+    """
+    import numpy as np
+
+    conteos = np.bincount(zonas, minlength=len(ETIQUETAS_RIESGO))
+    columnas = st.columns(len(ETIQUETAS_RIESGO))
+    for columna, etiqueta, conteo in zip(columnas, ETIQUETAS_RIESGO, conteos.tolist()):
+        columna.metric(etiqueta, f"{conteo:,}")
+
+
+def mostrar_tabla_paginada(tarea: TareaCartera) -> None:
+    """
+    Muestra los resultados ordenados por Z-Score, una página a la vez.
+
+    Args:
+        tarea: Tarea terminada
+    """
+    resultados = tarea.resultados
+    zonas = resultados['zona'].to_numpy()
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        visibles = st.multiselect(
+            "Zonas de riesgo",
+            options=list(range(len(ETIQUETAS_RIESGO))),
+            default=list(range(len(ETIQUETAS_RIESGO))),
+            format_func=lambda zona: ETIQUETAS_RIESGO[zona]
+        )
+    with col2:
+        sentido = st.selectbox("Ordenar por Z-Score", ["Menor a mayor", "Mayor a menor"])
+    with col3:
+        tam_pagina = st.selectbox("Filas por página", TAMANOS_PAGINA)
+
+    orden = _orden_cacheado(tarea, sentido == "Mayor a menor")
+    if len(visibles) < len(ETIQUETAS_RIESGO):
+        orden = filtrar_orden(orden, zonas, visibles)
+
+    n_paginas = max(-(-len(orden) // tam_pagina), 1)
+    pagina = st.number_input(f"Página (de {n_paginas:,})", min_value=1,
+                             max_value=n_paginas, value=1, step=1)
+    inicio = (pagina - 1) * tam_pagina
+
+    st.dataframe(
+        resultados.iloc[orden[inicio:inicio + tam_pagina]],
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption(
+        f"Empresas {min(inicio + 1, len(orden)):,}–{min(inicio + tam_pagina, len(orden)):,} "
+        f"de {len(orden):,}"
+    )
+
+
+def mostrar_resultados_cartera(tarea: Optional[TareaCartera]) -> None:
+    """
+    Función principal de la vista de cartera: progreso, resumen, tabla y
+    descarga.
+
+    Args:
+        tarea: Tarea de la sesión, o None si aún no se subió una cartera
+    """
+    if tarea is None:
+        return
+
+    if tarea.is_alive():
+        esperar_tarea(tarea)
+
+    if tarea.estado == FALLIDA:
+        st.error(f"❌ Error al puntuar la cartera: {tarea.error}")
+        return
+    if tarea.estado != TERMINADA:
+        return
+
+    st.success(f"✅ Cartera puntuada: {len(tarea.resultados):,} empresas.")
+
+    with etapa('vista.cartera'):
+        st.header("📊 Empresas por Zona de Riesgo")
+        mostrar_resumen_cartera(tarea.resultados['zona'].to_numpy())
+
+        st.header("📋 Resultados por Empresa")
+        mostrar_tabla_paginada(tarea)
+
+    st.header("📥 Exportar Resultados")
+    # El CSV se genera solo si se pide, una vez por cartera
+    csv = st.session_state.get('cartera_csv')
+    if csv is None or csv[0] is not tarea:
+        if st.button("Preparar CSV"):
+            with st.spinner("Generando CSV..."), etapa('exportacion'):
+                csv = st.session_state['cartera_csv'] = (
+                    tarea, _csv_resultados(tarea.resultados)
+                )
+    if csv is not None and csv[0] is tarea:
+        st.download_button(
+            label="📄 Descargar CSV",
+            data=csv[1],
+            file_name="analisis_cartera.csv",
+            mime="text/csv"
+        )
+    st.info("💡 El archivo CSV está optimizado para abrirse correctamente en Excel.")
@@ -5,67 +5,128 @@ Este módulo contiene funciones para mostrar los resultados del análisis financ
 incluyendo ratios, Z-Score, clasificación de riesgo y gráficos interactivos.
 """
 
+import functools
+
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
+
+from risk_engine.cache import CacheResultados
+from risk_engine.instrumentation import contar, etapa
+from risk_engine.registry import CATEGORIAS, RATIOS, RATIOS_POR_NOMBRE
+
+# pandas y plotly se importan dentro de las funciones que los usan, para que
+# las páginas que no muestran resultados no paguen su costo de importación.
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    from risk_engine.peers import IndicePares
+
+
+# Caché de figuras compartida entre reruns y sesiones del proceso. Las
+# fábricas de figuras son puras, por lo que la clave son sus argumentos. Se
+# guarda el JSON de cada figura (una cadena inmutable, medida por su largo)
+# y no el objeto go.Figure, que quien lo recibe podría modificar.
+_cache_figuras = CacheResultados(max_bytes=16 * 1024 * 1024, max_entradas=512, copiar=None)
+
+
+def _figura_cacheada(fabrica):
+    """
+    Decorador que memoiza una fábrica de figuras Plotly por sus argumentos.
+
+    En un acierto la figura se reconstruye desde el JSON guardado, sin volver
+    a ejecutar la fábrica; cada llamada recibe una figura propia. Los
+    argumentos deben ser hashables (tuplas, números, cadenas, booleanos).
+    """
+    @functools.wraps(fabrica)
+    def envoltura(*args):
+        import plotly.io as pio
+
+        clave = (fabrica.__name__,) + args
+        texto = _cache_figuras.obtener(clave)
+        if texto is None:
+            with etapa(f'figuras.{fabrica.__name__}'):
+                figura = fabrica(*args)
+            contar('figuras.construidas')
+            texto = pio.to_json(figura, validate=False)
+            _cache_figuras.guardar(clave, texto, tamano=len(texto))
+            return figura
+        contar('figuras.reutilizadas')
+        return pio.from_json(texto)
+    return envoltura
+
+
+# Mapeo de nombres técnicos a nombres descriptivos (del registro de ratios)
+NOMBRES_RATIOS = {ratio.nombre: ratio.etiqueta for ratio in RATIOS}
+
+ICONOS_CATEGORIA = {
+    "Liquidez": "💧",
+    "Solvencia": "🏦",
+    "Rentabilidad": "💰",
+    "Eficiencia": "⚙️",
+}
+
+
+def estadisticas_cache_figuras() -> Dict[str, float]:
+    """
+    Retorna los contadores de la caché de figuras.
+    """
+    return _cache_figuras.estadisticas()
+
+
+def formatear_ratio(nombre: str, valor: Optional[float]) -> str:
+    """
+    Da formato a un ratio según el formato declarado en el registro.
+    
+    Args:
+        nombre: Nombre técnico del ratio
+        valor: Valor calculado o None
+        
+    Returns:
+        Texto con el valor (porcentaje, días o decimal) o "N/A"
+    """
+    if valor is None:
+        return "N/A"
+    formato = RATIOS_POR_NOMBRE[nombre].formato if nombre in RATIOS_POR_NOMBRE else 'decimal'
+    if formato == 'porcentaje':
+        return f"{valor * 100:.2f}%"
+    if formato == 'dias':
+        return f"{valor:.1f} días"
+    return f"{valor:.2f}"
 
 
 def mostrar_seccion_ratios(ratios: Dict[str, Optional[float]]) -> None:
     """
     Muestra los ratios financieros en una tabla organizada por categorías.
     
+    Solo se listan los ratios presentes en el diccionario (los de tesorería
+    y plazos requieren sus datos complementarios).
+    
     Args:
         ratios: Diccionario con los ratios calculados
     """
+    import pandas as pd
+
     st.header("📊 Ratios Financieros Calculados")
     
-    # Organizar ratios por categoría
-    categorias = {
-        "💧 Liquidez": {
-            "Liquidez Corriente": ratios.get("liquidez"),
-            "Prueba Ácida": ratios.get("prueba_acida"),
-        },
-        "🏦 Solvencia": {
-            "Endeudamiento": ratios.get("endeudamiento"),
-            "Apalancamiento": ratios.get("apalancamiento"),
-        },
-        "💰 Rentabilidad": {
-            "ROA (Rentabilidad sobre Activos)": ratios.get("roa"),
-            "ROE (Rentabilidad sobre Patrimonio)": ratios.get("roe"),
-            "Margen de Utilidad": ratios.get("margen_neto"),
-        },
-        "⚙️ Eficiencia": {
-            "Rotación de Activos": ratios.get("rotacion_activos"),
-            "Rotación de Inventarios": ratios.get("rotacion_inventarios"),
-        }
-    }
-    
     # Crear columnas para mejor distribución
     cols = st.columns(2)
     
-    for idx, (categoria, items) in enumerate(categorias.items()):
+    for idx, categoria in enumerate(CATEGORIAS):
         with cols[idx % 2]:
-            st.subheader(categoria)
+            st.subheader(f"{ICONOS_CATEGORIA[categoria]} {categoria}")
             
             # Crear DataFrame para cada categoría
             data = []
-            for nombre, valor in items.items():
-                if valor is not None:
-                    # Formatear según el tipo de ratio
-                    if "Margen" in nombre or "ROA" in nombre or "ROE" in nombre:
-                        valor_str = f"{valor * 100:.2f}%"
-                    elif "Endeudamiento" in nombre:
-                        valor_str = f"{valor * 100:.2f}%"
-                    else:
-                        valor_str = f"{valor:.2f}"
-                    
-                    # Determinar color según valor
-                    color = interpretar_ratio(nombre, valor)
-                    data.append({"Indicador": nombre, "Valor": valor_str, "Estado": color})
-                else:
-                    data.append({"Indicador": nombre, "Valor": "N/A", "Estado": "⚪"})
+            for ratio in RATIOS:
+                if ratio.categoria != categoria or ratio.nombre not in ratios:
+                    continue
+                valor = ratios[ratio.nombre]
+                data.append({
+                    "Indicador": ratio.etiqueta,
+                    "Valor": formatear_ratio(ratio.nombre, valor),
+                    "Estado": interpretar_ratio(ratio.nombre, valor) if valor is not None else "⚪"
+                })
             
             if data:
                 df = pd.DataFrame(data)
@@ -74,79 +135,88 @@ def mostrar_seccion_ratios(ratios: Dict[str, Optional[float]]) -> None:
 
 def interpretar_ratio(nombre: str, valor: float) -> str:
     """
-    Interpreta el valor de un ratio y devuelve un indicador visual.
+    Interpreta el valor de un ratio según los umbrales del registro.
     
     Args:
-        nombre: Nombre del ratio
+        nombre: Nombre técnico del ratio (ej: 'liquidez')
         valor: Valor calculado del ratio
         
     Returns:
-        Emoji indicador: 🟢 (bueno), 🟡 (aceptable), 🔴 (malo)
+        Emoji indicador: 🟢 (bueno), 🟡 (aceptable), 🔴 (malo), ⚪ (sin umbrales)
     """
-    # Liquidez Corriente
-    if "Liquidez Corriente" in nombre:
-        if valor >= 2.0:
-            return "🟢"
-        elif valor >= 1.0:
-            return "🟡"
-        else:
-            return "🔴"
-    
-    # Prueba Ácida
-    if "Prueba Ácida" in nombre:
-        if valor >= 1.0:
-            return "🟢"
-        elif valor >= 0.7:
-            return "🟡"
-        else:
-            return "🔴"
-    
-    # Endeudamiento
-    if "Endeudamiento" in nombre:
-        if valor <= 0.5:
-            return "🟢"
-        elif valor <= 0.7:
-            return "🟡"
-        else:
-            return "🔴"
+    ratio = RATIOS_POR_NOMBRE.get(nombre)
+    if ratio is None or ratio.umbrales is None:
+        return "⚪"
     
-    # Apalancamiento
-    if "Apalancamiento" in nombre:
-        if valor <= 2.0:
+    bueno, aceptable = ratio.umbrales
+    if ratio.menor_es_mejor:
+        if valor <= bueno:
             return "🟢"
-        elif valor <= 3.0:
+        elif valor <= aceptable:
             return "🟡"
-        else:
-            return "🔴"
+        return "🔴"
     
-    # Rentabilidad (ROA, ROE, Margen)
-    if "ROA" in nombre or "ROE" in nombre or "Margen" in nombre:
-        if valor >= 0.1:  # 10%
-            return "🟢"
-        elif valor >= 0.05:  # 5%
-            return "🟡"
-        else:
-            return "🔴"
-    
-    # Rotación de Activos
-    if "Rotación de Activos" in nombre:
-        if valor >= 1.0:
-            return "🟢"
-        elif valor >= 0.5:
-            return "🟡"
-        else:
-            return "🔴"
-    
-    # Rotación de Inventarios
-    if "Rotación de Inventarios" in nombre:
-        if valor >= 6.0:
-            return "🟢"
-        elif valor >= 3.0:
-            return "🟡"
-        else:
-            return "🔴"
+    if valor >= bueno:
+        return "🟢"
+    elif valor >= aceptable:
+        return "🟡"
+    return "🔴"
+
+
+def mostrar_percentiles_pares(ratios: Dict[str, Optional[float]],
+                              z_score: Optional[float],
+                              pares: 'IndicePares') -> None:
+    """
+    Muestra el percentil de cada indicador de la empresa entre las empresas
+    de la cartera puntuada (o de un sector de ella).
     
-    return "⚪"
+    Args:
+        ratios: Diccionario con los ratios calculados
+        z_score: Valor del Z-Score de Altman
+        pares: Índice de percentiles de la cartera
+    """
+    import pandas as pd
+
+    st.header("📍 Posición frente a la Cartera")
+
+    sector = None
+    if pares.sectores:
+        opcion = st.selectbox("Comparar con", ["Toda la cartera"] + pares.sectores)
+        if opcion != "Toda la cartera":
+            sector = opcion
+
+    nombres = {**NOMBRES_RATIOS, "z_score": "Z-Score de Altman"}
+    percentiles = pares.percentiles_empresa({**ratios, "z_score": z_score}, sector)
+
+    data = []
+    for nombre, percentil in percentiles.items():
+        if percentil is None:
+            continue
+        data.append({
+            "Indicador": nombres.get(nombre, nombre.replace("_", " ").title()),
+            "Posición": f"Percentil {percentil:.0f} de {pares.n_pares(nombre, sector):,} pares",
+            "Percentil": percentil,
+        })
+
+    if not data:
+        st.info("No hay empresas en la cartera con qué comparar estos indicadores.")
+        return
+
+    st.dataframe(
+        pd.DataFrame(data),
+        column_config={
+            "Percentil": st.column_config.ProgressColumn(
+                "Percentil", format="%.0f", min_value=0, max_value=100
+            )
+        },
+        use_container_width=True,
+        hide_index=True
+    )
+    st.caption(
+        "El percentil es el porcentaje de empresas de la cartera con un valor menor "
+        "(percentil 83: el indicador supera al 83% de sus pares). En endeudamiento y "
+        "apalancamiento, un percentil alto indica más deuda que los pares."
+    )
 
 
 def mostrar_zscore(z_score: Optional[float], clasificacion: str) -> None:
@@ -210,6 +280,22 @@ def crear_gauge_zscore(z_score: float) -> None:
     Args:
         z_score: Valor del Z-Score
     """
+    st.plotly_chart(figura_gauge_zscore(z_score), use_container_width=True)
+
+
+@_figura_cacheada
+def figura_gauge_zscore(z_score: float) -> 'go.Figure':
+    """
+    Construye la figura gauge del Z-Score (fábrica pura y cacheada).
+    
+    Args:
+        z_score: Valor del Z-Score
+        
+    Returns:
+        Figura Plotly del medidor
+    """
+    import plotly.graph_objects as go
+    
     # Determinar el color según la zona
     if z_score < 1.81:
         color = "red"
@@ -244,7 +330,7 @@ def crear_gauge_zscore(z_score: float) -> None:
     ))
     
     fig.update_layout(height=300, margin=dict(l=20, r=20, t=50, b=20))
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 def crear_grafico_barras_ratios(ratios: Dict[str, Optional[float]]) -> None:
@@ -315,9 +401,39 @@ def crear_barras_categoria(data: Dict[str, Optional[float]], titulo: str,
         st.info("No hay datos disponibles para esta categoría.")
         return
     
-    # Preparar datos
-    nombres = list(data_validos.keys())
-    valores = list(data_validos.values())
+    st.plotly_chart(
+        figura_barras_categoria(
+            tuple(data_validos.keys()),
+            tuple(data_validos.values()),
+            titulo,
+            referencia,
+            multiplicar_100
+        ),
+        use_container_width=True
+    )
+
+
+@_figura_cacheada
+def figura_barras_categoria(nombres: tuple, valores: tuple, titulo: str,
+                            referencia: Optional[float] = None,
+                            multiplicar_100: bool = False) -> 'go.Figure':
+    """
+    Construye el gráfico de barras de una categoría (fábrica pura y cacheada).
+    
+    Args:
+        nombres: Nombres de los ratios
+        valores: Valores de los ratios (sin nulos)
+        titulo: Título del gráfico
+        referencia: Línea de referencia opcional
+        multiplicar_100: Si se debe multiplicar valores por 100 (para porcentajes)
+        
+    Returns:
+        Figura Plotly de barras
+    """
+    import plotly.graph_objects as go
+    
+    nombres = list(nombres)
+    valores = list(valores)
     
     if multiplicar_100:
         valores = [v * 100 for v in valores]
@@ -346,7 +462,7 @@ def crear_barras_categoria(data: Dict[str, Optional[float]], titulo: str,
         showlegend=False
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 def crear_radar_chart(ratios: Dict[str, Optional[float]]) -> None:
@@ -393,6 +509,35 @@ def crear_radar_chart(ratios: Dict[str, Optional[float]]) -> None:
         else:
             valores_norm.append(min(val, 10))
     
+    # Verificar si hay modo oscuro activo
+    dark_mode = st.session_state.get("dark_mode", True)
+    
+    st.plotly_chart(
+        figura_radar(tuple(categorias), tuple(valores_norm), dark_mode),
+        use_container_width=True
+    )
+    
+    st.info("💡 **Nota:** Los valores están normalizados en una escala de 0 a 10 para facilitar la comparación visual.")
+
+
+@_figura_cacheada
+def figura_radar(categorias: tuple, valores_norm: tuple, dark_mode: bool) -> 'go.Figure':
+    """
+    Construye el gráfico de radar (fábrica pura y cacheada).
+    
+    Args:
+        categorias: Nombres de los indicadores
+        valores_norm: Valores normalizados en escala 0-10
+        dark_mode: Si se usan los colores del modo oscuro
+        
+    Returns:
+        Figura Plotly de radar
+    """
+    import plotly.graph_objects as go
+    
+    categorias = list(categorias)
+    valores_norm = list(valores_norm)
+    
     # Crear gráfico de radar
     fig = go.Figure()
     
@@ -405,9 +550,6 @@ def crear_radar_chart(ratios: Dict[str, Optional[float]]) -> None:
         line=dict(color='rgb(31, 119, 180)', width=3)  # Línea azul sólida
     ))
     
-    # Verificar si hay modo oscuro activo
-    dark_mode = st.session_state.get("dark_mode", True)
-    
     fig.update_layout(
         polar=dict(
             radialaxis=dict(
@@ -439,9 +581,7 @@ def crear_radar_chart(ratios: Dict[str, Optional[float]]) -> None:
         )
     )
     
-    st.plotly_chart(fig, use_container_width=True)
-    
-    st.info("💡 **Nota:** Los valores están normalizados en una escala de 0 a 10 para facilitar la comparación visual.")
+    return fig
 
 
 def mostrar_resumen_ejecutivo(ratios: Dict[str, Optional[float]], 
@@ -570,7 +710,8 @@ def generar_conclusion(ratios: Dict[str, Optional[float]],
 
 def mostrar_resultados_completos(ratios: Dict[str, Optional[float]], 
                                 z_score: Optional[float], 
-                                clasificacion: str) -> None:
+                                clasificacion: str,
+                                pares: Optional['IndicePares'] = None) -> None:
     """
     Función principal que orquesta la visualización completa de resultados.
     
@@ -578,33 +719,47 @@ def mostrar_resultados_completos(ratios: Dict[str, Optional[float]],
         ratios: Diccionario con todos los ratios calculados
         z_score: Valor del Z-Score de Altman
         clasificacion: Clasificación de riesgo asociada al Z-Score
+        pares: Índice de percentiles de una cartera puntuada, para comparar
+            la empresa con sus pares (opcional)
     """
     # Título principal con estilo
     st.title("🏢 Análisis de Riesgo Financiero - Resultados")
     st.markdown("---")
     
     # Resumen ejecutivo al inicio
-    mostrar_resumen_ejecutivo(ratios, z_score, clasificacion)
+    with etapa('vista.resumen'):
+        mostrar_resumen_ejecutivo(ratios, z_score, clasificacion)
     
     st.markdown("---")
     
     # Z-Score y clasificación de riesgo
-    mostrar_zscore(z_score, clasificacion)
+    with etapa('vista.zscore'):
+        mostrar_zscore(z_score, clasificacion)
     
     st.markdown("---")
     
     # Ratios detallados
-    mostrar_seccion_ratios(ratios)
+    with etapa('vista.ratios'):
+        mostrar_seccion_ratios(ratios)
     
     st.markdown("---")
     
+    # Percentiles frente a la cartera puntuada en la sesión
+    if pares is not None:
+        with etapa('vista.pares'):
+            mostrar_percentiles_pares(ratios, z_score, pares)
+        
+        st.markdown("---")
+    
     # Gráficos de barras por categorías
-    crear_grafico_barras_ratios(ratios)
+    with etapa('vista.barras'):
+        crear_grafico_barras_ratios(ratios)
     
     st.markdown("---")
     
     # Radar chart
-    crear_radar_chart(ratios)
+    with etapa('vista.radar'):
+        crear_radar_chart(ratios)
     
     st.markdown("---")
     
@@ -613,7 +768,7 @@ def mostrar_resultados_completos(ratios: Dict[str, Optional[float]],
     
     col1, col2 = st.columns(2)
     
-    with col1:
+    with col1, etapa('exportacion'):
         # Preparar datos para CSV
         datos_export = preparar_datos_exportacion(ratios, z_score, clasificacion)
         
@@ -639,7 +794,7 @@ def mostrar_resultados_completos(ratios: Dict[str, Optional[float]],
 
 def preparar_datos_exportacion(ratios: Dict[str, Optional[float]], 
                                z_score: Optional[float], 
-                               clasificacion: str) -> pd.DataFrame:
+                               clasificacion: str) -> 'pd.DataFrame':
     """
     Prepara un DataFrame con todos los datos para exportación en formato legible.
     
@@ -651,43 +806,20 @@ def preparar_datos_exportacion(ratios: Dict[str, Optional[float]],
     Returns:
         DataFrame con los datos organizados para Excel
     """
-    datos = []
+    import pandas as pd
     
-    # Mapeo de nombres técnicos a nombres descriptivos
-    nombres_ratios = {
-        "liquidez": "Ratio de Liquidez",
-        "prueba_acida": "Prueba Ácida",
-        "endeudamiento": "Ratio de Endeudamiento",
-        "apalancamiento": "Ratio de Apalancamiento",
-        "roa": "ROA (Rentabilidad sobre Activos)",
-        "roe": "ROE (Rentabilidad sobre Patrimonio)",
-        "margen_neto": "Margen Neto",
-        "rotacion_activos": "Rotación de Activos",
-        "rotacion_inventarios": "Rotación de Inventarios"
-    }
-    
-    # Categorías para organizar mejor
-    categorias = {
-        "liquidez": "Liquidez",
-        "prueba_acida": "Liquidez",
-        "endeudamiento": "Solvencia",
-        "apalancamiento": "Solvencia",
-        "roa": "Rentabilidad",
-        "roe": "Rentabilidad",
-        "margen_neto": "Rentabilidad",
-        "rotacion_activos": "Eficiencia",
-        "rotacion_inventarios": "Eficiencia"
-    }
+    datos = []
     
-    # Agregar ratios con formato mejorado
+    # Agregar ratios con el nombre, la categoría y el formato del registro
     for nombre_tecnico, valor in ratios.items():
-        nombre_legible = nombres_ratios.get(nombre_tecnico, nombre_tecnico.replace("_", " ").title())
-        categoria = categorias.get(nombre_tecnico, "Otros")
+        ratio = RATIOS_POR_NOMBRE.get(nombre_tecnico)
+        nombre_legible = ratio.etiqueta if ratio else nombre_tecnico.replace("_", " ").title()
+        categoria = ratio.categoria if ratio else "Otros"
         
         # Formatear el valor
         if valor is not None:
-            # Convertir a porcentaje si es un ratio de rentabilidad o endeudamiento
-            if nombre_tecnico in ["roa", "roe", "margen_neto", "endeudamiento"]:
+            # Convertir a porcentaje si el registro lo declara así
+            if ratio is not None and ratio.formato == 'porcentaje':
                 valor_formateado = f"{valor * 100:.2f}%"
             else:
                 valor_formateado = f"{valor:.4f}"
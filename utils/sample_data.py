@@ -1,7 +1,18 @@
 """
 Datos de ejemplo para testing y demostración.
+
+Además de las dos empresas de ejemplo, ``generar_cartera`` produce carteras
+sintéticas de cualquier tamaño, por bloques, para pruebas de carga.
 """
 
+from typing import TYPE_CHECKING, Dict, Iterator, Sequence
+
+from risk_engine.classification import UMBRAL_ALTO_RIESGO, UMBRAL_BAJO_RIESGO
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
 def get_ejemplo_empresa_saludable():
     """
     Retorna datos de ejemplo de una empresa financieramente saludable.
@@ -54,4 +65,176 @@ def get_ejemplo_empresa_riesgo():
         "inventario_promedio": 95000,
         "costo_ventas": 500000,
         "total_liabilities": 800000,
-    }
\ No newline at end of file
+    }
+
+
+# Proporción por defecto de empresas en zona de alto riesgo, gris y segura
+MEZCLA_POR_DEFECTO = (0.2, 0.3, 0.5)
+
+
+# Rango del Z-Score objetivo por zona (alejado de los umbrales para que el
+# redondeo a 3 decimales no cambie la zona)
+_RANGOS_Z = (
+    (0.2, UMBRAL_ALTO_RIESGO - 0.05),
+    (UMBRAL_ALTO_RIESGO + 0.05, UMBRAL_BAJO_RIESGO - 0.05),
+    (UMBRAL_BAJO_RIESGO + 0.05, 6.0),
+)
+
+
+# Parámetros por zona (alto riesgo, gris, segura): rangos uniformes de
+# pasivo/activo, activo corriente/activo, pasivo corriente/pasivo,
+# utilidades retenidas/patrimonio, ventas/activo y margen EBIT
+_PARAMETROS_ZONA = {
+    'deuda': ((0.60, 0.95), (0.40, 0.75), (0.15, 0.55)),
+    'corriente': ((0.15, 0.45), (0.20, 0.55), (0.25, 0.65)),
+    'pasivo_corriente': ((0.40, 0.90), (0.30, 0.70), (0.20, 0.60)),
+    'retenidas': ((-0.50, 0.50), (0.00, 0.70), (0.30, 0.90)),
+    'rotacion': ((0.40, 1.20), (0.60, 1.60), (0.80, 2.20)),
+    'margen_ebit': ((-0.10, 0.04), (0.00, 0.10), (0.06, 0.20)),
+}
+
+
+# Mínimos de valor de mercado/pasivo y ventas/activo al ajustar el Z-Score
+_MVE_MINIMO = 0.02
+_ROTACION_MINIMA = 0.05
+
+
+def _uniforme_por_zona(
+    rng: 'np.random.Generator', rangos, zona: 'np.ndarray'
+) -> 'np.ndarray':
+    """Muestra un valor uniforme por fila con el rango de su zona."""
+    import numpy as np
+
+    bajos = np.array([rango[0] for rango in rangos])[zona]
+    altos = np.array([rango[1] for rango in rangos])[zona]
+    return rng.uniform(bajos, altos)
+
+
+def _bloque_sintetico(
+    rng: 'np.random.Generator', n_filas: int, mezcla: 'np.ndarray'
+) -> Dict[str, 'np.ndarray']:
+    """
+    Genera un bloque de estados financieros coherentes.
+
+    Cada fila recibe una zona según la mezcla y un Z-Score objetivo dentro
+    de esa zona. El valor de mercado del patrimonio se despeja para alcanzar
+    el objetivo; si resultaría menor al mínimo, se ajustan las ventas y, en
+    último caso, las utilidades retenidas.
+    """
+    import numpy as np
+
+    zona = rng.choice(3, size=n_filas, p=mezcla)
+    bajos = np.array([rango[0] for rango in _RANGOS_Z])[zona]
+    altos = np.array([rango[1] for rango in _RANGOS_Z])[zona]
+    z_objetivo = rng.uniform(bajos, altos)
+
+    parametros = {
+        nombre: _uniforme_por_zona(rng, rangos, zona)
+        for nombre, rangos in _PARAMETROS_ZONA.items()
+    }
+    deuda = parametros['deuda']
+    margen = parametros['margen_ebit']
+
+    # Proporciones sobre el activo total
+    corriente = parametros['corriente']
+    wc = corriente - deuda * parametros['pasivo_corriente']
+    re = (1 - deuda) * parametros['retenidas']
+    rotacion = parametros['rotacion']
+    factor_ventas = 1 + 3.3 * margen
+
+    mve = (z_objetivo - 1.2 * wc - 1.4 * re - rotacion * factor_ventas) / 0.6
+    ajustar = mve < _MVE_MINIMO
+    mve[ajustar] = _MVE_MINIMO
+    rotacion = np.where(
+        ajustar,
+        (z_objetivo - 1.2 * wc - 1.4 * re - 0.6 * _MVE_MINIMO) / factor_ventas,
+        rotacion
+    )
+    ajustar = rotacion < _ROTACION_MINIMA
+    rotacion[ajustar] = _ROTACION_MINIMA
+    re = np.where(
+        ajustar,
+        (z_objetivo - 1.2 * wc - 0.6 * mve - rotacion * factor_ventas) / 1.4,
+        re
+    )
+
+    activo = rng.lognormal(13.5, 1.5, n_filas)
+    pasivo = activo * deuda
+    activo_corriente = activo * corriente
+    ventas = activo * rotacion
+    ebit = ventas * margen
+    intereses = pasivo * rng.uniform(0.02, 0.08, n_filas)
+    antes_impuestos = ebit - intereses
+    inventarios = activo_corriente * rng.uniform(0.05, 0.5, n_filas)
+
+    return {
+        'activo_corriente': activo_corriente,
+        'pasivo_corriente': pasivo * parametros['pasivo_corriente'],
+        'pasivo_total': pasivo,
+        'patrimonio': activo - pasivo,
+        'ventas': ventas,
+        'utilidad_neta': np.where(antes_impuestos > 0, antes_impuestos * 0.7, antes_impuestos),
+        'ebit': ebit,
+        'total_assets': activo,
+        'working_capital': activo * wc,
+        'retained_earnings': activo * re,
+        'market_value_equity': pasivo * mve,
+        'inventarios': inventarios,
+        'inventario_promedio': inventarios * rng.uniform(0.85, 1.15, n_filas),
+        # El costo de ventas deja margen bruto para el EBIT y los gastos operativos
+        'costo_ventas': ventas * (1 - margen) * rng.uniform(0.6, 0.9, n_filas),
+        'total_liabilities': pasivo,
+    }
+
+
+def generar_cartera(
+    n_filas: int,
+    tam_bloque: int = 100_000,
+    semilla: int = 0,
+    mezcla: Sequence[float] = MEZCLA_POR_DEFECTO,
+    col_id: str = 'id'
+) -> Iterator[Dict[str, 'np.ndarray']]:
+    """
+    Genera una cartera sintética por bloques, sin mantenerla completa en memoria.
+
+    Los estados son coherentes: el activo corriente y el pasivo corriente no
+    superan a sus totales, patrimonio = activo total - pasivo total,
+    capital de trabajo = activo corriente - pasivo corriente, los inventarios
+    no superan al activo corriente y el costo de ventas deja margen para el
+    EBIT. Cada empresa cae en la zona de riesgo que le asigna la mezcla.
+
+    Cada bloque usa su propio generador derivado de (semilla, número de
+    bloque), por lo que la cartera es reproducible para la misma semilla y
+    tamaño de bloque, y los bloques pueden generarse por separado.
+
+    Args:
+        n_filas: Número total de empresas
+        tam_bloque: Empresas por bloque
+        semilla: Semilla del generador
+        mezcla: Proporciones de empresas en zona de alto riesgo, gris y segura
+        col_id: Nombre de la columna identificadora (enteros consecutivos)
+
+    Yields:
+        Diccionario campo → arreglo float64, más la columna identificadora
+
+    Raises:
+        ValueError: Si la mezcla no tiene tres proporciones no negativas
+
+    Examples:
+        >>> for bloque in generar_cartera(1_000_000, mezcla=(0.1, 0.2, 0.7)):
+        ...     resultados = puntuar_lote(bloque)
+    """
+    # NumPy se importa aquí para no cargarlo al iniciar la aplicación
+    import numpy as np
+
+    mezcla = np.asarray(mezcla, dtype=np.float64)
+    if mezcla.shape != (3,) or (mezcla < 0).any() or mezcla.sum() <= 0:
+        raise ValueError("La mezcla debe tener tres proporciones no negativas.")
+    mezcla = mezcla / mezcla.sum()
+
+    for indice, inicio in enumerate(range(0, n_filas, tam_bloque)):
+        fin = min(inicio + tam_bloque, n_filas)
+        rng = np.random.default_rng([semilla, indice])
+        bloque = _bloque_sintetico(rng, fin - inicio, mezcla)
+        bloque[col_id] = np.arange(inicio, fin, dtype=np.int64)
+        yield bloque
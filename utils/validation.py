@@ -1,6 +1,8 @@
 import streamlit as st
 from typing import Optional
 
+from utils.validation_core import parsear_numero, verificar_no_negativo
+
 
 def validate_number(value: str | None, field_name: str) -> Optional[float]:
     """
@@ -14,21 +16,10 @@ def validate_number(value: str | None, field_name: str) -> Optional[float]:
     Returns:
         float válido o None si hay error
     """
-    if value is None or value == "":
-        st.error(f"El campo '{field_name}' es obligatorio.")
-        return None
-
-    try:
-        # Limpiar comas y espacios antes de convertir
-        cleaned_value = str(value).replace(",", "").replace(" ", "").strip()
-        if cleaned_value == "":
-            st.error(f"El campo '{field_name}' es obligatorio.")
-            return None
-        value = float(cleaned_value)
-    except ValueError:
-        st.error(f"El campo '{field_name}' debe ser numérico.")
+    value, error = parsear_numero(value, field_name)
+    if error is not None:
+        st.error(error.mensaje)
         return None
-
     return value
 
 
@@ -36,7 +27,8 @@ def validate_positive(value: float, field_name: str) -> Optional[float]:
     """
     Verifica que el valor no sea negativo.
     """
-    if value < 0:
-        st.error(f"El campo '{field_name}' no puede ser negativo.")
+    error = verificar_no_negativo(value, field_name)
+    if error is not None:
+        st.error(error.mensaje)
         return None
     return value
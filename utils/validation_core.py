@@ -0,0 +1,270 @@
+"""
+Núcleo de validación independiente de Streamlit.
+
+Las funciones de este módulo no muestran nada en pantalla: devuelven los
+valores parseados junto con objetos ``ErrorValidacion`` que la interfaz (o
+cualquier proceso por lotes) decide cómo presentar.
+
+Incluye además un parser vectorizado que limpia separadores de miles
+("100,000", "100 000") sobre una columna completa de texto de una sola vez.
+
+Ambos parsers aceptan el mismo formato: separador de miles (por defecto la
+coma, o el punto si el separador decimal es la coma) y espacios opcionales,
+y solo valores finitos ("nan" e "inf" no son numéricos).
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+
+# Número decimal con signo y exponente opcionales, tras limpiar separadores.
+# Lo usan ambos parsers, de modo que aceptan exactamente los mismos textos
+# (float() aceptaría además "nan", "inf" o "1_000").
+_PATRON_NUMERO = r"^[+-]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][+-]?[0-9]+)?$"
+_NUMERO = re.compile(_PATRON_NUMERO)
+
+# Campos que no admiten valores negativos, para el formulario, el servicio
+# HTTP y cualquier otra entrada (utilidad_neta, ebit, working_capital y
+# retained_earnings sí pueden ser negativos)
+CAMPOS_NO_NEGATIVOS = frozenset({
+    "activo_corriente", "pasivo_corriente", "pasivo_total",
+    "patrimonio", "ventas", "total_assets", "market_value_equity",
+    "inventarios", "inventario_promedio", "costo_ventas", "total_liabilities",
+    "caja_bancos", "inversiones_cp", "cuentas_por_cobrar", "ventas_credito",
+    "cuentas_por_pagar", "compras_credito",
+    # Nombres alternativos de total_assets y market_value_equity
+    "activo_total", "valor_mercado_patrimonio",
+})
+
+
+@dataclass(frozen=True)
+class ErrorValidacion:
+    """
+    Error de validación de un campo.
+
+    Attributes:
+        campo: Nombre del campo con error
+        codigo: 'obligatorio', 'no_numerico' o 'negativo'
+        mensaje: Mensaje listo para mostrar al usuario
+    """
+    campo: str
+    codigo: str
+    mensaje: str
+
+
+def separador_miles(decimal: str = ".", miles: Optional[str] = None) -> str:
+    """
+    Retorna el separador de miles: el indicado, o el que corresponde al
+    separador decimal (coma si el decimal es el punto, punto si es la coma).
+    """
+    if miles is not None:
+        return miles
+    return "," if decimal == "." else "."
+
+
+def _limpiar(value: Any, decimal: str = ".", miles: Optional[str] = None) -> str:
+    """Quita separadores de miles y espacios, y normaliza el decimal a punto."""
+    limpio = str(value).replace(separador_miles(decimal, miles), "").replace(" ", "").strip()
+    return limpio.replace(decimal, ".") if decimal != "." else limpio
+
+
+def parsear_numero(
+    value: Optional[str],
+    field_name: str,
+    decimal: str = ".",
+    miles: Optional[str] = None
+) -> Tuple[Optional[float], Optional[ErrorValidacion]]:
+    """
+    Convierte un valor ingresado a float, aceptando separadores de miles y
+    espacios (ej: "100,000" o "100 000").
+
+    Args:
+        value: Valor ingresado por el usuario (texto o número)
+        field_name: Nombre del campo para el mensaje de error
+        decimal: Separador decimal del texto
+        miles: Separador de miles (por defecto según ``separador_miles``)
+
+    Returns:
+        Tupla (valor, error): el float y None si es válido, o None y el error
+    """
+    if value is None or value == "":
+        return None, ErrorValidacion(
+            field_name, 'obligatorio', f"El campo '{field_name}' es obligatorio."
+        )
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        numero = float(value)
+    else:
+        cleaned_value = _limpiar(value, decimal, miles)
+        if cleaned_value == "":
+            return None, ErrorValidacion(
+                field_name, 'obligatorio', f"El campo '{field_name}' es obligatorio."
+            )
+        numero = float(cleaned_value) if _NUMERO.match(cleaned_value) else math.nan
+
+    if not math.isfinite(numero):
+        return None, ErrorValidacion(
+            field_name, 'no_numerico', f"El campo '{field_name}' debe ser numérico."
+        )
+    return numero, None
+
+
+def verificar_no_negativo(value: float, field_name: str) -> Optional[ErrorValidacion]:
+    """
+    Verifica que el valor no sea negativo.
+
+    Returns:
+        None si el valor es válido, o el error correspondiente
+    """
+    if value < 0:
+        return ErrorValidacion(
+            field_name, 'negativo', f"El campo '{field_name}' no puede ser negativo."
+        )
+    return None
+
+
+def validar_campos(
+    obligatorios: Mapping[str, Any],
+    opcionales: Mapping[str, Any],
+    no_negativos: Iterable[str]
+) -> Tuple[dict, List[ErrorValidacion]]:
+    """
+    Valida todos los campos de un formulario y acumula los errores.
+
+    Los campos opcionales vacíos se omiten del resultado para que el motor
+    use sus aproximaciones.
+
+    Args:
+        obligatorios: Nombre del campo → valor ingresado
+        opcionales: Nombre del campo → valor ingresado (puede estar vacío)
+        no_negativos: Campos que no admiten valores negativos
+
+    Returns:
+        Tupla (datos, errores) con los valores válidos y la lista de errores
+    """
+    no_negativos = set(no_negativos)
+    datos = {}
+    errores = []
+
+    campos = list(obligatorios.items()) + [
+        (nombre, valor) for nombre, valor in opcionales.items()
+        if valor is not None and str(valor).strip()
+    ]
+
+    for nombre, valor in campos:
+        numero, error = parsear_numero(valor, nombre)
+        if error is None and nombre in no_negativos:
+            error = verificar_no_negativo(numero, nombre)
+        if error is not None:
+            errores.append(error)
+        else:
+            datos[nombre] = numero
+
+    return datos, errores
+
+
+class ColumnaParseada(NamedTuple):
+    """
+    Resultado del parseo vectorizado de una columna.
+
+    Attributes:
+        valores: Arreglo float64 (NaN en celdas vacías o inválidas)
+        invalidos: Máscara de celdas con texto no numérico
+        vacios: Máscara de celdas vacías
+    """
+    valores: Any
+    invalidos: Any
+    vacios: Any
+
+
+def parsear_columna(
+    valores: Any,
+    decimal: str = ".",
+    miles: Optional[str] = None
+) -> ColumnaParseada:
+    """
+    Parsea una columna completa de texto a float64 en una sola pasada.
+
+    Aplica la misma limpieza que ``parsear_numero`` (quita separadores de
+    miles y espacios, y normaliza el decimal) usando kernels de Arrow, sin
+    bucles de Python por celda.
+
+    Args:
+        valores: Serie de pandas, arreglo de NumPy o lista de valores
+        decimal: Separador decimal de los textos
+        miles: Separador de miles (por defecto según ``separador_miles``)
+
+    Returns:
+        ColumnaParseada con los valores y las máscaras de inválidos y vacíos
+    """
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(valores)
+
+    # Columnas ya numéricas: no hay nada que limpiar
+    if pd.api.types.is_numeric_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+        numeros = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+        vacios = np.isnan(numeros)
+        return ColumnaParseada(numeros, np.zeros(len(numeros), dtype=bool), vacios)
+
+    if not isinstance(serie.dtype, pd.StringDtype):
+        serie = serie.astype("string")
+    texto = pa.array(serie, type=pa.string())
+
+    limpio = pc.replace_substring(texto, separador_miles(decimal, miles), "")
+    limpio = pc.replace_substring(limpio, " ", "")
+    limpio = pc.utf8_trim_whitespace(limpio)
+    if decimal != ".":
+        limpio = pc.replace_substring(limpio, decimal, ".")
+
+    vacio = pc.fill_null(pc.equal(limpio, ""), True)
+    valido = pc.fill_null(pc.match_substring_regex(limpio, _PATRON_NUMERO), False)
+    numeros = pc.cast(pc.if_else(valido, limpio, pa.scalar(None, pa.string())), pa.float64())
+
+    # Textos que desbordan float64 ("1e999") tampoco son numéricos
+    numeros = np.where(np.isinf(numeros), np.nan, numeros)
+    vacios = vacio.to_numpy(zero_copy_only=False)
+    invalidos = ~(valido.to_numpy(zero_copy_only=False) & ~np.isnan(numeros) | vacios)
+    return ColumnaParseada(numeros, invalidos, vacios)
+
+
+def errores_columna(columna: ColumnaParseada, field_name: str,
+                    obligatorio: bool = True, no_negativo: bool = False,
+                    max_errores: int = 100) -> List[Tuple[int, ErrorValidacion]]:
+    """
+    Convierte las máscaras de una columna parseada en errores por fila.
+
+    Args:
+        columna: Resultado de ``parsear_columna``
+        field_name: Nombre del campo
+        obligatorio: Si las celdas vacías son un error
+        no_negativo: Si los valores negativos son un error
+        max_errores: Número máximo de errores a materializar
+
+    Returns:
+        Lista de tuplas (fila, error), como máximo max_errores
+    """
+    import numpy as np
+
+    codigos = np.zeros(len(columna.valores), dtype=np.int8)
+    if no_negativo:
+        codigos[columna.valores < 0] = 3
+    codigos[columna.invalidos] = 2
+    if obligatorio:
+        codigos[columna.vacios] = 1
+
+    mensajes = {
+        1: ('obligatorio', f"El campo '{field_name}' es obligatorio."),
+        2: ('no_numerico', f"El campo '{field_name}' debe ser numérico."),
+        3: ('negativo', f"El campo '{field_name}' no puede ser negativo."),
+    }
+    filas = np.flatnonzero(codigos)[:max_errores]
+    return [
+        (int(fila), ErrorValidacion(field_name, *mensajes[int(codigos[fila])]))
+        for fila in filas
+    ]